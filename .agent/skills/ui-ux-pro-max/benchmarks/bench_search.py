@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmarks - latency and memory of the search skill
+
+Builds synthetic copies of data/ scaled 1x, 10x, 100x (rows are replicated
+with a share of their words swapped for other words from the same CSV), then
+times CSV loading, BM25 fit/score, search, search_stack and
+generate_design_system. Search paths are measured cold (no caches), disk
+(on-disk index cache only), warm (in-process indexes, result cache cleared
+before every run, so scoring is always timed) and cached (repeated queries
+answered by the result cache).
+
+Usage: python benchmarks/bench_search.py [--scales 1,10,100] [--repeat 20] [--output bench.json]
+       python benchmarks/bench_search.py --baseline old.json [--threshold 1.25]
+
+Output JSON: {"meta": {...}, "scales": {"<scale>": {"<metric>": {"<case>": stats}}}}
+where stats = {n, mean_ms, p50_ms, p95_ms, p99_ms, peak_kb}.
+"""
+
+import argparse
+import csv
+import gc
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import core
+import design_system
+from core import BM25, CSV_CONFIG, STACK_CONFIG
+
+SOURCE_DATA_DIR = core.DATA_DIR
+SOURCE_CACHE_DIR = core.INDEX_CACHE_DIR
+
+QUERIES = {
+    "style": ["glassmorphism dark mode", "minimal clean flat", "brutalism bold"],
+    "color": ["fintech trust", "healthcare calm", "beauty spa"],
+    "chart": ["trend over time", "pie comparison", "funnel conversion"],
+    "landing": ["hero cta", "pricing testimonial", "social proof"],
+    "product": ["saas dashboard", "ecommerce luxury", "gaming portfolio"],
+    "ux": ["animation accessibility", "touch target mobile", "loading state"],
+    "typography": ["elegant serif", "playful rounded", "professional sans"],
+    "icons": ["lucide navigation", "settings gear", "social share"],
+    "react": ["suspense waterfall", "memo rerender", "bundle barrel"],
+    "web": ["aria focus", "form autocomplete", "semantic heading"],
+}
+STACK_QUERIES = ["layout responsive form", "state management", "image performance"]
+BRIEFS = ["SaaS dashboard", "beauty spa wellness service", "fintech crypto"]
+DEFAULT_SCALES = [1, 10, 100]
+MUTATION_RATE = 0.2
+
+
+# ============ STATISTICS ============
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _stats(samples_ms: list, peak_kb: float = None) -> dict:
+    values = sorted(samples_ms)
+    return {
+        "n": len(values),
+        "mean_ms": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50_ms": round(_percentile(values, 50), 4),
+        "p95_ms": round(_percentile(values, 95), 4),
+        "p99_ms": round(_percentile(values, 99), 4),
+        "peak_kb": round(peak_kb, 1) if peak_kb is not None else None,
+    }
+
+
+def _time(fn, repeat: int, setup=None) -> list:
+    """Wall time of fn() in ms, repeat times; setup() runs untimed before each call."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.disable()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        gc.enable()
+    return samples
+
+
+def _peak_kb(fn, setup=None) -> float:
+    """Peak traced allocation of one fn() call in KiB."""
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    return _stats(_time(fn, repeat, setup), _peak_kb(fn, setup))
+
+
+# ============ SYNTHETIC DATA ============
+def _csv_files() -> list:
+    files = [config["file"] for config in CSV_CONFIG.values()]
+    files += [config["file"] for config in STACK_CONFIG.values()]
+    files.append(design_system.REASONING_FILE)
+    return files
+
+
+def build_scaled_data(target_dir: Path, scale: int, seed: int = 0) -> None:
+    """Write every data CSV into target_dir with scale times as many rows."""
+    rng = random.Random(seed)
+    for rel in _csv_files():
+        source = SOURCE_DATA_DIR / rel
+        if not source.exists():
+            continue
+        dest = target_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if scale == 1:
+            shutil.copyfile(source, dest)
+            continue
+
+        with open(source, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames
+            rows = list(reader)
+        vocab = sorted({w for row in rows for v in row.values() if v for w in v.split()})
+
+        with open(dest, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+            for _ in range(scale - 1):
+                for row in rows:
+                    mutated = {}
+                    for key, value in row.items():
+                        words = (value or "").split()
+                        for i in range(len(words)):
+                            if vocab and rng.random() < MUTATION_RATE:
+                                words[i] = rng.choice(vocab)
+                        mutated[key] = " ".join(words)
+                    writer.writerow(mutated)
+
+
+def use_data_dir(data_dir: Path, cache_dir: Path) -> None:
+    """Point the skill at data_dir and drop every in-process cache."""
+    core.DATA_DIR = data_dir
+    design_system.DATA_DIR = data_dir
+    core.INDEX_CACHE_DIR = cache_dir
+    reset_memory_caches()
+
+
+def reset_memory_caches() -> None:
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+
+
+def reset_query_cache() -> None:
+    core.QUERY_CACHE.clear()
+
+
+def reset_all_caches() -> None:
+    reset_memory_caches()
+    if core.INDEX_CACHE_DIR is not None and core.INDEX_CACHE_DIR.exists():
+        shutil.rmtree(core.INDEX_CACHE_DIR)
+
+
+# ============ BENCHMARKS ============
+def bench_scale(scale: int, repeat: int, workdir: Path) -> dict:
+    data_dir = workdir / f"data-{scale}x"
+    build_scaled_data(data_dir, scale)
+    use_data_dir(data_dir, workdir / f"cache-{scale}x")
+
+    cold_repeat = max(3, repeat // 4)
+    results = {"rows": {}, "load_csv": {}, "fit": {}, "score": {}, "score_topk": {},
+               "search": {}, "search_stack": {}, "generate_design_system": {}}
+
+    # Raw engine: CSV parse, fit, score
+    for domain, config in CSV_CONFIG.items():
+        filepath = data_dir / config["file"]
+        rows = core._load_csv(filepath)
+        documents = [" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in rows]
+        bm25 = BM25()
+        bm25.fit(documents)
+        queries = QUERIES.get(domain, ["design"])
+
+        results["rows"][domain] = len(rows)
+        results["load_csv"][domain] = measure(lambda: core._load_csv(filepath), cold_repeat)
+        results["fit"][domain] = measure(lambda: BM25().fit(documents), cold_repeat)
+        results["score"][domain] = measure(lambda: [bm25.score(q) for q in queries], repeat)
+        results["score_topk"][domain] = measure(
+            lambda: [bm25.score_topk(q, core.MAX_RESULTS) for q in queries], repeat)
+
+    # search(): cold, on-disk cache only, loaded indexes, result cache hits
+    for domain in CSV_CONFIG:
+        query = QUERIES.get(domain, ["design"])[0]
+        run = lambda: core.search(query, domain)
+        results["search"][f"{domain}/cold"] = measure(run, cold_repeat, setup=reset_all_caches)
+        run()
+        results["search"][f"{domain}/disk"] = measure(run, cold_repeat, setup=reset_memory_caches)
+        results["search"][f"{domain}/warm"] = measure(run, repeat, setup=reset_query_cache)
+        results["search"][f"{domain}/cached"] = measure(run, repeat)
+
+    # search_stack()
+    for stack in STACK_CONFIG:
+        run = lambda: [core.search_stack(q, stack) for q in STACK_QUERIES]
+        results["search_stack"][f"{stack}/cold"] = measure(run, cold_repeat, setup=reset_all_caches)
+        run()
+        results["search_stack"][f"{stack}/warm"] = measure(run, repeat, setup=reset_query_cache)
+        results["search_stack"][f"{stack}/cached"] = measure(run, repeat)
+
+    # generate_design_system()
+    for brief in BRIEFS:
+        run = lambda: design_system.generate_design_system(brief, "Bench")
+        results["generate_design_system"][f"{brief}/cold"] = measure(run, cold_repeat, setup=reset_all_caches)
+        run()
+        results["generate_design_system"][f"{brief}/warm"] = measure(run, repeat, setup=reset_query_cache)
+        results["generate_design_system"][f"{brief}/cached"] = measure(run, repeat)
+
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Cases whose p50 grew by more than threshold x versus baseline."""
+    regressions = []
+    for scale, metrics in current["scales"].items():
+        for metric, cases in metrics.items():
+            if metric == "rows":
+                continue
+            for case, stats in cases.items():
+                old = baseline.get("scales", {}).get(scale, {}).get(metric, {}).get(case)
+                if not old or not old.get("p50_ms"):
+                    continue
+                ratio = stats["p50_ms"] / old["p50_ms"]
+                if ratio > threshold:
+                    regressions.append((scale, metric, case, old["p50_ms"], stats["p50_ms"], ratio))
+    return regressions
+
+
+def print_summary(report: dict) -> None:
+    for scale, metrics in report["scales"].items():
+        print(f"\n== {scale}x ({sum(metrics['rows'].values())} domain rows) ==")
+        print(f"{'metric':<24}{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>11}")
+        for metric, cases in metrics.items():
+            if metric == "rows":
+                continue
+            for case, s in cases.items():
+                print(f"{metric:<24}{case:<40}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['peak_kb']:>11.1f}")
+
+
+# ============ CLI ============
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max search benchmarks")
+    parser.add_argument("--scales", type=str, default=",".join(map(str, DEFAULT_SCALES)), help="Comma-separated corpus scales (default: 1,10,100)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per warm case (cold cases use a quarter, min 3)")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", type=str, default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 slowdown ratio reported as a regression (default: 1.25)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="Do not print the summary table")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bm25_backend": core.BM25_BACKEND,
+            "sparse_available": core._import_sparse(),
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+
+    workdir = Path(tempfile.mkdtemp(prefix="uipro-bench-"))
+    try:
+        for scale in scales:
+            report["scales"][str(scale)] = bench_scale(scale, args.repeat, workdir)
+    finally:
+        use_data_dir(SOURCE_DATA_DIR, SOURCE_CACHE_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if not args.quiet:
+        print_summary(report)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for scale, metric, case, old, new, ratio in regressions:
+            print(f"REGRESSION {scale}x {metric} {case}: {old:.3f} -> {new:.3f} ms ({ratio:.2f}x)")
+        sys.exit(1 if regressions else 0)
@@ -4,16 +4,78 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import atexit
 import csv
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import os
+import pickle
 import re
+import struct
+import sys
+import tempfile
+import threading
+from array import array
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping, Sequence
+
+# Optional vectorized BM25 backend, imported by _import_sparse() on first use:
+# NumPy/SciPy take longer to import than a whole CLI search takes to run
+np = None
+sparse = None
+_SPARSE_IMPORTED = False
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Compiled indexes (parsed rows + fitted BM25) are cached here, one file per CSV.
+# Set to None to disable the on-disk cache.
+INDEX_CACHE_DIR = Path(__file__).parent.parent / ".index-cache"
+INDEX_CACHE_VERSION = 10
+
+# BM25 backend: "python", "sparse" (NumPy/SciPy CSR matrix) or "auto", which
+# uses the sparse backend for corpora of at least SPARSE_MIN_DOCS documents
+# when NumPy/SciPy are installed. Missing libraries always fall back to Python.
+BM25_BACKEND = "auto"
+SPARSE_MIN_DOCS = 2000
+
+# Record term positions in every CSV index up front. Off by default: an index
+# gains positions (kept in its cache entry) the first time search(...,
+# phrase=True) needs them to boost phrase and proximity matches.
+INDEX_POSITIONS = False
+
+# Compiled, memory-mapped index over every data CSV (python search.py --build-index),
+# used instead of parsing CSVs / unpickling indexes whenever it is up to date.
+# Defaults to INDEX_CACHE_DIR/index.bin; UIPRO_MMAP_INDEX overrides the path.
+MMAP_INDEX_FILE = Path(os.environ["UIPRO_MMAP_INDEX"]) if os.environ.get("UIPRO_MMAP_INDEX") else None
+MMAP_INDEX_VERSION = 1
+
+# CSVs of at least this size are indexed without keeping their rows: only
+# each record's byte offset is stored and result rows are parsed on demand
+LAZY_ROWS_MIN_BYTES = 1024 * 1024
+
+# In-process registry cap, measured as the total size of the source CSVs held.
+INDEX_REGISTRY_MAX_BYTES = 64 * 1024 * 1024
+
+# Query-result LRU in front of search()/search_stack(). With
+# UIPRO_PERSIST_QUERY_CACHE=1 it is also saved to INDEX_CACHE_DIR at exit
+# and reloaded by the next process (useful for repeated CLI/CI runs).
+QUERY_CACHE_MAX_ENTRIES = 1024
+PERSIST_QUERY_CACHE = os.environ.get("UIPRO_PERSIST_QUERY_CACHE", "") == "1"
+
+# Run multi-domain design-system searches through one faceted index, and
+# route queries no domain keyword matches by its cross-domain ranking.
+USE_UNIFIED_INDEX = os.environ.get("UIPRO_UNIFIED_INDEX", "") == "1"
+
+# Each CSV_CONFIG / STACK_CONFIG entry may set "tokenizer" to a TOKENIZERS name
+# (default: "default"); use "cjk" for Chinese/Japanese/Korean guideline data.
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -92,67 +154,805 @@ _STACK_COLS = {
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+def _import_sparse():
+    """Import NumPy/SciPy for the sparse backend once; False when they are not installed"""
+    global np, sparse, _SPARSE_IMPORTED
+    if not _SPARSE_IMPORTED:
+        _SPARSE_IMPORTED = True
+        try:
+            import numpy
+            from scipy import sparse as scipy_sparse
+        except ImportError:
+            return False
+        np, sparse = numpy, scipy_sparse
+    return sparse is not None
+
+
 # ============ BM25 IMPLEMENTATION ============
+# Equivalent to replacing punctuation with spaces and splitting on whitespace
+_TOKEN_RE = re.compile(r"\w+")
+
+
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_CJK_SPLIT_RE = re.compile(f"([{_CJK_CHARS}]+)")
+
+
+class Tokenizer:
+    """Lowercase word tokenizer with optional stopword list and stemmer.
+
+    The stemmer is any callable str -> str; it must be a module-level
+    function so fitted indexes stay picklable for the on-disk cache.
+    """
+
+    def __init__(self, min_length=3, stopwords=None, stemmer=None):
+        self.min_length = min_length
+        self.stopwords = frozenset(stopwords or ())
+        self.stemmer = stemmer
+
+    def _words(self, text):
+        min_length = self.min_length
+        return [w for w in _TOKEN_RE.findall(str(text).lower()) if len(w) >= min_length]
+
+    def __call__(self, text):
+        words = self._words(text)
+        if self.stopwords:
+            words = [w for w in words if w not in self.stopwords]
+        if self.stemmer is not None:
+            words = [self.stemmer(w) for w in words]
+        return words
+
+
+class CJKTokenizer(Tokenizer):
+    """Tokenizer that also handles Chinese/Japanese/Korean text.
+
+    \\w treats a run of CJK characters as one word, so a sentence becomes a
+    single unmatchable token (or is dropped by the length filter). Here CJK
+    runs are split into overlapping character bigrams (a lone character is
+    kept as a unigram), or segmented with jieba when segmenter="jieba" and
+    it is installed. Non-CJK text is tokenized exactly like Tokenizer.
+    """
+
+    def __init__(self, min_length=3, stopwords=None, stemmer=None, segmenter=None):
+        super().__init__(min_length, stopwords, stemmer)
+        self.segmenter = segmenter
+
+    def _segment(self, run):
+        if self.segmenter == "jieba":
+            try:
+                import jieba
+            except ImportError:
+                pass
+            else:
+                return [w for w in jieba.lcut(run) if w.strip()]
+        if len(run) == 1:
+            return [run]
+        return [run[i:i + 2] for i in range(len(run) - 1)]
+
+    def _words(self, text):
+        min_length = self.min_length
+        words = []
+        for word in _TOKEN_RE.findall(str(text).lower()):
+            for i, piece in enumerate(_CJK_SPLIT_RE.split(word)):
+                if not piece:
+                    continue
+                if i % 2:  # odd split groups are CJK runs
+                    words.extend(self._segment(piece))
+                elif len(piece) >= min_length:
+                    words.append(piece)
+        return words
+
+
+TOKENIZERS = {
+    "default": Tokenizer,
+    "cjk": CJKTokenizer,
+    "cjk-jieba": lambda: CJKTokenizer(segmenter="jieba"),
+}
+_TOKENIZER_INSTANCES = {}
+
+
+def make_tokenizer(name="default"):
+    """Shared tokenizer instance for a TOKENIZERS name"""
+    tokenizer = _TOKENIZER_INSTANCES.get(name)
+    if tokenizer is None:
+        if name not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {name}. Available: {', '.join(TOKENIZERS)}")
+        tokenizer = _TOKENIZER_INSTANCES[name] = TOKENIZERS[name]()
+    return tokenizer
+
+
+def _tokenizer_name(index_key):
+    """Tokenizer configured for a ("domain"|"stack", name) index key"""
+    kind, name = index_key
+    config = {"domain": CSV_CONFIG, "stack": STACK_CONFIG}.get(kind, {}).get(name)
+    return (config or {}).get("tokenizer", "default")
+
+
+class Vocabulary:
+    """Interns terms as consecutive integer ids.
+
+    A sorted copy of the terms (built on first use) serves prefix and
+    bounded edit-distance lookups: the sorted array is walked like a trie,
+    reusing Levenshtein rows across shared prefixes and skipping every term
+    under a prefix whose row already exceeds the edit bound.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+        self._sorted = None
+
+    def add(self, term):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+            self._sorted = None
+        return term_id
+
+    def sorted_terms(self):
+        if self._sorted is None or len(self._sorted) != len(self.terms):
+            self._sorted = sorted(self.terms)
+        return self._sorted
+
+    def with_prefix(self, prefix):
+        """Terms starting with prefix, in sorted order"""
+        terms = self.sorted_terms()
+        i = bisect_left(terms, prefix)
+        matches = []
+        while i < len(terms) and terms[i].startswith(prefix):
+            matches.append(terms[i])
+            i += 1
+        return matches
+
+    def similar(self, word, max_edits, prefix_length=0):
+        """(term, distance) for terms within max_edits edits of word.
+
+        Edits are insertions, deletions, substitutions and transpositions of
+        adjacent letters. Only terms sharing word's first prefix_length
+        letters are considered.
+        """
+        terms = self.sorted_terms()
+        head = word[:prefix_length]
+        i = bisect_left(terms, head)
+        end = bisect_left(terms, head + "\U0010ffff", i) if head else len(terms)
+        n = len(word)
+        cap = max_edits + 1
+        rows = [[min(j, cap) for j in range(n + 1)]]  # rows[d]: DP row for prev[:d]
+        prev = ""
+        matches = []
+
+        while i < end:
+            term = terms[i]
+            m = len(term)
+            if m - n > max_edits or n - m > max_edits:
+                i += 1
+                continue
+            common = 0
+            limit = min(len(prev), m, len(rows) - 1)
+            while common < limit and prev[common] == term[common]:
+                common += 1
+            del rows[common + 1:]
+
+            dead = 0
+            for d in range(common, m):
+                # Only cells within max_edits of the diagonal can stay under the bound
+                ch = term[d]
+                above = rows[d]
+                swap = term[d - 1] if d else None
+                row = [cap] * (n + 1)
+                lo = d + 1 - max_edits
+                if lo <= 0:
+                    row[0] = min(d + 1, cap)
+                    lo = 1
+                hi = min(n, d + 1 + max_edits)
+                best = row[lo - 1]
+                left = row[lo - 1]
+                for j in range(lo, hi + 1):
+                    cost = above[j - 1] + (word[j - 1] != ch)
+                    if above[j] + 1 < cost:
+                        cost = above[j] + 1
+                    if left + 1 < cost:
+                        cost = left + 1
+                    if j > 1 and word[j - 1] == swap and word[j - 2] == ch and rows[d - 1][j - 2] + 1 < cost:
+                        cost = rows[d - 1][j - 2] + 1
+                    if cost > cap:
+                        cost = cap
+                    row[j] = left = cost
+                    if cost < best:
+                        best = cost
+                rows.append(row)
+                if best > max_edits:
+                    dead = d + 1
+                    break
+
+            if dead:
+                # No term sharing this prefix can get back within the bound
+                prev = term[:dead]
+                i = bisect_left(terms, prev + "\U0010ffff", i + 1, end)
+                continue
+            if rows[-1][n] <= max_edits:
+                matches.append((term, rows[-1][n]))
+            prev = term
+            i += 1
+        return matches
+
+    def get(self, term):
+        return self.ids.get(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self.ids
+
+
+# ============ TERM POSITIONS ============
+def _encode_positions(positions, out):
+    """Append ascending positions to out as varint-encoded gaps"""
+    prev = 0
+    for pos in positions:
+        gap = pos - prev
+        prev = pos
+        while gap >= 0x80:
+            out.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        out.append(gap)
+
+
+def _decode_positions(blob, offset, count):
+    """Decode count varint gaps starting at blob[offset] into positions"""
+    positions = []
+    prev = 0
+    for _ in range(count):
+        gap = shift = 0
+        while True:
+            byte = blob[offset]
+            offset += 1
+            gap |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        prev += gap
+        positions.append(prev)
+    return positions
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted index)
+
+    Terms are interned to integer ids. Each document is kept as parallel
+    array('I') vectors of term ids and term frequencies, and each term's
+    postings as parallel arrays of document ids and term frequencies.
+    With positions=True, each term also keeps the token positions of every
+    posting as varint-encoded gaps in one bytes blob, plus the offset of
+    each posting's run in that blob.
+
+    add_documents() and remove_documents() update IDF and impact bounds of
+    the terms they touch and the length norms of new documents only. Other
+    terms keep the statistics of the last full refresh, which runs again
+    once N or the average document length has moved by more than
+    STATS_DRIFT since then.
+    """
+
+    # Default BM25 parameters
+    K1 = 1.5
+    B = 0.75
+
+    # Phrase/proximity boosts, in units of query-term IDF
+    PHRASE_BOOST = 1.0
+    PROXIMITY_BOOST = 0.5
+    PROXIMITY_WINDOW = 8
 
-    def __init__(self, k1=1.5, b=0.75):
+    # Fuzzy expansion of query tokens missing from the vocabulary
+    FUZZY_MIN_LENGTH = 5
+    FUZZY_PREFIX_LENGTH = 1  # leading letters a variant must share (keeps lookups sub-millisecond)
+    FUZZY_MAX_EXPANSIONS = 3
+
+    # Relative change of N or avgdl that triggers a full statistics refresh
+    STATS_DRIFT = 0.05
+
+    def __init__(self, k1=K1, b=B, backend=None, tokenizer=None, positions=False):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.backend = backend or BM25_BACKEND
+        self.tokenizer = tokenizer or Tokenizer()
+        self.positions = positions
+        self.position_blobs = []
+        self.position_offsets = []
+        self.vocab = Vocabulary()
+        self.doc_term_ids = []
+        self.doc_term_freqs = []
+        self.doc_lengths = array('I')
+        self.total_length = 0
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.stats_n = 0  # N at the last full refresh (avgdl is also from then)
+        self.idf = array('d')
+        self.doc_freqs = array('I')
+        self.postings = []
+        self.length_norms = array('d')
+        self.max_impacts = array('d')
+        self.matrix = None
         self.N = 0
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return self.tokenizer(text)
+
+    def query_term_ids(self, query):
+        """Term ids of query tokens present in the vocabulary, in query order"""
+        ids = self.vocab.ids
+        return [ids[t] for t in self.tokenize(query) if t in ids]
+
+    def expand_term(self, word):
+        """Weighted (term_id, weight) variants of a token missing from the vocabulary.
+
+        Candidates are terms extending the token (weight len(word) / len(term))
+        and terms within one edit, two for tokens of 9+ letters (weight
+        1 - edits / len(word)). The FUZZY_MAX_EXPANSIONS heaviest are kept.
+        Terms left without documents by remove_documents() are skipped.
+        """
+        if len(word) < self.FUZZY_MIN_LENGTH:
+            return []
+        vocab = self.vocab
+        doc_freqs = self.doc_freqs
+        weights = {}
+        for term in vocab.with_prefix(word):
+            if doc_freqs[vocab.ids[term]]:
+                weights[term] = len(word) / len(term)
+        for term, edits in vocab.similar(word, 1 if len(word) < 9 else 2, self.FUZZY_PREFIX_LENGTH):
+            if doc_freqs[vocab.ids[term]]:
+                weights[term] = max(weights.get(term, 0), 1 - edits / len(word))
+        best = sorted(weights.items(), key=lambda x: (-x[1], x[0]))[:self.FUZZY_MAX_EXPANSIONS]
+        return [(vocab.ids[term], weight) for term, weight in best]
+
+    def query_terms(self, query, fuzzy=False):
+        """(term_id, weight) pairs for the query tokens, in query order.
+
+        Tokens in the vocabulary weigh 1.0; with fuzzy=True each other token
+        (including terms left without documents) is replaced by its
+        expand_term() variants, otherwise it is dropped.
+        """
+        ids = self.vocab.ids
+        doc_freqs = self.doc_freqs
+        terms = []
+        for token in self.tokenize(query):
+            term_id = ids.get(token)
+            if term_id is not None and (doc_freqs[term_id] or not fuzzy):
+                terms.append((term_id, 1.0))
+            elif fuzzy:
+                terms.extend(self.expand_term(token))
+        return terms
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        self.vocab = Vocabulary()
+        self.doc_term_ids = []
+        self.doc_term_freqs = []
+        self.doc_lengths = array('I')
+        self.total_length = 0
+        self.doc_freqs = array('I')
+        self.postings = []
+        self.position_blobs = []
+        self.position_offsets = []
+        self.N = self.stats_n = 0
+        self.add_documents(documents)
+
+    def add_documents(self, documents):
+        """Index documents as ids N, N+1, ... and update the corpus statistics.
+
+        Only the new documents are tokenized; document frequencies and
+        postings are extended in place, and statistics are updated for the
+        terms they contain (see the class docstring). After a full refresh
+        the index is identical to fitting the whole corpus from scratch.
+        """
+        vocab = self.vocab
+        touched = set()
+        position_blobs = defaultdict(bytearray)
+        first_new = len(self.doc_lengths)
+
+        for idx, doc in enumerate(documents, len(self.doc_lengths)):
+            tokens = self.tokenize(doc)
+            term_freqs = {}
+            for word in tokens:
+                term_id = vocab.add(word)
+                term_freqs[term_id] = term_freqs.get(term_id, 0) + 1
+            while len(self.postings) < len(vocab):
+                self.postings.append((array('I'), array('I')))
+                self.doc_freqs.append(0)
+                if self.positions:
+                    self.position_blobs.append(b"")
+                    self.position_offsets.append(array('I'))
+            if self.positions:
+                term_positions = defaultdict(list)
+                for pos, word in enumerate(tokens):
+                    term_positions[vocab.ids[word]].append(pos)
+                for term_id, positions in term_positions.items():
+                    blob = position_blobs[term_id]
+                    self.position_offsets[term_id].append(len(self.position_blobs[term_id]) + len(blob))
+                    _encode_positions(positions, blob)
+            self.doc_term_ids.append(array('I', term_freqs.keys()))
+            self.doc_term_freqs.append(array('I', term_freqs.values()))
+            self.doc_lengths.append(len(tokens))
+            self.total_length += len(tokens)
+            # Postings: per term, ascending doc ids with parallel tfs
+            for term_id, tf in term_freqs.items():
+                docs, tfs = self.postings[term_id]
+                docs.append(idx)
+                tfs.append(tf)
+                touched.add(term_id)
+
+        for term_id in touched:
+            self.doc_freqs[term_id] = len(self.postings[term_id][0])
+        for term_id, blob in position_blobs.items():
+            self.position_blobs[term_id] += bytes(blob)
+        self._update_stats(touched, first_new)
+
+    def remove_documents(self, doc_ids):
+        """Drop documents; later documents are renumbered to close the gaps.
+
+        Only terms of the removed documents change document frequency;
+        postings are renumbered in place without re-tokenizing anything.
+        Terms left without documents stay in the vocabulary and never match.
+        """
+        removed = sorted(set(doc_ids))
+        if not removed:
+            return
+        removed_set = set(removed)
+        keep = [idx for idx in range(len(self.doc_lengths)) if idx not in removed_set]
+        new_id = {old: new for new, old in enumerate(keep)}
+
+        touched = set()
+        for idx in removed:
+            touched.update(self.doc_term_ids[idx])
+            self.total_length -= self.doc_lengths[idx]
+        for term_id, (docs, tfs) in enumerate(self.postings):
+            if not docs or docs[-1] < removed[0]:
+                continue  # no posting moves or disappears
+            kept = [p for p, idx in enumerate(docs) if idx in new_id]
+            if self.positions:
+                blob, offsets = self.position_blobs[term_id], self.position_offsets[term_id]
+                runs = [blob[offsets[p]:offsets[p + 1] if p + 1 < len(offsets) else len(blob)] for p in kept]
+                self.position_offsets[term_id] = array('I')
+                new_blob = bytearray()
+                for run in runs:
+                    self.position_offsets[term_id].append(len(new_blob))
+                    new_blob += run
+                self.position_blobs[term_id] = bytes(new_blob)
+            self.postings[term_id] = (array('I', (new_id[docs[p]] for p in kept)), array('I', (tfs[p] for p in kept)))
+        for term_id in touched:
+            self.doc_freqs[term_id] = len(self.postings[term_id][0])
+
+        self.doc_term_ids = [self.doc_term_ids[idx] for idx in keep]
+        self.doc_term_freqs = [self.doc_term_freqs[idx] for idx in keep]
+        self.doc_lengths = array('I', (self.doc_lengths[idx] for idx in keep))
+        if len(self.length_norms) == len(new_id) + len(removed):
+            self.length_norms = array('d', (self.length_norms[idx] for idx in keep))
+        self._update_stats(touched, len(keep))
+
+    def _update_stats(self, touched, first_new):
+        """Statistics after an add/remove: touched terms and documents from first_new on, unless drifted"""
+        self.N = len(self.doc_lengths)
+        n, avgdl = self.stats_n, self.avgdl
+        if (not n or not self.N or len(self.length_norms) != first_new
+                or abs(self.N - n) > self.STATS_DRIFT * n
+                or abs(self.total_length / self.N - avgdl) > self.STATS_DRIFT * avgdl):
+            self._refresh_stats()
+            return
+
+        k1, b = self.k1, self.b
+        self.length_norms.extend(k1 * (1 - b + b * dl / avgdl) for dl in self.doc_lengths[first_new:])
+        missing = len(self.vocab) - len(self.idf)
+        self.idf.extend([0.0] * missing)
+        self.max_impacts.extend([0.0] * missing)
+
+        # The best tf factor of old postings is the old bound over the old IDF
+        k1_plus_1 = k1 + 1
+        norms = self.length_norms
+        for term_id in touched:
+            old_idf = self.idf[term_id]
+            factor = self.max_impacts[term_id] / old_idf if old_idf else 0.0
+            docs, tfs = self.postings[term_id]
+            p = len(docs)
+            while p and docs[p - 1] >= first_new:
+                p -= 1
+                factor = max(factor, (tfs[p] * k1_plus_1) / (tfs[p] + norms[docs[p]]))
+            df = self.doc_freqs[term_id]
+            self.idf[term_id] = idf = log((self.N - df + 0.5) / (df + 0.5) + 1)
+            self.max_impacts[term_id] = idf * factor * (1 + 1e-12) if df else 0.0
+        self.matrix = None  # rebuilt on the next sparse query
+
+    def _refresh_stats(self):
+        """Recompute N, avgdl, IDF, length norms and impact bounds from the postings"""
+        self.N = self.stats_n = len(self.doc_lengths)
+        self.total_length = sum(self.doc_lengths)
+        self.matrix = None
         if self.N == 0:
+            self.avgdl = 0
+            self.idf = array('d')
+            self.length_norms = array('d')
+            self.max_impacts = array('d')
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        self.avgdl = self.total_length / self.N
+        self.idf = array('d', (log((self.N - df + 0.5) / (df + 0.5) + 1) for df in self.doc_freqs))
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        # Length normalization part of the BM25 denominator, per document
+        self.length_norms = array('d', (self.k1 * (1 - self.b + self.b * dl / self.avgdl) for dl in self.doc_lengths))
+
+        # Per-term upper bound on a single occurrence's score contribution (MaxScore)
+        k1_plus_1 = self.k1 + 1
+        norms = self.length_norms
+        self.max_impacts = array('d', (
+            max((idf * (tf * k1_plus_1) / (tf + norms[idx]) for idx, tf in zip(docs, tfs)), default=0)
+            for idf, (docs, tfs) in zip(self.idf, self.postings)
+        ))
+
+        if self._use_sparse():
+            self._build_matrix()
+
+    def _use_sparse(self):
+        if self.backend == "python" or (self.backend != "sparse" and self.N < SPARSE_MIN_DOCS):
+            return False
+        return _import_sparse()
+
+    def _sparse_matrix(self):
+        """The sparse backend's matrix, rebuilt after incremental updates; None on the Python backend"""
+        if self.matrix is None and self.N and self._use_sparse():
+            self._build_matrix()
+        return self.matrix
+
+    def _build_matrix(self):
+        """Build the sparse term-document matrix of per-term score contributions.
+
+        Stored term-major (CSR with one row per term id, i.e. the transposed
+        document-term matrix) so a query only touches its terms' rows. IDF
+        and length normalization are folded into each entry, so scoring is a
+        single sparse product of the query's term counts with the matrix.
+        """
+        k1_plus_1 = self.k1 + 1
+        norms = self.length_norms
+        indptr, indices, vals = [0], [], []
+        for idf, (docs, tfs) in zip(self.idf, self.postings):
+            indices.extend(docs)
+            vals.extend(idf * (tf * k1_plus_1) / (tf + norms[idx]) for idx, tf in zip(docs, tfs))
+            indptr.append(len(indices))
+        self.matrix = sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.float64), np.asarray(indices), np.asarray(indptr)),
+            shape=(len(self.vocab), self.N)
+        )
+
+    def _query_matrix(self, queries, fuzzy=False):
+        """Sparse (queries x terms) matrix of query term weights"""
+        rows, cols, vals = [], [], []
+        for i, query in enumerate(queries):
+            for term_id, weight in self.query_terms(query, fuzzy):
+                rows.append(i)
+                cols.append(term_id)
+                vals.append(weight)
+        return sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.float64), (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+            shape=(len(queries), len(self.vocab))
+        )
+
+    @staticmethod
+    def _topk_sparse(doc_ids, scores, k):
+        """Top-k (idx, score) with score > 0 from a sparse score row, ties broken by index"""
+        keep = scores > 0
+        doc_ids, scores = doc_ids[keep], scores[keep]
+        if len(scores) > k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth
+            doc_ids, scores = doc_ids[keep], scores[keep]
+        order = np.lexsort((doc_ids, -scores))[:k]
+        return [(int(doc_ids[i]), float(scores[i])) for i in order]
+
+    def _score_topk_sparse(self, queries, k, fuzzy=False):
+        S = (self._query_matrix(queries, fuzzy) @ self._sparse_matrix()).tocsr()
+        return [self._topk_sparse(S.indices[S.indptr[i]:S.indptr[i + 1]], S.data[S.indptr[i]:S.indptr[i + 1]], k)
+                for i in range(len(queries))]
+
+    def score(self, query, fuzzy=False):
+        """Score documents containing at least one query term.
+
+        Only postings of query terms are visited, so documents that share no
+        term with the query are omitted (their score would be 0). Results are
+        sorted by score descending, ties broken by document index. With
+        fuzzy=True, unknown tokens count through their weighted variants.
+        """
+        scores = {}
+        k1_plus_1 = self.k1 + 1
+        norms = self.length_norms
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        for term_id, weight in self.query_terms(query, fuzzy):
+            docs, tfs = self.postings[term_id]
+            idf = weight * self.idf[term_id]
+            for idx, tf in zip(docs, tfs):
+                scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+    def term_positions(self, term_id, doc):
+        """Token positions of a term in a document ([] if absent or positions were not recorded)"""
+        if not self.position_blobs:
+            return []
+        docs, tfs = self.postings[term_id]
+        p = bisect_left(docs, doc)
+        if p == len(docs) or docs[p] != doc:
+            return []
+        return _decode_positions(self.position_blobs[term_id], self.position_offsets[term_id][p], tfs[p])
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+    def _phrase_boost(self, query_ids, phrase_ids, doc):
+        """Bonus for query terms that occur close together in a document.
 
-            scores.append((idx, score))
+        Every adjacent pair of query terms earns PROXIMITY_BOOST times their
+        mean IDF divided by their token distance (out-of-order pairs count
+        one extra), if within PROXIMITY_WINDOW. The whole query occurring as
+        a contiguous phrase adds PHRASE_BOOST times the summed IDF.
+        """
+        idf = self.idf
+        positions = {term_id: self.term_positions(term_id, doc) for term_id in set(query_ids)}
+        boost = 0
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+        for a, b in zip(query_ids, query_ids[1:]):
+            if a == b or not positions[a] or not positions[b]:
+                continue
+            dist = min(pb - pa if pb > pa else pa - pb + 1 for pa in positions[a] for pb in positions[b])
+            if dist <= self.PROXIMITY_WINDOW:
+                boost += self.PROXIMITY_BOOST * (idf[a] + idf[b]) / 2 / dist
+
+        if phrase_ids:
+            rest = [set(positions[term_id]) for term_id in phrase_ids[1:]]
+            if any(all(start + i in pos for i, pos in enumerate(rest, 1)) for start in positions[phrase_ids[0]]):
+                boost += self.PHRASE_BOOST * sum(idf[term_id] for term_id in phrase_ids)
+
+        return boost
+
+    def score_phrase_topk(self, query, k, fuzzy=False):
+        """Return the k best (idx, score) pairs, boosting phrase and proximity matches.
+
+        Base scores are those of score(); documents matching two or more
+        distinct exact query terms get _phrase_boost() on top. Without
+        recorded positions this is plain score_topk().
+        """
+        if not self.position_blobs:
+            return self.score_topk(query, k, fuzzy)
+        if k <= 0 or self.N == 0:
+            return []
+
+        ids = self.vocab.ids
+        tokens = self.tokenize(query)
+        query_ids = [ids[t] for t in tokens if t in ids]
+        # A full phrase needs every query token indexed and at least two of them
+        phrase_ids = query_ids if len(query_ids) == len(tokens) and len(set(query_ids)) > 1 else None
+        exact = set(query_ids)
+
+        scores = {}
+        matched = {}
+        k1_plus_1 = self.k1 + 1
+        norms = self.length_norms
+        for term_id, weight in self.query_terms(query, fuzzy):
+            docs, tfs = self.postings[term_id]
+            idf = weight * self.idf[term_id]
+            for idx, tf in zip(docs, tfs):
+                scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
+                if term_id in exact:
+                    matched.setdefault(idx, set()).add(term_id)
+
+        if len(set(query_ids)) > 1:
+            for idx, terms in matched.items():
+                if len(terms) > 1:
+                    scores[idx] += self._phrase_boost(query_ids, phrase_ids, idx)
+
+        return heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0]))
+
+    def score_topk(self, query, k, fuzzy=False):
+        """Return the k best (idx, score) pairs with score > 0.
+
+        Same scores and order as score(query, fuzzy)[:k], but selected with a bounded
+        heap and MaxScore pruning: query terms are ordered by their maximum
+        possible contribution, and once the heap is full, terms whose
+        combined bounds cannot beat the k-th score stop producing
+        candidates and are only probed for documents that still can.
+        """
+        if k <= 0 or self.N == 0:
+            return []
+        if self._sparse_matrix() is not None:
+            return self._score_topk_sparse([query], k, fuzzy)[0]
+
+        query_terms = self.query_terms(query, fuzzy)
+        if not query_terms:
+            return []
+
+        k1_plus_1 = self.k1 + 1
+        norms = self.length_norms
+        idf = self.idf
+        counts = defaultdict(float)  # summed query weight per term
+        for term_id, weight in query_terms:
+            counts[term_id] += weight
+        terms = sorted(counts, key=lambda t: counts[t] * self.max_impacts[t])
+        n = len(terms)
+        doc_lists = [self.postings[t][0] for t in terms]
+        tf_lists = [self.postings[t][1] for t in terms]
+        weights = [counts[t] * idf[t] for t in terms]
+        # bound_prefix[i]: best total contribution of terms[:i]
+        bound_prefix = [0]
+        for t in terms:
+            bound_prefix.append(bound_prefix[-1] + counts[t] * self.max_impacts[t])
+
+        pos = [0] * n
+        heap = []
+        theta = 0
+        essential = 0  # terms[essential:] generate candidates
+        eps = 1e-9
+
+        while True:
+            # Next candidate: smallest doc id among essential postings
+            doc = None
+            for i in range(essential, n):
+                p = pos[i]
+                if p < len(doc_lists[i]) and (doc is None or doc_lists[i][p] < doc):
+                    doc = doc_lists[i][p]
+            if doc is None:
+                break
+
+            norm = norms[doc]
+            tfs = {}
+            partial = 0
+            for i in range(essential, n):
+                docs, p = doc_lists[i], pos[i]
+                if p < len(docs) and docs[p] == doc:
+                    tf = tf_lists[i][p]
+                    tfs[terms[i]] = tf
+                    partial += weights[i] * (tf * k1_plus_1) / (tf + norm)
+                    pos[i] = p + 1
+
+            # Probe non-essential terms, largest bound first, while the doc can still qualify
+            pruned = False
+            for i in range(essential - 1, -1, -1):
+                if partial + bound_prefix[i + 1] + eps <= theta:
+                    pruned = True
+                    break
+                docs = doc_lists[i]
+                p = bisect_left(docs, doc, pos[i])
+                pos[i] = p
+                if p < len(docs) and docs[p] == doc:
+                    tf = tf_lists[i][p]
+                    tfs[terms[i]] = tf
+                    partial += weights[i] * (tf * k1_plus_1) / (tf + norm)
+            if pruned or (len(heap) == k and partial + eps <= theta):
+                continue
+
+            # Exact score, accumulated in query order as score() does
+            total = 0
+            for term_id, weight in query_terms:
+                tf = tfs.get(term_id)
+                if tf:
+                    total += weight * idf[term_id] * (tf * k1_plus_1) / (tf + norm)
+
+            # Docs arrive in ascending id, so a tie never displaces a heap entry
+            item = (total, -doc)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            else:
+                continue
+
+            if len(heap) == k:
+                theta = heap[0][0]
+                while essential < n and bound_prefix[essential + 1] + eps <= theta:
+                    essential += 1
+
+        return [(-neg_idx, total) for total, neg_idx in sorted(heap, reverse=True)]
+
+    def score_batch_topk(self, queries, k, phrase=False, fuzzy=False):
+        """score_topk (or score_phrase_topk) for several queries; one sparse matrix product on the sparse backend"""
+        if phrase:
+            return [self.score_phrase_topk(q, k, fuzzy) for q in queries]
+        if self._sparse_matrix() is None or not queries:
+            return [self.score_topk(q, k, fuzzy) for q in queries]
+        if k <= 0:
+            return [[] for _ in queries]
+        return self._score_topk_sparse(queries, k, fuzzy)
 
 
 # ============ SEARCH FUNCTIONS ============
@@ -162,55 +962,1211 @@ def _load_csv(filepath):
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
+def _file_hash(filepath):
+    """SHA-1 of the file contents"""
+    return hashlib.sha1(filepath.read_bytes()).hexdigest()
+
+
+def _cache_path(filepath):
+    """Cache file for a CSV under DATA_DIR, or None if it cannot be cached"""
+    if INDEX_CACHE_DIR is None:
+        return None
+    try:
+        rel = filepath.resolve().relative_to(DATA_DIR.resolve())
+    except ValueError:
+        return None
+    return INDEX_CACHE_DIR / (rel.as_posix().replace("/", "__") + ".pickle")
+
+
+def _csv_records(lines, base_offset=0):
+    """(byte offset, values) of each non-blank CSV record in an iterable of raw byte lines"""
+    line_offsets = array('Q')
+
+    def decoded():
+        offset = base_offset
+        for raw in lines:
+            line_offsets.append(offset)
+            offset += len(raw)
+            yield raw.decode("utf-8")
+
+    reader = csv.reader(decoded())
+    while True:
+        first_line = reader.line_num
+        values = next(reader, None)
+        if values is None:
+            return
+        if values:  # DictReader skips blank records too
+            yield line_offsets[first_line], values
+
+
+def _record_dict(columns, values):
+    """Row dict for a parsed record, as csv.DictReader builds it"""
+    row = dict(zip(columns, values))
+    if len(values) > len(columns):
+        row[None] = values[len(columns):]
+    for col in columns[len(values):]:
+        row[col] = None
+    return row
+
+
+class CsvRows(Sequence):
+    """Rows of a CSV parsed on demand from stored record offsets.
+
+    Only the byte offset of each record is kept; indexing seeks there and
+    parses that single record, giving the same dict csv.DictReader would.
+    """
+
+    def __init__(self, filepath, columns, offsets):
+        self.filepath = str(filepath)
+        self.columns = columns
+        self.offsets = offsets
+
+    @classmethod
+    def scan(cls, filepath, search_cols):
+        """One pass over the CSV: (CsvRows, BM25 documents over search_cols)"""
+        offsets = array('Q')
+        documents = []
+        with open(filepath, 'rb') as f:
+            records = _csv_records(f)
+            _, columns = next(records, (0, []))
+            positions = [columns.index(col) if col in columns else None for col in search_cols]
+            for offset, values in records:
+                offsets.append(offset)
+                documents.append(" ".join(
+                    "" if p is None else str(values[p] if p < len(values) else None) for p in positions))
+        return cls(filepath, columns, offsets), documents
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.offsets[i])
+            _, values = next(_csv_records(f))
+        return _record_dict(self.columns, values)
+
+
+def _lazy_rows(filepath, search_cols):
+    return search_cols is not None and filepath.stat().st_size >= LAZY_ROWS_MIN_BYTES
+
+
+def _build_index(filepath, search_cols, tokenizer="default", positions=INDEX_POSITIONS):
+    """Parse CSV and fit BM25 over the search columns (rows only if search_cols is None).
+
+    Large CSVs (see LAZY_ROWS_MIN_BYTES) come back as CsvRows instead of a list.
+    """
+    if _lazy_rows(filepath, search_cols):
+        data, documents = CsvRows.scan(filepath, search_cols)
+    else:
+        data = _load_csv(filepath)
+        if search_cols is None:
+            return data, None
+        documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    bm25 = BM25(tokenizer=make_tokenizer(tokenizer), positions=positions)
+    bm25.fit(documents)
+    return data, bm25
+
+
+def _append_to_index(entry, filepath, search_cols):
+    """Index rows appended to filepath since entry was cached; False if the change is not an append.
+
+    It is an append when the file grew, the cached content ended with a
+    newline and the SHA-1 of the file's first entry["size"] bytes (the
+    stored prefix hash) still matches. Only the new records are parsed and
+    tokenized; entry is updated in place.
+    """
+    st = filepath.stat()
+    content = filepath.read_bytes()
+    size = entry["size"]
+    if len(content) != st.st_size or len(content) <= size or content[size - 1:size] != b"\n":
+        return False
+    if hashlib.sha1(content[:size]).hexdigest() != entry["sha1"]:
+        return False
+
+    rows = entry["rows"]
+    columns = rows.columns if isinstance(rows, CsvRows) else next(_csv_records(io.BytesIO(content)), (0, []))[1]
+    new_rows = []
+    for offset, values in _csv_records(io.BytesIO(content[size:]), size):
+        if isinstance(rows, CsvRows):
+            rows.offsets.append(offset)
+        new_rows.append(_record_dict(columns, values))
+    if not isinstance(rows, CsvRows):
+        rows.extend(new_rows)
+    if entry["bm25"] is not None:
+        entry["bm25"].add_documents([" ".join(str(row.get(col, "")) for col in search_cols) for row in new_rows])
+
+    entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, sha1=hashlib.sha1(content).hexdigest())
+    return True
+
+
+def _read_index_cache(cache_file, filepath, search_cols, tokenizer="default", positions=INDEX_POSITIONS):
+    """Return cached (rows, bm25) if still valid for filepath, else None.
+
+    An entry with positions serves any request; one without only serves
+    requests that do not need them.
+
+    The cache is trusted when mtime and size match; if only the mtime moved
+    (e.g. a checkout touched the file) the content hash decides. Rows
+    appended since the cache was written are indexed incrementally.
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or entry.get("version") != INDEX_CACHE_VERSION:
+        return None
+    if entry.get("search_cols") != (list(search_cols) if search_cols is not None else None):
+        return None
+    if entry.get("tokenizer") != tokenizer or (positions and not entry.get("positions")):
+        return None
+    if isinstance(entry.get("rows"), CsvRows) != _lazy_rows(filepath, search_cols):
+        return None
+
+    st = filepath.stat()
+    if entry["size"] != st.st_size:
+        if not _append_to_index(entry, filepath, search_cols):
+            return None
+        _write_pickle(cache_file, entry)
+    elif entry["mtime_ns"] != st.st_mtime_ns:
+        if entry["sha1"] != _file_hash(filepath):
+            return None
+        entry["mtime_ns"] = st.st_mtime_ns
+        _write_pickle(cache_file, entry)
+
+    return entry["rows"], entry["bm25"]
+
+
+def _write_pickle(cache_file, entry):
+    """Atomically write a cache file; failures only cost the next load"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+def _load_index(filepath, search_cols, tokenizer="default", positions=INDEX_POSITIONS):
+    """Return (rows, fitted BM25) for a CSV, using the mmap index or on-disk cache when valid.
+
+    With positions, the BM25 index records term positions.
+    """
+    mapped = _mmap_table(filepath, search_cols, tokenizer, positions)
+    if mapped is not None:
+        return mapped
+
+    cache_file = _cache_path(filepath)
+    if cache_file is not None:
+        cached = _read_index_cache(cache_file, filepath, search_cols, tokenizer, positions)
+        if cached is not None:
+            return cached
+
+    st = filepath.stat()
+    data, bm25 = _build_index(filepath, search_cols, tokenizer, positions)
+
+    if cache_file is not None:
+        _write_pickle(cache_file, {
+            "version": INDEX_CACHE_VERSION,
+            "search_cols": list(search_cols) if search_cols is not None else None,
+            "tokenizer": tokenizer,
+            "positions": positions,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha1": _file_hash(filepath),
+            "rows": data,
+            "bm25": bm25
+        })
+
+    return data, bm25
+
+
+# ============ MEMORY-MAPPED INDEX ============
+# One file holds every data CSV as a table of aligned native arrays:
+#   header   "<8sIIQQ": magic, format version, reserved, directory offset, directory length
+#   sections per table (8-byte aligned), located through the JSON directory:
+#     term_offsets/term_heap   sorted vocabulary as a string heap (term id = sorted position)
+#     doc_freqs, idf, max_impacts, post_offsets   per term
+#     post_docs, post_tfs      postings of all terms, concatenated
+#     pos_heap, pos_starts, pos_offsets   varint position gaps (if positions were recorded)
+#     doc_lengths, length_norms   per document
+#     row_offsets/row_heap     rows as JSON arrays in the table's column order
+#   directory (JSON)  source stamps, search_cols, tokenizer, BM25 parameters, section map
+# Readers share the pages through the OS page cache; rows decode only when accessed.
+_MMAP_MAGIC = b"UIPXIDX\0"
+_MMAP_HEADER = struct.Struct("<8sIIQQ")
+
+
+class _MmapStrings(Sequence):
+    """Strings stored as offsets into a UTF-8 heap, decoded on access"""
+
+    def __init__(self, offsets, heap):
+        self.offsets = offsets
+        self.heap = heap
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return bytes(self.heap[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class _MmapRows(Sequence):
+    """CSV rows stored as JSON arrays, parsed into dicts on access"""
+
+    def __init__(self, columns, strings):
+        self.columns = columns
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return dict(zip(self.columns, json.loads(self.strings[i])))
+
+
+class _MmapTermIds(Mapping):
+    """term -> id over a sorted term sequence, by binary search"""
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    def __getitem__(self, term):
+        i = bisect_left(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            raise KeyError(term)
+        return i
+
+    def __contains__(self, term):
+        i = bisect_left(self.terms, term)
+        return i < len(self.terms) and self.terms[i] == term
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class _MmapSlices(Sequence):
+    """Per-term slices of concatenated arrays, delimited by an offsets array"""
+
+    def __init__(self, offsets, *arrays):
+        self.offsets = offsets
+        self.arrays = arrays
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if len(self.arrays) == 1:
+            return self.arrays[0][start:end]
+        return tuple(a[start:end] for a in self.arrays)
+
+
+class MmapVocabulary(Vocabulary):
+    """Read-only Vocabulary over a sorted, memory-mapped term heap"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.ids = _MmapTermIds(terms)
+        self._sorted = terms
+
+    def add(self, term):
+        raise TypeError("memory-mapped vocabulary is read-only")
+
+    def sorted_terms(self):
+        return self.terms
+
+
+class MmapBM25(BM25):
+    """BM25 whose arrays are zero-copy views into the memory-mapped index.
+
+    Scores come from the same precomputed IDF and length norms as the
+    BM25 it was compiled from, so rankings are identical. Always uses the
+    pure-Python scorer.
+    """
+
+    def __init__(self, meta, view):
+        super().__init__(k1=meta["k1"], b=meta["b"], backend="python",
+                         tokenizer=make_tokenizer(meta["tokenizer"]), positions=meta["positions"])
+        self.vocab = MmapVocabulary(_MmapStrings(view("term_offsets"), view("term_heap")))
+        self.N = meta["N"]
+        self.avgdl = meta["avgdl"]
+        self.doc_lengths = view("doc_lengths")
+        self.length_norms = view("length_norms")
+        self.doc_freqs = view("doc_freqs")
+        self.idf = view("idf")
+        self.max_impacts = view("max_impacts")
+        post_offsets = view("post_offsets")
+        self.postings = _MmapSlices(post_offsets, view("post_docs"), view("post_tfs"))
+        if meta["positions"]:
+            self.position_blobs = _MmapSlices(view("pos_starts"), view("pos_heap"))
+            self.position_offsets = _MmapSlices(post_offsets, view("pos_offsets"))
+
+    def fit(self, documents):
+        raise TypeError("memory-mapped BM25 is read-only; rebuild with build_mmap_index()")
+
+    add_documents = remove_documents = fit
+
+
+class MmapIndex:
+    """Opened memory-mapped index file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        magic, version, _, dir_offset, dir_length = _MMAP_HEADER.unpack_from(self._buf)
+        if magic != _MMAP_MAGIC or version != MMAP_INDEX_VERSION:
+            raise ValueError(f"Not a v{MMAP_INDEX_VERSION} index file: {self.path}")
+        directory = json.loads(bytes(self._buf[dir_offset:dir_offset + dir_length]))
+        if directory["byteorder"] != sys.byteorder:
+            raise ValueError(f"Index file was built on a {directory['byteorder']}-endian machine: {self.path}")
+        self.tables = directory["tables"]
+
+    def _view(self, meta):
+        def view(name):
+            offset, length, typecode = meta["sections"][name]
+            section = self._buf[offset:offset + length]
+            return section if typecode == "B" else section.cast(typecode)
+        return view
+
+    def table(self, filepath, search_cols, tokenizer="default", positions=False):
+        """(rows, bm25) for a CSV if the file holds an up-to-date table for it (with positions, if asked), else None"""
+        try:
+            rel = filepath.resolve().relative_to(DATA_DIR.resolve()).as_posix()
+        except ValueError:
+            return None
+        meta = self.tables.get(rel)
+        if meta is None:
+            return None
+        if meta["search_cols"] != (list(search_cols) if search_cols is not None else None):
+            return None
+        if search_cols is not None and (meta["tokenizer"] != tokenizer or (positions and not meta["positions"])):
+            return None
+        st = filepath.stat()
+        if meta["size"] != st.st_size:
+            return None
+        if meta["mtime_ns"] != st.st_mtime_ns and meta["sha1"] != _file_hash(filepath):
+            return None
+
+        view = self._view(meta)
+        rows = _MmapRows(meta["columns"], _MmapStrings(view("row_offsets"), view("row_heap")))
+        return rows, (MmapBM25(meta, view) if search_cols is not None else None)
+
+
+_MMAP_INDEX = None
+_MMAP_LOCK = threading.Lock()
+
+
+def _mmap_index_file():
+    if MMAP_INDEX_FILE is not None:
+        return MMAP_INDEX_FILE
+    return INDEX_CACHE_DIR / "index.bin" if INDEX_CACHE_DIR is not None else None
+
+
+def get_mmap_index():
+    """The MmapIndex at _mmap_index_file(), reopened when rebuilt; None if absent or unreadable"""
+    global _MMAP_INDEX
+    path = _mmap_index_file()
+    if path is None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (str(path), st.st_mtime_ns, st.st_size)
+    with _MMAP_LOCK:
+        if _MMAP_INDEX is None or _MMAP_INDEX[0] != stamp:
+            try:
+                _MMAP_INDEX = (stamp, MmapIndex(path))
+            except (OSError, ValueError, KeyError, struct.error):
+                _MMAP_INDEX = (stamp, None)
+        return _MMAP_INDEX[1]
+
+
+def _mmap_table(filepath, search_cols, tokenizer="default", positions=False):
+    index = get_mmap_index()
+    return index.table(filepath, search_cols, tokenizer, positions) if index is not None else None
+
+
+def _index_specs():
+    """(csv path, search_cols, tokenizer) for every CSV under DATA_DIR; rows-only CSVs get None"""
+    specs = {}
+    for domain, config in CSV_CONFIG.items():
+        specs[DATA_DIR / config["file"]] = (config["search_cols"], _tokenizer_name(("domain", domain)))
+    for stack, config in STACK_CONFIG.items():
+        specs[DATA_DIR / config["file"]] = (_STACK_COLS["search_cols"], _tokenizer_name(("stack", stack)))
+    csv_files = sorted(DATA_DIR.glob("*.csv")) + sorted(DATA_DIR.glob("stacks/*.csv"))
+    return [(path, *specs.get(path, (None, "default"))) for path in csv_files]
+
+
+def _string_heap(strings):
+    offsets = array('Q', [0])
+    heap = bytearray()
+    for text in strings:
+        heap += text.encode("utf-8")
+        offsets.append(len(heap))
+    return offsets, heap
+
+
+def _compile_table(filepath, search_cols, tokenizer):
+    """Directory entry and {section: array/bytes} for one CSV"""
+    st = filepath.stat()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        columns = list(reader.fieldnames or [])
+        rows = list(reader)
+
+    meta = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": _file_hash(filepath),
+        "search_cols": list(search_cols) if search_cols is not None else None,
+        "tokenizer": tokenizer,
+        "columns": columns,
+    }
+    sections = {}
+    sections["row_offsets"], sections["row_heap"] = _string_heap(
+        json.dumps([row.get(col) for col in columns], ensure_ascii=False) for row in rows)
+    if search_cols is None:
+        return meta, sections
+
+    bm25 = BM25(tokenizer=make_tokenizer(tokenizer), backend="python", positions=INDEX_POSITIONS)
+    bm25.fit([" ".join(str(row.get(col, "")) for col in search_cols) for row in rows])
+    meta.update(k1=bm25.k1, b=bm25.b, N=bm25.N, avgdl=bm25.avgdl, positions=bool(bm25.position_blobs))
+
+    # Renumber terms in sorted order so lookups can bisect the term heap
+    order = sorted(range(len(bm25.vocab)), key=bm25.vocab.terms.__getitem__)
+    sections["term_offsets"], sections["term_heap"] = _string_heap(bm25.vocab.terms[t] for t in order)
+    sections["doc_freqs"] = array('I', (bm25.doc_freqs[t] for t in order))
+    sections["idf"] = array('d', (bm25.idf[t] for t in order))
+    sections["max_impacts"] = array('d', (bm25.max_impacts[t] for t in order))
+    post_offsets, post_docs, post_tfs = array('Q', [0]), array('I'), array('I')
+    pos_starts, pos_heap, pos_offsets = array('Q', [0]), bytearray(), array('I')
+    for t in order:
+        docs, tfs = bm25.postings[t]
+        post_docs.extend(docs)
+        post_tfs.extend(tfs)
+        post_offsets.append(len(post_docs))
+        if meta["positions"]:
+            pos_heap += bm25.position_blobs[t]
+            pos_starts.append(len(pos_heap))
+            pos_offsets.extend(bm25.position_offsets[t])
+    sections.update(post_offsets=post_offsets, post_docs=post_docs, post_tfs=post_tfs,
+                    doc_lengths=bm25.doc_lengths, length_norms=bm25.length_norms)
+    if meta["positions"]:
+        sections.update(pos_heap=pos_heap, pos_starts=pos_starts, pos_offsets=pos_offsets)
+    return meta, sections
+
+
+def build_mmap_index(path=None):
+    """Compile every CSV under DATA_DIR into one memory-mapped index file; returns its path"""
+    path = Path(path) if path is not None else _mmap_index_file()
+    if path is None:
+        raise ValueError("No index file path (INDEX_CACHE_DIR is disabled)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tables = {}
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"\0" * _MMAP_HEADER.size)
+            for filepath, search_cols, tokenizer in _index_specs():
+                meta, sections = _compile_table(filepath, search_cols, tokenizer)
+                meta["sections"] = {}
+                for name, data in sections.items():
+                    f.write(b"\0" * (-f.tell() % 8))
+                    typecode = data.typecode if isinstance(data, array) else "B"
+                    raw = data.tobytes() if isinstance(data, array) else bytes(data)
+                    meta["sections"][name] = [f.tell(), len(raw), typecode]
+                    f.write(raw)
+                tables[filepath.relative_to(DATA_DIR).as_posix()] = meta
+
+            directory = json.dumps({"byteorder": sys.byteorder, "tables": tables}, ensure_ascii=False).encode("utf-8")
+            dir_offset = f.tell()
+            f.write(directory)
+            f.seek(0)
+            f.write(_MMAP_HEADER.pack(_MMAP_MAGIC, MMAP_INDEX_VERSION, 0, dir_offset, len(directory)))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+class IndexRegistry:
+    """In-process LRU registry of loaded rows and fitted BM25 indexes.
+
+    Entries are keyed per domain/stack (e.g. ("domain", "style"),
+    ("stack", "react")) and revalidated against the CSV's mtime and size on
+    every lookup, so a long-running process picks up edited data files.
+    Memory is bounded by max_bytes, measured as the source CSV sizes.
+    Different keys load concurrently; concurrent misses on one key load it once.
+    An entry loaded without term positions is reloaded with them the first
+    time a caller asks for positions.
+    """
+
+    def __init__(self, max_bytes=INDEX_REGISTRY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self.loads = 0
+
+    def _lookup(self, key, stamp, positions=False):
+        entry = self._entries.get(key)
+        if entry is not None and entry["stamp"] == stamp and (entry["positions"] or not positions):
+            self._entries.move_to_end(key)
+            return entry["rows"], entry["bm25"]
+        return None
+
+    def get(self, key, filepath, search_cols, positions=False):
+        """Return (rows, bm25) for key, loading filepath on a miss or change (or when positions are newly needed)"""
+        st = filepath.stat()
+        tokenizer = _tokenizer_name(key)
+        stamp = (str(filepath), st.st_mtime_ns, st.st_size, tokenizer)
+        with self._lock:
+            hit = self._lookup(key, stamp, positions)
+            if hit is not None:
+                return hit
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                hit = self._lookup(key, stamp, positions)
+                if hit is not None:
+                    return hit
+            rows, bm25 = _load_index(filepath, search_cols, tokenizer, positions or INDEX_POSITIONS)
+
+            with self._lock:
+                self.invalidate(key)
+                self.loads += 1
+                self._entries[key] = {"stamp": stamp, "size": st.st_size, "rows": rows, "bm25": bm25,
+                                      "positions": bm25 is None or bm25.positions}
+                self._bytes += st.st_size
+
+                # Evict least recently used entries, always keeping the newest one
+                while self._bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted["size"]
+
+                return rows, bm25
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry["size"]
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+
+INDEX_REGISTRY = IndexRegistry()
+
+
+def invalidate_indexes(domain=None, stack=None):
+    """Drop in-process indexes for a domain, a stack, or everything if neither is given"""
+    if domain is None and stack is None:
+        INDEX_REGISTRY.invalidate()
+        return
+    if domain is not None:
+        INDEX_REGISTRY.invalidate(("domain", domain))
+    if stack is not None:
+        INDEX_REGISTRY.invalidate(("stack", stack))
+
+
+class QueryCache:
+    """Bounded LRU of search results.
+
+    Keys are (index key, normalized query tokens, max_results, phrase, fuzzy);
+    values are [result rows, BM25 scores, lowercased views or None]. Each entry
+    remembers the mtime/size of the CSV it came from and is discarded when
+    the file changes.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def get(self, key, stamp):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, stamp, results):
+        with self._lock:
+            self._entries[key] = (stamp, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.dirty = True
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "max_entries": self.max_entries}
+
+    def load(self, path):
+        """Merge entries saved by save(); stale ones are dropped lazily by get()"""
+        try:
+            with open(path, 'rb') as f:
+                saved = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, ValueError):
+            return
+        if not isinstance(saved, dict) or saved.get("version") != INDEX_CACHE_VERSION:
+            return
+        with self._lock:
+            for key, entry in saved["entries"]:
+                self._entries.setdefault(key, entry)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self, path):
+        with self._lock:
+            if not self.dirty:
+                return
+            entries = list(self._entries.items())
+            self.dirty = False
+        _write_pickle(path, {"version": INDEX_CACHE_VERSION, "entries": entries})
+
+
+QUERY_CACHE = QueryCache()
+
+
+def _query_cache_file():
+    return INDEX_CACHE_DIR / "query-results.pickle" if INDEX_CACHE_DIR is not None else None
+
+
+if PERSIST_QUERY_CACHE and _query_cache_file() is not None:
+    QUERY_CACHE.load(_query_cache_file())
+    atexit.register(lambda: QUERY_CACHE.save(_query_cache_file()) if _query_cache_file() is not None else None)
+
+
+def query_cache_stats():
+    """Hit/miss counters of the query-result cache"""
+    return QUERY_CACHE.stats()
+
+
+def preload_indexes():
+    """Load every domain and stack index into the registry"""
+    for domain, config in CSV_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            INDEX_REGISTRY.get(("domain", domain), filepath, config["search_cols"])
+    for stack, config in STACK_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            INDEX_REGISTRY.get(("stack", stack), filepath, _STACK_COLS["search_cols"])
+
+
+def load_rows(filename):
+    """Return parsed rows of a data CSV (relative to DATA_DIR) via the registry"""
+    rows, _ = INDEX_REGISTRY.get(("data", filename), DATA_DIR / filename, None)
+    return rows
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, index_key=None, phrase=False, fuzzy=False):
     """Core search function using BM25"""
+    return _search_csv_many(filepath, search_cols, output_cols, [query], max_results, index_key, phrase, fuzzy)[0]
+
+
+def _search_csv_many(filepath, search_cols, output_cols, queries, max_results, index_key=None, phrase=False,
+                     fuzzy=False, with_scores=False):
+    """Run several queries against one CSV index.
+
+    Returns one result list per query, or with with_scores a (results,
+    scores, views) triple; views are computed once per cache entry.
+    """
     if not filepath.exists():
-        return []
+        return [([], [], []) if with_scores else [] for _ in queries]
 
-    data = _load_csv(filepath)
+    index_key = index_key or ("file", str(filepath))
+    st = filepath.stat()
+    tokenizer = _tokenizer_name(index_key)
+    stamp = (str(filepath), st.st_mtime_ns, st.st_size, tokenizer)
+    normalize = make_tokenizer(tokenizer)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    # Serve repeated queries from the result cache, score the rest in one pass
+    batch = [None] * len(queries)
+    misses = []
+    for i, query in enumerate(queries):
+        key = (index_key, tuple(normalize(query)), max_results, phrase, fuzzy)
+        cached = QUERY_CACHE.get(key, stamp)
+        if cached is None:
+            misses.append((i, key))
+        else:
+            batch[i] = cached
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+    if misses:
+        data, bm25 = INDEX_REGISTRY.get(index_key, filepath, search_cols, positions=phrase)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+        # Top results with score > 0
+        ranked_batch = bm25.score_batch_topk([queries[i] for i, _ in misses], max_results, phrase, fuzzy)
+        for (i, key), ranked in zip(misses, ranked_batch):
+            results = []
+            for idx, score in ranked:
+                row = data[idx]
+                results.append({col: row.get(col, "") for col in output_cols if col in row})
+            batch[i] = [results, [float(score) for _, score in ranked], None]
+            QUERY_CACHE.put(key, stamp, batch[i])
+
+    if not with_scores:
+        return [[dict(row) for row in entry[0]] for entry in batch]
+    for entry in batch:
+        if entry[2] is None:
+            entry[2] = [_lowercase_view(row) for row in entry[0]]
+    return [([dict(row) for row in results], list(scores), [dict(view) for view in views])
+            for results, scores, views in batch]
+
+
+class UnifiedIndex:
+    """Domain and stack CSV indexes behind one document numbering, added facet by facet as searches need them.
+
+    Each document carries a facet ("domain"/"stack", name). Facets score
+    straight from their own BM25 postings, IDF and length norms, so
+    per-facet rankings are identical to searching that CSV alone and no
+    posting is copied. rank_domains() additionally uses collection-wide
+    IDF and length norms over all loaded domain facets, so scores are
+    comparable across domains. Each facet tokenizes the query with its own
+    tokenizer (e.g. CJK bigrams) and, with fuzzy=True, expands unknown
+    tokens with its own BM25.expand_term(), as search(..., fuzzy=True) does.
+    """
 
-    return results
+    DOMAIN_RANK_DEPTH = 3  # a domain's relevance is the sum of its top documents
+
+    def __init__(self):
+        self.facets = []
+        self.rows = []
+        self.indexes = []
+        self.stamps = []
+        self.offsets = []
+        self.doc_facet = array('I')
+        self._global = None  # (facet count, ({(tokenizer, term): IDF}, per-facet length norms))
+        self._lock = threading.Lock()
+
+    def add(self, facet, filepath, rows, bm25):
+        """Add one CSV's index as facet; readers only see it once complete"""
+        st = filepath.stat()
+        with self._lock:
+            offset = len(self.doc_facet)
+            self.doc_facet.extend([len(self.facets)] * len(rows))
+            self.rows.append(rows)
+            self.indexes.append(bm25)
+            self.stamps.append((str(filepath), st.st_mtime_ns, st.st_size, facet, _tokenizer_name(facet)))
+            self.offsets.append(offset)
+            self.facets.append(facet)
+
+    def ensure(self, facets):
+        """Load the given facets from the registry's per-domain and per-stack indexes"""
+        for facet in facets:
+            if facet in self.facets:
+                continue
+            kind, name = facet
+            if kind == "domain" and name in CSV_CONFIG:
+                filepath, search_cols = DATA_DIR / CSV_CONFIG[name]["file"], CSV_CONFIG[name]["search_cols"]
+            elif kind == "stack" and name in STACK_CONFIG:
+                filepath, search_cols = DATA_DIR / STACK_CONFIG[name]["file"], _STACK_COLS["search_cols"]
+            else:
+                continue
+            if filepath.exists():
+                rows, bm25 = INDEX_REGISTRY.get(facet, filepath, search_cols)
+                self.add(facet, filepath, rows, bm25)
+
+    def is_current(self):
+        for path, mtime_ns, size, facet, tokenizer in self.stamps:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if (st.st_mtime_ns, st.st_size) != (mtime_ns, size) or _tokenizer_name(facet) != tokenizer:
+                return False
+        return True
+
+    def _global_stats(self):
+        """Collection-wide IDF per (tokenizer, term) and length norms per domain facet, over those loaded so far"""
+        with self._lock:
+            if self._global is not None and self._global[0] == len(self.facets):
+                return self._global[1]
+            facet_ids = [i for i, facet in enumerate(self.facets) if facet[0] == "domain"]
+            k1, b = BM25.K1, BM25.B
+            n = max(sum(self.indexes[i].N for i in facet_ids), 1)
+            avgdl = (sum(sum(self.indexes[i].doc_lengths) for i in facet_ids) / n) or 1
+            df = defaultdict(int)
+            for i in facet_ids:
+                tokenizer = self.stamps[i][4]
+                bm25 = self.indexes[i]
+                for term, freq in zip(bm25.vocab.terms, bm25.doc_freqs):
+                    df[(tokenizer, term)] += freq
+            idf = {term: log((n - freq + 0.5) / (freq + 0.5) + 1) for term, freq in df.items()}
+            norms = [None] * len(self.facets)
+            for i in facet_ids:
+                norms[i] = array('d', (k1 * (1 - b + b * dl / avgdl) for dl in self.indexes[i].doc_lengths))
+            self._global = (len(self.facets), (idf, norms))
+            return self._global[1]
+
+    def _scores(self, query, facet_ids, collection_wide=False, fuzzy=False):
+        """Scores by unified document id; per facet the same sums BM25.score() computes"""
+        if collection_wide:
+            global_idf, global_norms = self._global_stats()
+        scores = {}
+        for facet_id in facet_ids:
+            bm25 = self.indexes[facet_id]
+            offset = self.offsets[facet_id]
+            if collection_wide:
+                tokenizer = self.stamps[facet_id][4]
+                k1_plus_1, norms = BM25.K1 + 1, global_norms[facet_id]
+            else:
+                k1_plus_1, norms = bm25.k1 + 1, bm25.length_norms
+            for term_id, weight in bm25.query_terms(query, fuzzy):
+                if collection_wide:
+                    idf = weight * global_idf[(tokenizer, bm25.vocab.terms[term_id])]
+                else:
+                    idf = weight * bm25.idf[term_id]
+                docs, tfs = bm25.postings[term_id]
+                for idx, tf in zip(docs, tfs):
+                    scores[offset + idx] = scores.get(offset + idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
+        return scores
+
+    def score_facets(self, query, limits, fuzzy=False):
+        """Top results per facet in one pass.
+
+        limits maps facet -> k; returns facet -> [(row idx, score), ...] in
+        the same order per-facet BM25.score_topk(query, k, fuzzy) would produce.
+        """
+        wanted = {self.facets.index(f): k for f, k in limits.items() if f in self.facets}
+        ranked = {facet_id: [] for facet_id in wanted}
+        remaining = sum(1 for k in wanted.values() if k > 0)
+        scores = self._scores(query, [facet_id for facet_id, k in wanted.items() if k > 0], fuzzy=fuzzy)
+        for doc, score in sorted(scores.items(), key=lambda x: (-x[1], x[0])):
+            if not remaining:
+                break
+            facet_id = self.doc_facet[doc]
+            bucket = ranked[facet_id]
+            if len(bucket) >= wanted[facet_id]:
+                continue
+            bucket.append((doc - self.offsets[facet_id], score))
+            if len(bucket) == wanted[facet_id]:
+                remaining -= 1
+        return {self.facets[facet_id]: bucket for facet_id, bucket in ranked.items()}
+
+    def rank_domains(self, query, fuzzy=True):
+        """Matching domains with relevance scores, best first (global ranking over loaded domain facets)"""
+        facet_ids = [i for i, facet in enumerate(self.facets) if facet[0] == "domain"]
+        per_domain = defaultdict(list)
+        for doc, score in self._scores(query, facet_ids, collection_wide=True, fuzzy=fuzzy).items():
+            per_domain[self.facets[self.doc_facet[doc]][1]].append(score)
+        relevance = {domain: sum(sorted(scores, reverse=True)[:self.DOMAIN_RANK_DEPTH])
+                     for domain, scores in per_domain.items()}
+        order = list(CSV_CONFIG)
+        return sorted(relevance.items(), key=lambda x: (-x[1], order.index(x[0])))
+
+
+_UNIFIED_INDEX = None
+_UNIFIED_LOCK = threading.Lock()
+
+
+def get_unified_index(facets=None):
+    """Shared UnifiedIndex holding at least facets (default: every domain), rebuilt when a source CSV changes"""
+    global _UNIFIED_INDEX
+    with _UNIFIED_LOCK:
+        if _UNIFIED_INDEX is None or not _UNIFIED_INDEX.is_current():
+            _UNIFIED_INDEX = UnifiedIndex()
+        _UNIFIED_INDEX.ensure(facets if facets is not None else [("domain", d) for d in CSV_CONFIG])
+        return _UNIFIED_INDEX
+
+
+def search_domains(query, limits, fuzzy=True):
+    """Search several domains with one scoring pass over the unified index.
+
+    limits maps domain -> max_results; returns domain -> search() result,
+    with the same results as search(query, domain, max_results, fuzzy=fuzzy).
+    """
+    index = get_unified_index([("domain", d) for d in limits])
+    ranked = index.score_facets(query, {("domain", d): k for d, k in limits.items()}, fuzzy)
+    output = {}
+    for domain in limits:
+        config = CSV_CONFIG.get(domain)
+        if config is None or ("domain", domain) not in ranked:
+            output[domain] = search(query, domain, limits[domain], fuzzy=fuzzy)
+            continue
+        rows = index.rows[index.facets.index(("domain", domain))]
+        results = []
+        for idx, score in ranked[("domain", domain)]:
+            row = rows[idx]
+            results.append({col: row.get(col, "") for col in config["output_cols"] if col in row})
+        output[domain] = {
+            "domain": domain,
+            "query": query,
+            "file": config["file"],
+            "count": len(results),
+            "results": results
+        }
+    return output
+
+
+# ============ KEYWORD MATCHING ============
+class KeywordMatcher:
+    """Multi-keyword matcher over labelled keywords.
+
+    groups maps a label to its keywords, each a string or a
+    (keyword, weight) pair. All keywords are compiled into one regex: a
+    trie-shaped alternation inside a lookahead, so a single C-level scan
+    yields the longest keyword starting at each position. Shorter keywords
+    starting there are exactly the keywords that prefix it, precomputed per
+    keyword, so every occurrence (overlapping ones included) is found.
+    """
+
+    def __init__(self, groups):
+        self.labels = list(groups)
+        self.keywords = []  # (keyword, label, weight)
+        by_keyword = defaultdict(list)
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                keyword, weight = keyword if isinstance(keyword, tuple) else (keyword, 1)
+                keyword = keyword.lower()
+                by_keyword[keyword].append(len(self.keywords))
+                self.keywords.append((keyword, label, weight))
+
+        # Keyword indexes occurring at a position whose longest match is the key, longest first
+        self._matches = {
+            keyword: [idx for k in sorted(by_keyword, key=len, reverse=True) if keyword.startswith(k)
+                      for idx in by_keyword[k]]
+            for keyword in by_keyword
+        }
+        trie = {}
+        for keyword in by_keyword:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._regex = re.compile(f"(?=({self._trie_pattern(trie)}))") if trie else None
+
+    @classmethod
+    def _trie_pattern(cls, node):
+        """Regex for a trie node; the greedy '?' prefers the longer keyword"""
+        branches = [re.escape(ch) + cls._trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if "" in node else pattern
+
+    def find(self, text):
+        """(start, end, keyword index) of every keyword occurrence in text.lower()"""
+        if self._regex is None:
+            return []
+        keywords = self.keywords
+        found = []
+        for m in self._regex.finditer(text.lower()):
+            start = m.start()
+            for idx in self._matches[m.group(1)]:
+                found.append((start, start + len(keywords[idx][0]), idx))
+        return found
+
+    def match(self, text, spans=True):
+        """{label: {"score", "spans"}} for labels with a match, in group order.
+
+        A keyword adds its weight once however often it occurs; spans are
+        (start, end, keyword) into text.lower(), one per occurrence. With
+        spans=False only scores are computed (and "spans" is empty).
+        """
+        scores = defaultdict(int)
+        label_spans = defaultdict(list)
+        if spans:
+            seen = set()
+            for start, end, idx in self.find(text):
+                keyword, label, weight = self.keywords[idx]
+                if idx not in seen:
+                    seen.add(idx)
+                    scores[label] += weight
+                label_spans[label].append((start, end, keyword))
+        elif self._regex is not None:
+            matches = self._matches
+            for idx in {idx for longest in set(self._regex.findall(text.lower())) for idx in matches[longest]}:
+                _, label, weight = self.keywords[idx]
+                scores[label] += weight
+        return {label: {"score": scores[label], "spans": label_spans[label]} for label in self.labels if label in scores}
+
+
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
+DOMAIN_MATCHER = KeywordMatcher(DOMAIN_KEYWORDS)
+
+
+def score_domains(query, spans=True):
+    """Keyword-matched domains as (domain, score, spans), best first.
+
+    Ties keep DOMAIN_KEYWORDS order; domains without a match are omitted.
+    """
+    matches = DOMAIN_MATCHER.match(query, spans)
+    ranked = sorted(matches.items(), key=lambda item: -item[1]["score"])
+    return [(domain, m["score"], m["spans"]) for domain, m in ranked]
+
+
+def score_domain_prefixes(query):
+    """Domains whose keywords extend a query word (e.g. "glassmorph"), as (domain, score), best first"""
+    words = {w for w in _TOKEN_RE.findall(query.lower()) if len(w) >= BM25.FUZZY_MIN_LENGTH}
+    scores = defaultdict(int)
+    for keyword, label, weight in DOMAIN_MATCHER.keywords:
+        if any(keyword.startswith(w) for w in words):
+            scores[label] += weight
+    return sorted(((label, scores[label]) for label in DOMAIN_MATCHER.labels if label in scores),
+                  key=lambda x: -x[1])
+
+
+def route_domains(query, top_n=2):
+    """Up to top_n domains worth searching for query (soft routing), best first.
+
+    Keyword matches decide when there are any. With the unified index, a
+    query no keyword matches is routed by keywords its words are prefixes
+    of, then by rank_domains(), instead of defaulting to style.
+    """
+    ranking = [domain for domain, _, _ in score_domains(query, spans=False)[:top_n]]
+    if not ranking and USE_UNIFIED_INDEX:
+        ranking = [domain for domain, _ in score_domain_prefixes(query)[:top_n]]
+        if not ranking:
+            ranking = [domain for domain, _ in get_unified_index().rank_domains(query)[:top_n]]
+    return ranking or ["style"]
 
 
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+    return route_domains(query, 1)[0]
+
+
+# ============ RE-RANKING ============
+# rerank() weights. A name match outranks any sum of keyword/field boosts
+# and BM25 term (for fewer than PRIORITY_NAME_BOOST / PRIORITY_KEYWORD_BOOST - 1
+# priorities). Below that, the BM25 score normalized to [0, 1] is blended in:
+# the top-scoring result earns as much as one keyword match, so a clearly
+# better text match can beat a result that only mentions a priority.
+PRIORITY_NAME_BOOST = 1000.0
+PRIORITY_KEYWORD_BOOST = 3.0
+PRIORITY_FIELD_BOOST = 1.0
+RERANK_SCORE_WEIGHT = 3.0
+
+
+ROW_TEXT_KEY = "*"
+
+
+def _lowercase_view(row):
+    view = {col: str(value).lower() for col, value in row.items()}
+    view[ROW_TEXT_KEY] = str(row).lower()
+    return view
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
 
+def rerank(search_result, priorities, name_field="Style Category", keywords_field="Keywords", top_n=None):
+    """Results of a search() response, best first, re-ranked by priority keywords.
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+    Each result gets one weight: PRIORITY_NAME_BOOST * (len(priorities) - i)
+    for the first priority i that contains or is contained in its name
+    field; otherwise, per priority, PRIORITY_KEYWORD_BOOST if found in its
+    keywords field, else PRIORITY_FIELD_BOOST if found anywhere in the row.
+    RERANK_SCORE_WEIGHT * BM25 score / top score is added to every weight.
+    Responses from search(..., scores=True) reuse their scores and
+    lowercased views; without scores the BM25 term is dropped and results
+    keep their order among equal boosts. The sort is stable, so remaining
+    ties keep search order.
+
+    With top_n, only the best top_n results are returned, and keyword boosts
+    are skipped when top_n results already match by name.
+    """
+    results = search_result.get("results", [])
+    scores = search_result.get("scores") or [0.0] * len(results)
+    views = search_result.get("views") or [_lowercase_view(row) for row in results]
+    top_score = max(scores, default=0.0)
+    priorities = [p.lower().strip() for p in priorities]
+
+    weights = []
+    unmatched = []
+    for i, (score, view) in enumerate(zip(scores, views)):
+        name = view.get(name_field, "")
+        boost = 0.0
+        for rank, priority in enumerate(priorities):
+            if priority in name or name in priority:
+                boost = PRIORITY_NAME_BOOST * (len(priorities) - rank)
+                break
+        else:
+            unmatched.append(i)
+        weights.append(boost + (RERANK_SCORE_WEIGHT * score / top_score if top_score > 0 else 0.0))
+
+    if top_n is None or len(results) - len(unmatched) < top_n:
+        for i in unmatched:
+            keywords = views[i].get(keywords_field, "")
+            text = views[i][ROW_TEXT_KEY]
+            for priority in priorities:
+                if priority in keywords:
+                    weights[i] += PRIORITY_KEYWORD_BOOST
+                elif priority in text:
+                    weights[i] += PRIORITY_FIELD_BOOST
+
+    order = sorted(range(len(results)), key=weights.__getitem__, reverse=True)
+    return [results[i] for i in order[:top_n]]
+
+
+def search(query, domain=None, max_results=MAX_RESULTS, phrase=False, fuzzy=True, scores=False):
+    """Main search function with auto-domain detection.
+
+    phrase=True boosts results where the query terms occur together, in
+    order or within a few tokens of each other. fuzzy=True lets misspelled
+    or partial words ("glassmorph") match through similar indexed terms.
+    scores=True adds "scores" (BM25 score per result) and "views" (each
+    result's values lowercased, plus the whole row as lowercased text under
+    ROW_TEXT_KEY), as used by rerank().
+    """
     if domain is None:
         domain = detect_domain(query)
 
@@ -220,18 +2176,28 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    index_key = ("domain", domain if domain in CSV_CONFIG else "style")
+    if scores:
+        results, result_scores, views = _search_csv_many(filepath, config["search_cols"], config["output_cols"], [query],
+                                                         max_results, index_key, phrase, fuzzy, with_scores=True)[0]
+    else:
+        results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, index_key,
+                              phrase, fuzzy)
 
-    return {
+    response = {
         "domain": domain,
         "query": query,
         "file": config["file"],
         "count": len(results),
         "results": results
     }
+    if scores:
+        response["scores"] = result_scores
+        response["views"] = views
+    return response
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
+def search_stack(query, stack, max_results=MAX_RESULTS, phrase=False, fuzzy=True):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
@@ -241,7 +2207,8 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results,
+                          index_key=("stack", stack), phrase=phrase, fuzzy=fuzzy)
 
     return {
         "domain": "stack",
@@ -251,3 +2218,180 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def search_many(queries, domain=None, max_results=MAX_RESULTS, phrase=False, fuzzy=True):
+    """Search several queries at once; results are returned in input order.
+
+    Queries are grouped by (detected) domain so each index is loaded and
+    scored once per batch.
+    """
+    groups = defaultdict(list)
+    for i, query in enumerate(queries):
+        groups[domain if domain is not None else detect_domain(query)].append(i)
+
+    output = [None] * len(queries)
+    for group_domain, positions in groups.items():
+        config = CSV_CONFIG.get(group_domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+
+        if not filepath.exists():
+            for i in positions:
+                output[i] = {"error": f"File not found: {filepath}", "domain": group_domain}
+            continue
+
+        batch = _search_csv_many(filepath, config["search_cols"], config["output_cols"],
+                                 [queries[i] for i in positions], max_results,
+                                 index_key=("domain", group_domain if group_domain in CSV_CONFIG else "style"),
+                                 phrase=phrase, fuzzy=fuzzy)
+        for i, results in zip(positions, batch):
+            output[i] = {
+                "domain": group_domain,
+                "query": queries[i],
+                "file": config["file"],
+                "count": len(results),
+                "results": results
+            }
+
+    return output
+
+
+def search_stack_many(queries, stack, max_results=MAX_RESULTS, phrase=False, fuzzy=True):
+    """Search several queries against one stack; results are returned in input order"""
+    if stack not in STACK_CONFIG:
+        return [{"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"} for _ in queries]
+
+    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+
+    if not filepath.exists():
+        return [{"error": f"Stack file not found: {filepath}", "stack": stack} for _ in queries]
+
+    batch = _search_csv_many(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], queries, max_results,
+                             index_key=("stack", stack), phrase=phrase, fuzzy=fuzzy)
+
+    return [{
+        "domain": "stack",
+        "stack": stack,
+        "query": query,
+        "file": STACK_CONFIG[stack]["file"],
+        "count": len(results),
+        "results": results
+    } for query, results in zip(queries, batch)]
+
+
+def decode_batch_line(line):
+    """A batch input line's value: the JSON object or string it encodes, else the line itself.
+
+    Only lines starting with "{" or '"' are decoded, so plain-text queries
+    that happen to be other JSON values ("404", "2024", "true") stay text.
+    """
+    if line[:1] in ('{', '"'):
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            return line
+        if isinstance(value, (dict, str)):
+            return value
+    return line
+
+
+class SearchContext:
+    """Searches that share a base query, e.g. one project's page overrides.
+
+    context.search(delta, domain) returns what search(f"{delta} {base}",
+    domain) would (phrase off), but the base query is scored once per
+    domain: its per-document contributions and its own ranking are kept,
+    and each search scores only the delta terms. Documents no delta term
+    touches keep their base score, so they are taken from the base ranking
+    in order; the others get delta and base contributions summed in query
+    order, as score() sums them.
+    """
+
+    def __init__(self, query, fuzzy=True):
+        self.query = query
+        self.fuzzy = fuzzy
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    def _domain(self, domain):
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is not None:
+                return state
+            config = CSV_CONFIG[domain]
+            filepath = DATA_DIR / config["file"]
+            if not filepath.exists():
+                state = None
+            else:
+                data, bm25 = INDEX_REGISTRY.get(("domain", domain), filepath, config["search_cols"])
+                k1_plus_1 = bm25.k1 + 1
+                norms = bm25.length_norms
+                contributions = defaultdict(list)  # doc -> base term contributions, in query order
+                for term_id, weight in bm25.query_terms(self.query, self.fuzzy):
+                    docs, tfs = bm25.postings[term_id]
+                    idf = weight * bm25.idf[term_id]
+                    for idx, tf in zip(docs, tfs):
+                        contributions[idx].append(idf * (tf * k1_plus_1) / (tf + norms[idx]))
+                base = {}
+                for idx, parts in contributions.items():
+                    total = 0
+                    for part in parts:
+                        total += part
+                    base[idx] = total
+                ranking = sorted(base.items(), key=lambda x: (-x[1], x[0]))
+                state = (config, data, bm25, dict(contributions), ranking)
+            self._domains[domain] = state
+            return state
+
+    def _score_topk(self, state, delta, k):
+        _, _, bm25, contributions, ranking = state
+        k1_plus_1 = bm25.k1 + 1
+        norms = bm25.length_norms
+        scores = {}
+        for term_id, weight in bm25.query_terms(delta, self.fuzzy):
+            docs, tfs = bm25.postings[term_id]
+            idf = weight * bm25.idf[term_id]
+            for idx, tf in zip(docs, tfs):
+                scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
+        for idx in scores:
+            total = scores[idx]
+            for part in contributions.get(idx, ()):
+                total += part
+            scores[idx] = total
+
+        # The best k base-only documents, then the k best overall
+        candidates = list(scores.items())
+        taken = 0
+        for idx, score in ranking:
+            if taken == k:
+                break
+            if idx not in scores:
+                candidates.append((idx, score))
+                taken += 1
+        return heapq.nsmallest(k, candidates, key=lambda x: (-x[1], x[0]))
+
+    def search(self, delta, domain, max_results=MAX_RESULTS, scores=False):
+        """search(f"{delta} {base}", domain, max_results, scores=scores), scoring only delta"""
+        state = self._domain(domain if domain in CSV_CONFIG else "style")
+        if state is None:
+            config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+            return {"error": f"File not found: {DATA_DIR / config['file']}", "domain": domain}
+
+        config, data, _, _, _ = state
+        ranked = self._score_topk(state, delta, max_results) if max_results > 0 else []
+        results = []
+        for idx, _ in ranked:
+            row = data[idx]
+            results.append({col: row.get(col, "") for col in config["output_cols"] if col in row})
+
+        response = {
+            "domain": domain,
+            "query": f"{delta} {self.query}",
+            "file": config["file"],
+            "count": len(results),
+            "results": results
+        }
+        if scores:
+            response["scores"] = [float(score) for _, score in ranked]
+            response["views"] = [_lowercase_view(row) for row in results]
+        return response
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Daemon - keeps every search index in memory and answers
+requests over a local socket, so repeated CLI calls skip interpreter startup
+and CSV loading.
+
+Usage:
+    python search.py --serve          # run the daemon in the foreground
+    python search.py --stop-daemon    # ask a running daemon to exit
+
+Protocol: one JSON object per line in each direction.
+    -> {"op": "search", "token": "...", "args": {"query": "glassmorphism", "domain": "style"}}
+    <- {"result": {...}}  or  {"error": "..."}
+
+Ops: ping, search, search_stack, search_many, search_stack_many,
+generate_design_system, query_cache_stats, shutdown. ping answers
+{"protocol": PROTOCOL_VERSION}; clients only use a daemon whose protocol
+matches their own.
+
+Every request carries the token the daemon writes, readable only by its
+user, next to the socket path (token_path()). A line that is not a JSON
+request, or has the wrong token, gets one error reply and the connection
+is closed. The socket and token live in a per-user directory only its owner
+can enter (runtime_dir()), and clients refuse files another user owns.
+
+The client half of this module (call(), is_running(), stop()) imports only
+the standard library, so forwarding a CLI call never loads core or NumPy.
+
+Transport: a Unix domain socket (UIPRO_DAEMON_SOCKET overrides the path), or
+localhost TCP on UIPRO_DAEMON_PORT where Unix sockets are unavailable. Any
+local process can reach the TCP port, so over TCP the daemon refuses
+requests that write files (TCP_FORBIDDEN_ARGS).
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import stat
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+
+
+# ============ CONFIGURATION ============
+DATA_DIR = Path(__file__).parent.parent / "data"  # core.DATA_DIR, without importing core
+USE_UNIX_SOCKET = hasattr(socket, "AF_UNIX")
+DEFAULT_PORT = 47839
+CONNECT_TIMEOUT = 0.25  # seconds; a missing daemon must not slow the CLI down
+REQUEST_TIMEOUT = 120
+MAX_LINE = 64 * 1024 * 1024
+PROTOCOL_VERSION = 2  # bump when ops or their arguments change
+TCP_FORBIDDEN_ARGS = ("persist", "output_dir")
+
+
+def runtime_dir() -> Path:
+    """Per-user directory for the socket and token: $XDG_RUNTIME_DIR, else a 0700 directory in tmp."""
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "ui-ux-pro-max"
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"ui-ux-pro-max-{uid}"
+
+
+def socket_path() -> Path:
+    """Unix socket path, unique per user and data directory."""
+    if os.environ.get("UIPRO_DAEMON_SOCKET"):
+        return Path(os.environ["UIPRO_DAEMON_SOCKET"])
+    tag = hashlib.sha1(str(DATA_DIR.resolve()).encode("utf-8")).hexdigest()[:10]
+    return runtime_dir() / f"daemon-{tag}.sock"
+
+
+def token_path() -> Path:
+    """Per-user file holding the running daemon's request token"""
+    return socket_path().with_suffix(".token")
+
+
+def tcp_port() -> int:
+    return int(os.environ.get("UIPRO_DAEMON_PORT", DEFAULT_PORT))
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening."""
+
+
+def _foreign(path: Path, private: bool = False):
+    """Why path is unsafe to trust (owned by another user, or open to others if private), or None"""
+    if not hasattr(os, "getuid"):
+        return None  # no POSIX ownership (Windows): the TCP port and token are per-user already
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        return str(e)
+    if st.st_uid != os.getuid():
+        return f"{path} is owned by another user"
+    if private and (not stat.S_ISDIR(st.st_mode) or st.st_mode & 0o077):
+        return f"{path} is not a directory only its owner can access"
+    return None
+
+
+def _check_paths():
+    """Raise DaemonUnavailable unless the socket and token files belong to this user"""
+    paths = [(token_path(), False)]
+    if USE_UNIX_SOCKET:
+        paths.append((socket_path(), False))
+    if not os.environ.get("UIPRO_DAEMON_SOCKET"):
+        paths.append((runtime_dir(), True))
+    for path, private in paths:
+        problem = _foreign(path, private)
+        if problem:
+            raise DaemonUnavailable(problem)
+
+
+# ============ CLIENT ============
+def _connect(timeout: float) -> socket.socket:
+    _check_paths()
+    try:
+        if USE_UNIX_SOCKET:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path()))
+        else:
+            sock = socket.create_connection(("127.0.0.1", tcp_port()), timeout=timeout)
+    except OSError as e:
+        raise DaemonUnavailable(str(e)) from e
+    return sock
+
+
+def _read_token() -> str:
+    try:
+        return token_path().read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""  # daemons predating tokens write none
+
+
+def call(op: str, timeout: float = REQUEST_TIMEOUT, **args):
+    """
+    Send one request to the daemon and return its result.
+
+    Raises DaemonUnavailable if nothing is listening (or its files belong to
+    another user), RuntimeError if the daemon reported an error.
+    """
+    sock = _connect(CONNECT_TIMEOUT)
+    token = _read_token()
+    try:
+        sock.settimeout(timeout)
+        request = {"op": op, "token": token, "args": args}
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    except OSError as e:
+        raise DaemonUnavailable(str(e)) from e
+    finally:
+        sock.close()
+
+    if not line:
+        raise DaemonUnavailable("daemon closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def protocol():
+    """
+    Protocol version of the listening daemon: None if nothing answers, 1 for
+    daemons predating versioning, 0 if the daemon refused the ping.
+    """
+    try:
+        result = call("ping", timeout=CONNECT_TIMEOUT * 4)
+    except (DaemonUnavailable, ValueError):
+        return None
+    except RuntimeError:
+        return 0
+    return result.get("protocol", 1) if isinstance(result, dict) else 1
+
+
+def is_running() -> bool:
+    """True if a daemon speaking this client's protocol is listening"""
+    return protocol() == PROTOCOL_VERSION
+
+
+# ============ SERVER ============
+HANDLERS = {}  # op -> function, filled by _load_handlers() when the daemon starts
+
+
+def _load_handlers():
+    """Import the search modules (only the daemon process needs them) and register the ops"""
+    from core import CSV_CONFIG, query_cache_stats, search, search_stack, search_many, search_stack_many
+    from design_system import generate_design_system
+
+    def checked_search(query, domain=None, **kwargs):
+        # Clients no longer validate --domain themselves; refuse instead of searching "style"
+        if domain is not None and domain not in CSV_CONFIG:
+            raise ValueError(f"Unknown domain: {domain}")
+        return search(query, domain, **kwargs)
+
+    HANDLERS.update({
+        "ping": lambda: {"protocol": PROTOCOL_VERSION},
+        "search": checked_search,
+        "search_stack": search_stack,
+        "search_many": search_many,
+        "search_stack_many": search_stack_many,
+        "generate_design_system": generate_design_system,
+        "query_cache_stats": query_cache_stats,
+    })
+
+
+def _rejection(request, token: str):
+    """Error for a request that ends the connection, or None if it is well-formed and authorized"""
+    if not isinstance(request, dict) or not isinstance(request.get("op"), str):
+        return "Malformed request"
+    if not isinstance(request.get("args", {}), dict):
+        return "Malformed request"
+    sent = request.get("token")
+    if not isinstance(sent, str) or not hmac.compare_digest(sent.encode("utf-8"), token.encode("utf-8")):
+        return "Unauthorized"
+    return None
+
+
+async def _handle_client(reader, writer, stop, token: str):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            rejection = _rejection(request, token)
+            if rejection:
+                writer.write(json.dumps({"error": rejection}).encode("utf-8") + b"\n")
+                await writer.drain()
+                break
+
+            try:
+                op = request["op"]
+                args = request.get("args", {})
+                if op == "shutdown":
+                    response = {"result": "bye"}
+                    stop.set()
+                elif op not in HANDLERS:
+                    response = {"error": f"Unknown op: {op}"}
+                elif not USE_UNIX_SOCKET and any(args.get(name) for name in TCP_FORBIDDEN_ARGS):
+                    response = {"error": f"{', '.join(TCP_FORBIDDEN_ARGS)} are not accepted over TCP"}
+                else:
+                    # Scoring and file I/O run on worker threads so requests overlap
+                    result = await loop.run_in_executor(None, partial(HANDLERS[op], **args))
+                    response = {"result": result}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass  # ValueError: a line longer than MAX_LINE
+    finally:
+        writer.close()
+
+
+def _make_runtime_dir():
+    """Create runtime_dir() with mode 0700, or check an existing one; OSError if another user controls it"""
+    if os.environ.get("UIPRO_DAEMON_SOCKET"):
+        return
+    path = runtime_dir()
+    try:
+        os.mkdir(path, 0o700)  # fails if it exists, so a planted directory is never adopted unchecked
+    except FileExistsError:
+        problem = _foreign(path, private=True)
+        if problem:
+            raise PermissionError(problem) from None
+
+
+def _remove_stale(path: Path):
+    """Remove a leftover socket or token file; OSError with a clear reason if it is not ours"""
+    problem = _foreign(path)
+    if problem:
+        raise PermissionError(f"{problem}; remove it or set UIPRO_DAEMON_SOCKET")
+    if path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _write_token() -> str:
+    """Create a fresh token file readable only by this user"""
+    token = secrets.token_hex(32)
+    path = token_path()
+    _remove_stale(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    return token
+
+
+async def _serve(token: str):
+    import asyncio
+    stop = asyncio.Event()
+    handler = partial(_handle_client, stop=stop, token=token)
+
+    try:
+        if USE_UNIX_SOCKET:
+            path = socket_path()
+            server = await asyncio.start_unix_server(handler, path=str(path), limit=MAX_LINE)
+            os.chmod(path, 0o600)
+            address = str(path)
+        else:
+            server = await asyncio.start_server(handler, host="127.0.0.1", port=tcp_port(), limit=MAX_LINE)
+            address = f"127.0.0.1:{tcp_port()}"
+
+        print(f"UI Pro Max daemon listening on {address}", file=sys.stderr, flush=True)
+        async with server:
+            await stop.wait()
+    finally:
+        if USE_UNIX_SOCKET and socket_path().exists():
+            socket_path().unlink()
+        if token_path().exists():
+            token_path().unlink()
+
+
+def serve() -> bool:
+    """Preload every index and serve requests until shutdown or Ctrl-C; False if the daemon could not start."""
+    import asyncio
+    running = protocol()
+    if running == PROTOCOL_VERSION:
+        print("UI Pro Max daemon is already running", file=sys.stderr)
+        return False
+    if running is not None:
+        print(f"An incompatible UI Pro Max daemon (protocol {running}) is listening; stop it first", file=sys.stderr)
+        return False
+    try:
+        _make_runtime_dir()
+        if USE_UNIX_SOCKET:
+            _remove_stale(socket_path())  # left by a daemon that did not exit cleanly
+        token = _write_token()
+    except OSError as e:
+        print(f"Cannot start the UI Pro Max daemon: {e}", file=sys.stderr)
+        return False
+
+    _load_handlers()
+    from core import preload_indexes
+    preload_indexes()
+    try:
+        asyncio.run(_serve(token))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Cannot start the UI Pro Max daemon: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def stop():
+    """
+    Ask a running daemon to exit: True once it accepted, None if none was
+    running, False if it refused (the reason is printed to stderr).
+    """
+    try:
+        call("shutdown", timeout=CONNECT_TIMEOUT * 4)
+        return True
+    except DaemonUnavailable:
+        return None
+    except RuntimeError as e:
+        print(f"The UI Pro Max daemon refused to stop: {e}", file=sys.stderr)
+        return False
@@ -13,12 +13,21 @@ Usage:
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
 """
 
-import csv
+import atexit
+import hashlib
 import json
 import os
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import accumulate
 from pathlib import Path
-from core import search, DATA_DIR
+import core
+from core import search, search_domains, load_rows, rerank, DATA_DIR, KeywordMatcher, SearchContext
 
 
 # ============ CONFIGURATION ============
@@ -32,129 +41,258 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+# How _multi_domain_search fans out its per-domain searches: "serial" runs them
+# one by one, "thread" overlaps cold index loads that wait on disk, "process"
+# runs them in worker processes that each keep their own loaded indexes, for
+# corpora large enough that scoring dominates. UIPRO_SEARCH_WORKERS caps the
+# number of threads / processes (default: one per domain). No call uses more
+# than MAX_POOL_WORKERS, which also bounds the worker processes kept alive.
+SEARCH_EXECUTOR = os.environ.get("UIPRO_SEARCH_EXECUTOR", "serial")
+SEARCH_WORKERS = int(os.environ.get("UIPRO_SEARCH_WORKERS", "0")) or len(SEARCH_CONFIG)
+MAX_POOL_WORKERS = max(SEARCH_WORKERS, len(SEARCH_CONFIG))
+
+# Briefs generated concurrently by generate_design_systems()
+BATCH_WORKERS = 4
+
+# persist_design_system() records what each file was rendered from in this
+# manifest and skips files whose inputs and on-disk content are unchanged.
+# Bump PERSIST_FORMAT_VERSION when a formatter's output changes.
+PERSIST_MANIFEST = ".manifest.json"
+PERSIST_FORMAT_VERSION = 1
+PAGE_OVERRIDE_DOMAINS = ["style", "ux", "landing"]
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def _executor(kind: str, workers: int, slot: int = 0):
+    """
+    Shared pool, created on first use and shut down at exit.
+
+    Thread pools are keyed by size. Process pools are single-worker slots
+    keyed by slot alone, whatever worker count the call uses, so a
+    long-running process keeps at most MAX_POOL_WORKERS worker processes.
+    """
+    key = ("process", slot) if kind == "process" else ("thread", workers)
+    with _EXECUTORS_LOCK:
+        pool = _EXECUTORS.get(key)
+        if pool is None:
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=1)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers)
+            _EXECUTORS[key] = pool
+        return pool
+
+
+def _shutdown_executors():
+    """Shut down every shared pool, dropping searches not yet started"""
+    with _EXECUTORS_LOCK:
+        pools = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_executors)
+
+
+def _run_job(search_fn, job: tuple) -> dict:
+    query, domain, max_results, scores = job
+    return search_fn(query, domain, max_results, scores=scores)
+
+
+def run_searches(jobs: list, executor: str = None, workers: int = None, search_fn=search) -> list:
+    """
+    Run search_fn(query, domain, max_results, scores=scores) for each job tuple, fanned out per executor.
+
+    Results come back in job order whatever order the searches finish in.
+    Thread mode runs inline once every index is loaded, as only cold loads
+    gain from overlapping. Process mode sends each domain to the same worker
+    every time (slot by position in SEARCH_CONFIG), so that worker's indexes
+    stay warm between calls.
+    """
+    executor = executor or SEARCH_EXECUTOR
+    workers = min(workers or SEARCH_WORKERS, len(jobs), MAX_POOL_WORKERS)
+    if executor == "thread":
+        loaded = set(core.INDEX_REGISTRY.keys())
+        if all(("domain", job[1]) in loaded for job in jobs):
+            executor = "serial"
+    if executor not in ("thread", "process") or workers < 2:
+        return [_run_job(search_fn, job) for job in jobs]
+
+    if executor == "thread":
+        return list(_executor("thread", workers).map(partial(_run_job, search_fn), jobs))
+    slots = list(SEARCH_CONFIG)
+    futures = []
+    for i, job in enumerate(jobs):
+        slot = (slots.index(job[1]) if job[1] in slots else i) % workers
+        futures.append(_executor("process", workers, slot).submit(_run_job, search_fn, job))
+    return [future.result() for future in futures]
+
+
+DEFAULT_REASONING = {
+    "pattern": "Hero + Features + CTA",
+    "style_priority": ["Minimalism", "Flat Design"],
+    "color_mood": "Professional",
+    "typography_mood": "Clean",
+    "key_effects": "Subtle hover transitions",
+    "anti_patterns": "",
+    "decision_rules": {},
+    "severity": "MEDIUM"
+}
+
+
+# ============ REASONING RULES ============
+class ReasoningTable:
+    """
+    ui-reasoning.csv compiled for rule lookup by category.
+
+    Lookup order matches a scan of the rows: exact UI_Category, then partial
+    (category inside the query or query inside the category), then any
+    category word inside the query; the earliest rule wins in each pass.
+    Exact matches use a dict. The partial and word passes use KeywordMatchers,
+    and query-inside-category uses one find() over all categories joined.
+    Each rule's reasoning (Style_Priority split, Decision_Rules parsed) is
+    built once, and lookups are cached per category.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.reasoning = [self._compile_rule(rule) for rule in rules]
+        categories = [rule.get("UI_Category", "").lower() for rule in rules]
+
+        self._exact = {}
+        for i, ui_cat in enumerate(categories):
+            self._exact.setdefault(ui_cat, i)
+        self._empty = next((i for i, ui_cat in enumerate(categories) if not ui_cat), None)
+        self._contained = KeywordMatcher({i: [ui_cat] for i, ui_cat in enumerate(categories) if ui_cat})
+        self._haystack = "\0".join(categories)
+        self._starts = [0] + list(accumulate(len(ui_cat) + 1 for ui_cat in categories[:-1]))
+        self._words = KeywordMatcher({i: ui_cat.replace("/", " ").replace("-", " ").split()
+                                      for i, ui_cat in enumerate(categories)})
+        self._cache = {}
+
+    @staticmethod
+    def _compile_rule(rule: dict) -> dict:
+        decision_rules = {}
+        try:
+            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+        except json.JSONDecodeError:
+            pass
+
+        return {
+            "pattern": rule.get("Recommended_Pattern", ""),
+            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+            "color_mood": rule.get("Color_Mood", ""),
+            "typography_mood": rule.get("Typography_Mood", ""),
+            "key_effects": rule.get("Key_Effects", ""),
+            "anti_patterns": rule.get("Anti_Patterns", ""),
+            "decision_rules": decision_rules,
+            "severity": rule.get("Severity", "MEDIUM")
+        }
+
+    def find(self, category: str):
+        """Index of the rule matching category, or None."""
+        if category in self._cache:
+            return self._cache[category]
+
+        category_lower = category.lower()
+        index = self._exact.get(category_lower)
+        if index is None:
+            index = self._find_partial(category_lower)
+        if index is None:
+            index = next(iter(self._words.match(category_lower, spans=False)), None)
+        self._cache[category] = index
+        return index
+
+    def _find_partial(self, category_lower: str):
+        candidates = [self._empty, next(iter(self._contained.match(category_lower, spans=False)), None)]
+        if self.rules and "\0" not in category_lower:
+            pos = self._haystack.find(category_lower)
+            if pos >= 0:
+                candidates.append(bisect_right(self._starts, pos) - 1)
+        return min((i for i in candidates if i is not None), default=None)
+
+
+_REASONING_TABLE = None
+_REASONING_TABLE_LOCK = threading.Lock()
+
+
+def _reasoning_table(rules) -> ReasoningTable:
+    """Compiled table for the reasoning rows, rebuilt when the registry reloads them"""
+    global _REASONING_TABLE
+    with _REASONING_TABLE_LOCK:
+        if _REASONING_TABLE is None or _REASONING_TABLE.rules is not rules:
+            _REASONING_TABLE = ReasoningTable(rules)
+        return _REASONING_TABLE
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
+    def __init__(self, executor: str = None, workers: int = None, search_fn=search):
         self.reasoning_data = self._load_reasoning()
+        self.reasoning_table = _reasoning_table(self.reasoning_data)
+        self.executor = executor
+        self.workers = workers
+        self.search = search_fn
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
         filepath = DATA_DIR / REASONING_FILE
         if not filepath.exists():
             return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+        return load_rows(REASONING_FILE)
 
     def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
         """Execute searches across multiple domains."""
-        results = {}
+        if core.USE_UNIFIED_INDEX:
+            # One pass over the unified index; style gets its own priority query
+            limits = {d: c["max_results"] for d, c in SEARCH_CONFIG.items() if not (d == "style" and style_priority)}
+            results = search_domains(query, limits)
+            if style_priority:
+                combined_query = f"{query} {' '.join(style_priority[:2])}"
+                results["style"] = self.search(combined_query, "style", SEARCH_CONFIG["style"]["max_results"], scores=True)
+            return {domain: results[domain] for domain in SEARCH_CONFIG}
+
+        jobs = []
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                jobs.append((combined_query, domain, config["max_results"], True))
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                # Style results are re-ranked by score in _select_best_match
+                jobs.append((query, domain, config["max_results"], domain == "style"))
+        return dict(zip(SEARCH_CONFIG, run_searches(jobs, self.executor, self.workers, self.search)))
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        index = self.reasoning_table.find(category)
+        return self.reasoning_data[index] if index is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
-
-        if not rule:
-            return {
-                "pattern": "Hero + Features + CTA",
-                "style_priority": ["Minimalism", "Flat Design"],
-                "color_mood": "Professional",
-                "typography_mood": "Clean",
-                "key_effects": "Subtle hover transitions",
-                "anti_patterns": "",
-                "decision_rules": {},
-                "severity": "MEDIUM"
-            }
-
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
+        index = self.reasoning_table.find(category)
+        reasoning = self.reasoning_table.reasoning[index] if index is not None else DEFAULT_REASONING
 
-        return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
-        }
+        # Copies, so callers may modify the lists/dicts they get back
+        return dict(reasoning, style_priority=list(reasoning["style_priority"]),
+                    decision_rules=dict(reasoning["decision_rules"]))
 
-    def _select_best_match(self, results: list, priority_keywords: list) -> dict:
-        """Select best matching result based on priority keywords."""
+    def _select_best_match(self, search_result: dict, priority_keywords: list) -> dict:
+        """Select best matching result based on priority keywords and search scores."""
+        results = self._extract_results(search_result)
         if not results:
             return {}
 
         if not priority_keywords:
             return results[0]
 
-        # First: try exact style name match
-        for priority in priority_keywords:
-            priority_lower = priority.lower().strip()
-            for result in results:
-                style_name = result.get("Style Category", "").lower()
-                if priority_lower in style_name or style_name in priority_lower:
-                    return result
-
-        # Second: score by keyword match in all fields
-        scored = []
-        for result in results:
-            result_str = str(result).lower()
-            score = 0
-            for kw in priority_keywords:
-                kw_lower = kw.lower().strip()
-                # Higher score for style name match
-                if kw_lower in result.get("Style Category", "").lower():
-                    score += 10
-                # Lower score for keyword field match
-                elif kw_lower in result.get("Keywords", "").lower():
-                    score += 3
-                # Even lower for other field matches
-                elif kw_lower in result_str:
-                    score += 1
-            scored.append((score, result))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0][1] if scored and scored[0][0] > 0 else results[0]
+        return rerank(search_result, priority_keywords, top_n=1)[0]
 
     def _extract_results(self, search_result: dict) -> list:
         """Extract results list from search result dict."""
@@ -163,7 +301,7 @@ class DesignSystemGenerator:
     def generate(self, query: str, project_name: str = None) -> dict:
         """Generate complete design system recommendation."""
         # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        product_result = self.search(query, "product", 1)
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
@@ -178,12 +316,11 @@ class DesignSystemGenerator:
         search_results["product"] = product_result  # Reuse product search
 
         # Step 4: Select best matches from each domain using priority
-        style_results = self._extract_results(search_results.get("style", {}))
         color_results = self._extract_results(search_results.get("color", {}))
         typography_results = self._extract_results(search_results.get("typography", {}))
         landing_results = self._extract_results(search_results.get("landing", {}))
 
-        best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
+        best_style = self._select_best_match(search_results.get("style", {}), reasoning.get("style_priority", []))
         best_color = color_results[0] if color_results else {}
         best_typography = typography_results[0] if typography_results else {}
         best_landing = landing_results[0] if landing_results else {}
@@ -239,113 +376,158 @@ class DesignSystemGenerator:
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
-    project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
-    effects = design_system.get("key_effects", "")
-    anti_patterns = design_system.get("anti_patterns", "")
-
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
+
+class _FormatContext:
+    """Fields of one design system as the formatters read them."""
+
+    __slots__ = ("design_system", "project", "pattern", "style", "colors", "typography", "effects",
+                 "anti_patterns", "timestamp")
+
+    def __init__(self, design_system: dict, timestamp: str = None):
+        self.design_system = design_system
+        self.project = design_system.get("project_name", "PROJECT")
+        self.pattern = design_system.get("pattern", {})
+        self.style = design_system.get("style", {})
+        self.colors = design_system.get("colors", {})
+        self.typography = design_system.get("typography", {})
+        self.effects = design_system.get("key_effects", "")
+        self.anti_patterns = design_system.get("anti_patterns", "")
+        self.timestamp = timestamp
+
+
+class _Template:
+    """
+    A line layout compiled once and rendered with a single join.
+
+    parts are static lines (str) or section functions taking a
+    _FormatContext and returning a list of lines. Runs of static lines are
+    pre-joined into one piece at compile time.
+    """
+
+    def __init__(self, parts: list):
+        self._pieces = []
+        static = []
+        for part in parts:
+            if isinstance(part, str):
+                static.append(part)
+                continue
+            if static:
+                self._pieces.append("\n".join(static))
+                static = []
+            self._pieces.append(part)
+        if static:
+            self._pieces.append("\n".join(static))
+
+    def render(self, ctx: _FormatContext) -> str:
+        out = []
+        for piece in self._pieces:
+            if piece.__class__ is str:
+                out.append(piece)
             else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
+                out.extend(piece(ctx))
+        return "\n".join(out)
 
-    # Build sections from pattern
-    sections = pattern.get("sections", "").split(">")
-    sections = [s.strip() for s in sections if s.strip()]
 
-    # Build output lines
+@lru_cache(maxsize=4096)
+def _wrap_text(text: str, prefix: str, width: int) -> tuple:
+    """Greedy word wrap to lines of at most width - 2 characters, each starting with prefix."""
     lines = []
-    w = BOX_WIDTH - 1
+    words = []
+    length = len(prefix)
+    for word in text.split():
+        if length + len(word) + 1 <= width - 2:
+            length += len(word) + (1 if words else 0)
+            words.append(word)
+        else:
+            if words:
+                lines.append(prefix + " ".join(words))
+            words = [word]
+            length = len(prefix) + len(word)
+    if words:
+        lines.append(prefix + " ".join(words))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=4096)
+def _boxed_wrap(text: str, width: int) -> tuple:
+    """Wrapped box lines for text, padded to the box edge."""
+    return tuple(line.ljust(width) + "|" for line in _wrap_text(text, "|     ", width))
+
+
+@lru_cache(maxsize=None)
+def _ascii_box_template(width: int) -> _Template:
+    border = "+" + "-" * (width - 1) + "+"
+    blank = "|" + " " * width + "|"
+
+    def box(text):
+        return text.ljust(width) + "|"
+
+    def header(c):
+        return [box(f"|  TARGET: {c.project} - RECOMMENDED DESIGN SYSTEM")]
+
+    def pattern_section(c):
+        pattern = c.pattern
+        lines = [box(f"|  PATTERN: {pattern.get('name', '')}")]
+        if pattern.get('conversion'):
+            lines.append(box(f"|     Conversion: {pattern.get('conversion', '')}"))
+        if pattern.get('cta_placement'):
+            lines.append(box(f"|     CTA: {pattern.get('cta_placement', '')}"))
+        lines.append(box("|     Sections:"))
+        sections = [s.strip() for s in pattern.get("sections", "").split(">") if s.strip()]
+        for i, section in enumerate(sections, 1):
+            lines.append(box(f"|       {i}. {section}"))
+        return lines
 
-    lines.append("+" + "-" * w + "+")
-    lines.append(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|")
-    lines.append("+" + "-" * w + "+")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+    def style_section(c):
+        style = c.style
+        lines = [box(f"|  STYLE: {style.get('name', '')}")]
+        if style.get("keywords"):
+            lines.extend(_boxed_wrap(f"Keywords: {style.get('keywords', '')}", width))
+        if style.get("best_for"):
+            lines.extend(_boxed_wrap(f"Best For: {style.get('best_for', '')}", width))
+        if style.get("performance") or style.get("accessibility"):
+            perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
+            lines.append(box(f"|     {perf_a11y}"))
+        return lines
 
-    # Pattern section
-    lines.append(f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|")
-    if pattern.get('conversion'):
-        lines.append(f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|")
-    if pattern.get('cta_placement'):
-        lines.append(f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append("|     Sections:".ljust(BOX_WIDTH) + "|")
-    for i, section in enumerate(sections, 1):
-        lines.append(f"|       {i}. {section}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+    def colors_section(c):
+        colors = c.colors
+        lines = [
+            box(f"|     Primary:    {colors.get('primary', '')}"),
+            box(f"|     Secondary:  {colors.get('secondary', '')}"),
+            box(f"|     CTA:        {colors.get('cta', '')}"),
+            box(f"|     Background: {colors.get('background', '')}"),
+            box(f"|     Text:       {colors.get('text', '')}"),
+        ]
+        if colors.get("notes"):
+            lines.extend(_boxed_wrap(f"Notes: {colors.get('notes', '')}", width))
+        return lines
 
-    # Style section
-    lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
-    if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    if style.get("performance") or style.get("accessibility"):
-        perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Colors section
-    lines.append("|  COLORS:".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
-    if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+    def typography_section(c):
+        typography = c.typography
+        lines = [box(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}")]
+        if typography.get("mood"):
+            lines.extend(_boxed_wrap(f"Mood: {typography.get('mood', '')}", width))
+        if typography.get("best_for"):
+            lines.extend(_boxed_wrap(f"Best For: {typography.get('best_for', '')}", width))
+        if typography.get("google_fonts_url"):
+            lines.append(box(f"|     Google Fonts: {typography.get('google_fonts_url', '')}"))
+        if typography.get("css_import"):
+            lines.append(box(f"|     CSS Import: {typography.get('css_import', '')[:70]}..."))
+        return lines
+
+    def effects_and_anti_patterns(c):
+        lines = []
+        if c.effects:
+            lines.append(box("|  KEY EFFECTS:"))
+            lines.extend(_boxed_wrap(c.effects, width))
+            lines.append(blank)
+        if c.anti_patterns:
+            lines.append(box("|  AVOID (Anti-patterns):"))
+            lines.extend(_boxed_wrap(c.anti_patterns, width))
+            lines.append(blank)
+        return lines
 
-    # Typography section
-    lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
-    if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    if typography.get("google_fonts_url"):
-        lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
-    if typography.get("css_import"):
-        lines.append(f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Key Effects section
-    if effects:
-        lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Anti-patterns section
-    if anti_patterns:
-        lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
-
-    # Pre-Delivery Checklist section
-    lines.append("|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|")
     checklist_items = [
         "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
         "[ ] cursor-pointer on all clickable elements",
@@ -355,32 +537,41 @@ def format_ascii_box(design_system: dict) -> str:
         "[ ] prefers-reduced-motion respected",
         "[ ] Responsive: 375px, 768px, 1024px, 1440px"
     ]
-    for item in checklist_items:
-        lines.append(f"|     {item}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
 
-    lines.append("+" + "-" * w + "+")
+    return _Template([
+        border,
+        header,
+        border,
+        blank,
+        pattern_section,
+        blank,
+        style_section,
+        blank,
+        box("|  COLORS:"),
+        colors_section,
+        blank,
+        typography_section,
+        blank,
+        effects_and_anti_patterns,
+        box("|  PRE-DELIVERY CHECKLIST:"),
+        *[box(f"|     {item}") for item in checklist_items],
+        blank,
+        border,
+    ])
 
-    return "\n".join(lines)
 
+def format_ascii_box(design_system: dict) -> str:
+    """Format design system as ASCII box with emojis (MCP-style)."""
+    return _ascii_box_template(BOX_WIDTH).render(_FormatContext(design_system))
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
-    project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
-    effects = design_system.get("key_effects", "")
-    anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+def _markdown_header(c):
+    return [f"## Design System: {c.project}"]
+
 
-    # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
+def _markdown_pattern(c):
+    pattern = c.pattern
+    lines = [f"- **Name:** {pattern.get('name', '')}"]
     if pattern.get('conversion'):
         lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
     if pattern.get('cta_placement'):
@@ -388,36 +579,41 @@ def format_markdown(design_system: dict) -> str:
     if pattern.get('color_strategy'):
         lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
     lines.append(f"- **Sections:** {pattern.get('sections', '')}")
-    lines.append("")
+    return lines
 
-    # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
+
+def _markdown_style(c):
+    style = c.style
+    lines = [f"- **Name:** {style.get('name', '')}"]
     if style.get('keywords'):
         lines.append(f"- **Keywords:** {style.get('keywords', '')}")
     if style.get('best_for'):
         lines.append(f"- **Best For:** {style.get('best_for', '')}")
     if style.get('performance') or style.get('accessibility'):
         lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
-    lines.append("")
+    return lines
+
 
-    # Colors section
-    lines.append("### Colors")
-    lines.append(f"| Role | Hex |")
-    lines.append(f"|------|-----|")
-    lines.append(f"| Primary | {colors.get('primary', '')} |")
-    lines.append(f"| Secondary | {colors.get('secondary', '')} |")
-    lines.append(f"| CTA | {colors.get('cta', '')} |")
-    lines.append(f"| Background | {colors.get('background', '')} |")
-    lines.append(f"| Text | {colors.get('text', '')} |")
+def _markdown_colors(c):
+    colors = c.colors
+    lines = [
+        f"| Primary | {colors.get('primary', '')} |",
+        f"| Secondary | {colors.get('secondary', '')} |",
+        f"| CTA | {colors.get('cta', '')} |",
+        f"| Background | {colors.get('background', '')} |",
+        f"| Text | {colors.get('text', '')} |",
+    ]
     if colors.get("notes"):
         lines.append(f"\n*Notes: {colors.get('notes', '')}*")
-    lines.append("")
+    return lines
 
-    # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
+
+def _markdown_typography(c):
+    typography = c.typography
+    lines = [
+        f"- **Heading:** {typography.get('heading', '')}",
+        f"- **Body:** {typography.get('body', '')}",
+    ]
     if typography.get("mood"):
         lines.append(f"- **Mood:** {typography.get('mood', '')}")
     if typography.get("best_for"):
@@ -425,37 +621,53 @@ def format_markdown(design_system: dict) -> str:
     if typography.get("google_fonts_url"):
         lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
     if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
-    lines.append("")
+        lines.extend(["- **CSS Import:**", "```css", f"{typography.get('css_import', '')}", "```"])
+    return lines
 
-    # Key Effects section
-    if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
 
-    # Anti-patterns section
-    if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
+def _markdown_effects_and_anti_patterns(c):
+    lines = []
+    if c.effects:
+        lines.extend(["### Key Effects", f"{c.effects}", ""])
+    if c.anti_patterns:
         newline_bullet = '\n- '
-        lines.append(f"- {anti_patterns.replace(' + ', newline_bullet)}")
-        lines.append("")
-
-    # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
+        lines.extend(["### Avoid (Anti-patterns)", f"- {c.anti_patterns.replace(' + ', newline_bullet)}", ""])
+    return lines
+
+
+_MARKDOWN_TEMPLATE = _Template([
+    _markdown_header,
+    "",
+    "### Pattern",
+    _markdown_pattern,
+    "",
+    "### Style",
+    _markdown_style,
+    "",
+    "### Colors",
+    "| Role | Hex |",
+    "|------|-----|",
+    _markdown_colors,
+    "",
+    "### Typography",
+    _markdown_typography,
+    "",
+    _markdown_effects_and_anti_patterns,
+    "### Pre-Delivery Checklist",
+    "- [ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+    "- [ ] cursor-pointer on all clickable elements",
+    "- [ ] Hover states with smooth transitions (150-300ms)",
+    "- [ ] Light mode: text contrast 4.5:1 minimum",
+    "- [ ] Focus states visible for keyboard nav",
+    "- [ ] prefers-reduced-motion respected",
+    "- [ ] Responsive: 375px, 768px, 1024px, 1440px",
+    "",
+])
 
-    return "\n".join(lines)
+
+def format_markdown(design_system: dict) -> str:
+    """Format design system as markdown."""
+    return _MARKDOWN_TEMPLATE.render(_FormatContext(design_system))
 
 
 # ============ MAIN ENTRY POINT ============
@@ -487,19 +699,184 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     return format_ascii_box(design_system)
 
 
+class _SharedSearch:
+    """search() shared by concurrent briefs: each distinct call runs once, repeats wait for it"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __call__(self, query, domain=None, max_results=core.MAX_RESULTS, scores=False):
+        key = (query, domain, max_results, scores)
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(search(query, domain, max_results, scores=scores))
+            except Exception as e:
+                future.set_exception(e)
+        result = future.result()
+        return dict(result, results=[dict(row) for row in result.get("results", [])])
+
+
+def _parse_brief(brief, project_name: str = None, page: str = None) -> dict:
+    """
+    A brief is a query string or a dict with "query" and optional "project_name", "page";
+    project_name and page fill in fields the brief omits. Raises ValueError for anything else.
+    """
+    if isinstance(brief, str):
+        brief = {"query": brief}
+    elif not isinstance(brief, dict):
+        raise ValueError("expected a query string or an object with a \"query\"")
+    parsed = {
+        "query": brief.get("query", ""),
+        "project_name": brief.get("project_name", project_name),
+        "page": brief.get("page", page)
+    }
+    for field, value in parsed.items():
+        if not isinstance(value, str) and not (value is None and field != "query"):
+            raise ValueError(f"{field} must be a string")
+    return parsed
+
+
+def generate_design_systems(briefs: list, output_format: str = "ascii", persist: bool = False,
+                            output_dir: str = None, workers: int = None, on_result=None,
+                            project_name: str = None, page: str = None) -> list:
+    """
+    Generate design systems for many briefs in one run.
+
+    Briefs run on a thread pool sharing the loaded indexes, and identical
+    searches across briefs (same query, domain and limit) run once.
+
+    Args:
+        briefs: Query strings or dicts with "query" and optional "project_name", "page"
+        output_format: "ascii" (default) or "markdown"
+        persist: If True, save each design system as soon as its brief finishes
+        output_dir: Optional output directory (defaults to current working directory)
+        workers: Briefs generated concurrently (defaults to BATCH_WORKERS)
+        on_result: Optional callback receiving each result as its brief finishes
+        project_name: Project name for briefs that give none
+        page: Page override for briefs that give none
+
+    Returns:
+        One dict per brief, in input order: index, query, project_name, output,
+        files and elapsed_ms, or index, query, error and elapsed_ms on failure
+        (including briefs that are not valid)
+    """
+    shared_search = _SharedSearch()
+    persist_lock = threading.Lock()
+
+    def run(index, brief):
+        start = time.perf_counter()
+        try:
+            brief = _parse_brief(brief, project_name, page)
+        except ValueError as e:
+            query = brief.get("query") if isinstance(brief, dict) else brief
+            return {"index": index, "query": query if isinstance(query, str) else json.dumps(query),
+                    "error": f"Invalid brief: {e}", "elapsed_ms": 0.0}
+        try:
+            generator = DesignSystemGenerator(executor="serial", search_fn=shared_search)
+            design_system = generator.generate(brief["query"], brief["project_name"])
+            files = []
+            if persist:
+                # Briefs may share a project folder; write one at a time
+                with persist_lock:
+                    files = persist_design_system(design_system, brief["page"], output_dir, brief["query"])["created_files"]
+            output = format_markdown(design_system) if output_format == "markdown" else format_ascii_box(design_system)
+            result = {"index": index, "query": brief["query"], "project_name": design_system["project_name"],
+                      "output": output, "files": files}
+        except Exception as e:
+            result = {"index": index, "query": brief["query"], "error": f"{type(e).__name__}: {e}"}
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    results = [None] * len(briefs)
+    with ThreadPoolExecutor(max_workers=workers or BATCH_WORKERS) as pool:
+        futures = [pool.submit(run, i, brief) for i, brief in enumerate(briefs)]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["index"]] = result
+            if on_result:
+                on_result(result)
+    return results
+
+
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def _content_hash(data) -> str:
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _data_stamps(domains: list) -> list:
+    """(file, mtime_ns, size) of the CSVs behind domains, so data edits change input hashes"""
+    stamps = []
+    for domain in domains:
+        filepath = DATA_DIR / core.CSV_CONFIG[domain]["file"]
+        if filepath.exists():
+            st = filepath.stat()
+            stamps.append((filepath.name, st.st_mtime_ns, st.st_size))
+    return stamps
+
+
+def _read_manifest(design_system_dir: Path) -> dict:
+    try:
+        with open(design_system_dir / PERSIST_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != PERSIST_FORMAT_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write via a temp file in the same directory and rename, so readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _file_hash(path: Path):
+    try:
+        return _content_hash(path.read_bytes())
+    except OSError:
+        return None
+
+
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None,
+                          pages: list = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
+
+    Files are content-addressed: a manifest stores the hash of each file's
+    inputs and of its rendered content, and a file whose inputs are unchanged
+    and whose content on disk still matches is neither rendered nor written.
+    Changed files are written atomically, and concurrently when several
+    are due. Page overrides share one SearchContext over page_query, so the
+    project-level retrieval runs once and each page scores only its name.
     
     Args:
         design_system: The generated design system dictionary
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        pages: Optional further page names, persisted in the same pass with the same page_query
     
     Returns:
-        dict with created file paths and status
+        dict with status, the project's file paths (created_files) and which
+        of them were written or left unchanged
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -510,306 +887,371 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     design_system_dir = base_dir / "design-system" / project_slug
     pages_dir = design_system_dir / "pages"
     
-    created_files = []
-    
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
-    
-    master_file = design_system_dir / "MASTER.md"
-    
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
-    
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+
+    # (path relative to the project folder, input key, renderer)
+    targets = [("MASTER.md", ["master", design_system], lambda: format_master_md(design_system))]
+    # Pages sharing a file name are persisted once, as the first of them
+    page_files = {}
+    for name in ([page] if page else []) + [name for name in (pages or []) if name]:
+        page_files.setdefault(f"pages/{name.lower().replace(' ', '-')}.md", name)
+    if page_files:
+        stamps = _data_stamps(PAGE_OVERRIDE_DOMAINS)
+        context = SearchContext((page_query or "").lower())
+    for rel, name in page_files.items():
+        # If page is specified, create page override file with intelligent content
+        targets.append((rel,
+                        ["page", design_system, name, page_query, stamps],
+                        lambda name=name: format_page_override_md(design_system, name, page_query, context)))
+
+    old_manifest = _read_manifest(design_system_dir)
+    manifest = {}
+    created_files, written, unchanged = [], [], []
+    due = []
+    for rel, inputs, render in targets:
+        path = design_system_dir / rel
+        input_hash = _content_hash(inputs)
+        entry = old_manifest.get(rel)
+        if entry and entry.get("input") == input_hash and _file_hash(path) == entry.get("output"):
+            manifest[rel] = entry
+            unchanged.append(str(path))
+        else:
+            due.append((rel, path, input_hash, render))
+        created_files.append(str(path))
+
+    def write(job):
+        _, path, _, render = job
+        data = render().encode("utf-8")
+        _write_atomic(path, data)
+        return _content_hash(data)
+
+    if len(due) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(due), BATCH_WORKERS)) as pool:
+            output_hashes = list(pool.map(write, due))
+    else:
+        output_hashes = [write(job) for job in due]
+    for (rel, path, input_hash, _), output_hash in zip(due, output_hashes):
+        manifest[rel] = {"input": input_hash, "output": output_hash}
+        written.append(str(path))
+
+    # Keep entries for pages persisted by earlier runs
+    for rel, entry in old_manifest.items():
+        manifest.setdefault(rel, entry)
+    if written or manifest != old_manifest:
+        data = json.dumps({"version": PERSIST_FORMAT_VERSION, "files": manifest}, indent=2, sort_keys=True)
+        _write_atomic(design_system_dir / PERSIST_MANIFEST, data.encode("utf-8"))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "written_files": written,
+        "unchanged_files": unchanged
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
-    project = design_system.get("project_name", "PROJECT")
-    pattern = design_system.get("pattern", {})
-    style = design_system.get("style", {})
-    colors = design_system.get("colors", {})
-    typography = design_system.get("typography", {})
-    effects = design_system.get("key_effects", "")
-    anti_patterns = design_system.get("anti_patterns", "")
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    lines = []
-    
-    # Logic header
-    lines.append("# Design System Master File")
-    lines.append("")
-    lines.append("> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.")
-    lines.append("> If that file exists, its rules **override** this Master file.")
-    lines.append("> If not, strictly follow the rules below.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append(f"**Project:** {project}")
-    lines.append(f"**Generated:** {timestamp}")
-    lines.append(f"**Category:** {design_system.get('category', 'General')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
-    # Global Rules section
-    lines.append("## Global Rules")
-    lines.append("")
-    
-    # Color Palette
-    lines.append("### Color Palette")
-    lines.append("")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    lines.append(f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |")
-    lines.append(f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |")
-    lines.append(f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |")
-    lines.append(f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |")
-    lines.append(f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |")
-    lines.append("")
+def _master_header(c):
+    return [
+        f"**Project:** {c.project}",
+        f"**Generated:** {c.timestamp}",
+        f"**Category:** {c.design_system.get('category', 'General')}",
+    ]
+
+
+def _master_palette_and_typography(c):
+    colors = c.colors
+    typography = c.typography
+    lines = [
+        f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |",
+        f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |",
+        f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |",
+        f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |",
+        f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |",
+        "",
+    ]
     if colors.get("notes"):
-        lines.append(f"**Color Notes:** {colors.get('notes', '')}")
-        lines.append("")
-    
-    # Typography
-    lines.append("### Typography")
-    lines.append("")
-    lines.append(f"- **Heading Font:** {typography.get('heading', 'Inter')}")
-    lines.append(f"- **Body Font:** {typography.get('body', 'Inter')}")
+        lines.extend([f"**Color Notes:** {colors.get('notes', '')}", ""])
+
+    lines.extend([
+        "### Typography",
+        "",
+        f"- **Heading Font:** {typography.get('heading', 'Inter')}",
+        f"- **Body Font:** {typography.get('body', 'Inter')}",
+    ])
     if typography.get("mood"):
         lines.append(f"- **Mood:** {typography.get('mood', '')}")
     if typography.get("google_fonts_url"):
         lines.append(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})")
     lines.append("")
     if typography.get("css_import"):
-        lines.append("**CSS Import:**")
-        lines.append("```css")
-        lines.append(typography.get("css_import", ""))
-        lines.append("```")
-        lines.append("")
-    
-    # Spacing Variables
-    lines.append("### Spacing Variables")
-    lines.append("")
-    lines.append("| Token | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--space-xs` | `4px` / `0.25rem` | Tight gaps |")
-    lines.append("| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |")
-    lines.append("| `--space-md` | `16px` / `1rem` | Standard padding |")
-    lines.append("| `--space-lg` | `24px` / `1.5rem` | Section padding |")
-    lines.append("| `--space-xl` | `32px` / `2rem` | Large gaps |")
-    lines.append("| `--space-2xl` | `48px` / `3rem` | Section margins |")
-    lines.append("| `--space-3xl` | `64px` / `4rem` | Hero padding |")
-    lines.append("")
-    
-    # Shadow Depths
-    lines.append("### Shadow Depths")
-    lines.append("")
-    lines.append("| Level | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |")
-    lines.append("| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |")
-    lines.append("| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |")
-    lines.append("| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |")
-    lines.append("")
-    
-    # Component Specs section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Component Specs")
-    lines.append("")
-    
-    # Buttons
-    lines.append("### Buttons")
-    lines.append("")
-    lines.append("```css")
-    lines.append("/* Primary Button */")
-    lines.append(".btn-primary {")
-    lines.append(f"  background: {colors.get('cta', '#F97316')};")
-    lines.append("  color: white;")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".btn-primary:hover {")
-    lines.append("  opacity: 0.9;")
-    lines.append("  transform: translateY(-1px);")
-    lines.append("}")
-    lines.append("")
-    lines.append("/* Secondary Button */")
-    lines.append(".btn-secondary {")
-    lines.append(f"  background: transparent;")
-    lines.append(f"  color: {colors.get('primary', '#2563EB')};")
-    lines.append(f"  border: 2px solid {colors.get('primary', '#2563EB')};")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Cards
-    lines.append("### Cards")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".card {")
-    lines.append(f"  background: {colors.get('background', '#FFFFFF')};")
-    lines.append("  border-radius: 12px;")
-    lines.append("  padding: 24px;")
-    lines.append("  box-shadow: var(--shadow-md);")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".card:hover {")
-    lines.append("  box-shadow: var(--shadow-lg);")
-    lines.append("  transform: translateY(-2px);")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Inputs
-    lines.append("### Inputs")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".input {")
-    lines.append("  padding: 12px 16px;")
-    lines.append("  border: 1px solid #E2E8F0;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-size: 16px;")
-    lines.append("  transition: border-color 200ms ease;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".input:focus {")
-    lines.append(f"  border-color: {colors.get('primary', '#2563EB')};")
-    lines.append("  outline: none;")
-    lines.append(f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Modals
-    lines.append("### Modals")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".modal-overlay {")
-    lines.append("  background: rgba(0, 0, 0, 0.5);")
-    lines.append("  backdrop-filter: blur(4px);")
-    lines.append("}")
-    lines.append("")
-    lines.append(".modal {")
-    lines.append("  background: white;")
-    lines.append("  border-radius: 16px;")
-    lines.append("  padding: 32px;")
-    lines.append("  box-shadow: var(--shadow-xl);")
-    lines.append("  max-width: 500px;")
-    lines.append("  width: 90%;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Style section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Style Guidelines")
-    lines.append("")
-    lines.append(f"**Style:** {style.get('name', 'Minimalism')}")
-    lines.append("")
+        lines.extend(["**CSS Import:**", "```css", typography.get("css_import", ""), "```", ""])
+    return lines
+
+
+def _master_style_and_pattern(c):
+    style = c.style
+    pattern = c.pattern
+    lines = [f"**Style:** {style.get('name', 'Minimalism')}", ""]
     if style.get("keywords"):
-        lines.append(f"**Keywords:** {style.get('keywords', '')}")
-        lines.append("")
+        lines.extend([f"**Keywords:** {style.get('keywords', '')}", ""])
     if style.get("best_for"):
-        lines.append(f"**Best For:** {style.get('best_for', '')}")
-        lines.append("")
-    if effects:
-        lines.append(f"**Key Effects:** {effects}")
-        lines.append("")
-    
+        lines.extend([f"**Best For:** {style.get('best_for', '')}", ""])
+    if c.effects:
+        lines.extend([f"**Key Effects:** {c.effects}", ""])
+
     # Layout Pattern
-    lines.append("### Page Pattern")
-    lines.append("")
-    lines.append(f"**Pattern Name:** {pattern.get('name', '')}")
-    lines.append("")
+    lines.extend(["### Page Pattern", "", f"**Pattern Name:** {pattern.get('name', '')}", ""])
     if pattern.get('conversion'):
         lines.append(f"- **Conversion Strategy:** {pattern.get('conversion', '')}")
     if pattern.get('cta_placement'):
         lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
     lines.append(f"- **Section Order:** {pattern.get('sections', '')}")
-    lines.append("")
-    
+    return lines
+
+
+def _master_anti_patterns(c):
+    if not c.anti_patterns:
+        return []
+    return [f"- ❌ {anti}" for anti in (a.strip() for a in c.anti_patterns.split("+")) if anti]
+
+
+_MASTER_TEMPLATE = _Template([
+    # Logic header
+    "# Design System Master File",
+    "",
+    "> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.",
+    "> If that file exists, its rules **override** this Master file.",
+    "> If not, strictly follow the rules below.",
+    "",
+    "---",
+    "",
+    _master_header,
+    "",
+    "---",
+    "",
+
+    # Global Rules section
+    "## Global Rules",
+    "",
+
+    # Color Palette
+    "### Color Palette",
+    "",
+    "| Role | Hex | CSS Variable |",
+    "|------|-----|--------------|",
+    _master_palette_and_typography,
+
+    # Spacing Variables
+    "### Spacing Variables",
+    "",
+    "| Token | Value | Usage |",
+    "|-------|-------|-------|",
+    "| `--space-xs` | `4px` / `0.25rem` | Tight gaps |",
+    "| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |",
+    "| `--space-md` | `16px` / `1rem` | Standard padding |",
+    "| `--space-lg` | `24px` / `1.5rem` | Section padding |",
+    "| `--space-xl` | `32px` / `2rem` | Large gaps |",
+    "| `--space-2xl` | `48px` / `3rem` | Section margins |",
+    "| `--space-3xl` | `64px` / `4rem` | Hero padding |",
+    "",
+
+    # Shadow Depths
+    "### Shadow Depths",
+    "",
+    "| Level | Value | Usage |",
+    "|-------|-------|-------|",
+    "| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |",
+    "| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |",
+    "| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |",
+    "| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |",
+    "",
+
+    # Component Specs section
+    "---",
+    "",
+    "## Component Specs",
+    "",
+
+    # Buttons
+    "### Buttons",
+    "",
+    "```css",
+    "/* Primary Button */",
+    ".btn-primary {",
+    lambda c: [f"  background: {c.colors.get('cta', '#F97316')};"],
+    "  color: white;",
+    "  padding: 12px 24px;",
+    "  border-radius: 8px;",
+    "  font-weight: 600;",
+    "  transition: all 200ms ease;",
+    "  cursor: pointer;",
+    "}",
+    "",
+    ".btn-primary:hover {",
+    "  opacity: 0.9;",
+    "  transform: translateY(-1px);",
+    "}",
+    "",
+    "/* Secondary Button */",
+    ".btn-secondary {",
+    "  background: transparent;",
+    lambda c: [f"  color: {c.colors.get('primary', '#2563EB')};",
+               f"  border: 2px solid {c.colors.get('primary', '#2563EB')};"],
+    "  padding: 12px 24px;",
+    "  border-radius: 8px;",
+    "  font-weight: 600;",
+    "  transition: all 200ms ease;",
+    "  cursor: pointer;",
+    "}",
+    "```",
+    "",
+
+    # Cards
+    "### Cards",
+    "",
+    "```css",
+    ".card {",
+    lambda c: [f"  background: {c.colors.get('background', '#FFFFFF')};"],
+    "  border-radius: 12px;",
+    "  padding: 24px;",
+    "  box-shadow: var(--shadow-md);",
+    "  transition: all 200ms ease;",
+    "  cursor: pointer;",
+    "}",
+    "",
+    ".card:hover {",
+    "  box-shadow: var(--shadow-lg);",
+    "  transform: translateY(-2px);",
+    "}",
+    "```",
+    "",
+
+    # Inputs
+    "### Inputs",
+    "",
+    "```css",
+    ".input {",
+    "  padding: 12px 16px;",
+    "  border: 1px solid #E2E8F0;",
+    "  border-radius: 8px;",
+    "  font-size: 16px;",
+    "  transition: border-color 200ms ease;",
+    "}",
+    "",
+    ".input:focus {",
+    lambda c: [f"  border-color: {c.colors.get('primary', '#2563EB')};",
+               "  outline: none;",
+               f"  box-shadow: 0 0 0 3px {c.colors.get('primary', '#2563EB')}20;"],
+    "}",
+    "```",
+    "",
+
+    # Modals
+    "### Modals",
+    "",
+    "```css",
+    ".modal-overlay {",
+    "  background: rgba(0, 0, 0, 0.5);",
+    "  backdrop-filter: blur(4px);",
+    "}",
+    "",
+    ".modal {",
+    "  background: white;",
+    "  border-radius: 16px;",
+    "  padding: 32px;",
+    "  box-shadow: var(--shadow-xl);",
+    "  max-width: 500px;",
+    "  width: 90%;",
+    "}",
+    "```",
+    "",
+
+    # Style section
+    "---",
+    "",
+    "## Style Guidelines",
+    "",
+    _master_style_and_pattern,
+    "",
+
     # Anti-Patterns section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Anti-Patterns (Do NOT Use)")
-    lines.append("")
-    if anti_patterns:
-        anti_list = [a.strip() for a in anti_patterns.split("+")]
-        for anti in anti_list:
-            if anti:
-                lines.append(f"- ❌ {anti}")
-    lines.append("")
-    lines.append("### Additional Forbidden Patterns")
-    lines.append("")
-    lines.append("- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)")
-    lines.append("- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer")
-    lines.append("- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout")
-    lines.append("- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio")
-    lines.append("- ❌ **Instant state changes** — Always use transitions (150-300ms)")
-    lines.append("- ❌ **Invisible focus states** — Focus states must be visible for a11y")
-    lines.append("")
-    
+    "---",
+    "",
+    "## Anti-Patterns (Do NOT Use)",
+    "",
+    _master_anti_patterns,
+    "",
+    "### Additional Forbidden Patterns",
+    "",
+    "- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)",
+    "- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer",
+    "- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout",
+    "- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio",
+    "- ❌ **Instant state changes** — Always use transitions (150-300ms)",
+    "- ❌ **Invisible focus states** — Focus states must be visible for a11y",
+    "",
+
     # Pre-Delivery Checklist
-    lines.append("---")
-    lines.append("")
-    lines.append("## Pre-Delivery Checklist")
-    lines.append("")
-    lines.append("Before delivering any UI code, verify:")
-    lines.append("")
-    lines.append("- [ ] No emojis used as icons (use SVG instead)")
-    lines.append("- [ ] All icons from consistent icon set (Heroicons/Lucide)")
-    lines.append("- [ ] `cursor-pointer` on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard navigation")
-    lines.append("- [ ] `prefers-reduced-motion` respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("- [ ] No content hidden behind fixed navbars")
-    lines.append("- [ ] No horizontal scroll on mobile")
-    lines.append("")
-    
-    return "\n".join(lines)
+    "---",
+    "",
+    "## Pre-Delivery Checklist",
+    "",
+    "Before delivering any UI code, verify:",
+    "",
+    "- [ ] No emojis used as icons (use SVG instead)",
+    "- [ ] All icons from consistent icon set (Heroicons/Lucide)",
+    "- [ ] `cursor-pointer` on all clickable elements",
+    "- [ ] Hover states with smooth transitions (150-300ms)",
+    "- [ ] Light mode: text contrast 4.5:1 minimum",
+    "- [ ] Focus states visible for keyboard navigation",
+    "- [ ] `prefers-reduced-motion` respected",
+    "- [ ] Responsive: 375px, 768px, 1024px, 1440px",
+    "- [ ] No content hidden behind fixed navbars",
+    "- [ ] No horizontal scroll on mobile",
+    "",
+])
+
+
+def format_master_md(design_system: dict) -> str:
+    """Format design system as MASTER.md with hierarchical override logic."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return _MASTER_TEMPLATE.render(_FormatContext(design_system, timestamp))
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+_FORMAT_TEMPLATES = {
+    "ascii": lambda: _ascii_box_template(BOX_WIDTH),
+    "markdown": lambda: _MARKDOWN_TEMPLATE,
+    "master": lambda: _MASTER_TEMPLATE,
+}
+
+
+def format_design_systems(design_systems: list, output_format: str = "ascii") -> list:
+    """
+    Render many design systems with one compiled template.
+
+    output_format is "ascii", "markdown" or "master" (MASTER.md); each
+    output is identical to the matching single formatter's. Master files
+    rendered in one call share one Generated timestamp.
+    """
+    template = _FORMAT_TEMPLATES[output_format]()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if output_format == "master" else None
+    return [template.render(_FormatContext(design_system, timestamp)) for design_system in design_systems]
+
+
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            context: SearchContext = None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content.
+
+    context: optional SearchContext over page_query.lower(), shared by the pages of one project.
+    """
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, context)
     
     lines = []
     
@@ -911,31 +1353,38 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    context: SearchContext = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. The style is picked by rerank() with the
+    detected page type's keywords as priorities. With a SearchContext over the
+    lowercased page_query, only the page name is scored per search.
     """
-    from core import search
-    
     page_lower = page_name.lower()
     query_lower = (page_query or "").lower()
     combined_context = f"{page_lower} {query_lower}"
+
+    def page_search(domain, max_results, scores=False):
+        if context is not None:
+            return context.search(page_lower, domain, max_results, scores=scores)
+        return search(combined_context, domain, max_results=max_results, scores=scores)
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    style_search = page_search("style", SEARCH_CONFIG["style"]["max_results"], scores=True)
+    ux_search = page_search("ux", 3)
+    landing_search = page_search("landing", 1)
     
     # Extract results from search response
     style_results = style_search.get("results", [])
     ux_results = ux_search.get("results", [])
     landing_results = landing_search.get("results", [])
     
-    # Detect page type from search results or context
+    # Detect page type from search results or context, then prefer styles suited to it
     page_type = _detect_page_type(combined_context, style_results)
+    style_results = rerank(style_search, PAGE_TYPE_KEYWORDS.get(page_type, []), top_n=1)
     
     # Build overrides from search results
     layout = {}
@@ -950,16 +1399,16 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     if style_results:
         style = style_results[0]
         style_name = style.get("Style Category", "")
-        keywords = style.get("Keywords", "")
+        keywords = style.get("Keywords", "").lower()
         best_for = style.get("Best For", "")
         effects = style.get("Effects & Animation", "")
         
         # Infer layout from style keywords
-        if any(kw in keywords.lower() for kw in ["data", "dense", "dashboard", "grid"]):
+        if any(kw in keywords for kw in ["data", "dense", "dashboard", "grid"]):
             layout["Max Width"] = "1400px or full-width"
             layout["Grid"] = "12-column grid for data flexibility"
             spacing["Content Density"] = "High — optimize for information display"
-        elif any(kw in keywords.lower() for kw in ["minimal", "simple", "clean", "single"]):
+        elif any(kw in keywords for kw in ["minimal", "simple", "clean", "single"]):
             layout["Max Width"] = "800px (narrow, focused)"
             layout["Layout"] = "Single column, centered"
             spacing["Content Density"] = "Low — focus on clarity"
@@ -1017,27 +1466,28 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     }
 
 
+# Common page type patterns, checked in order
+PAGE_TYPE_KEYWORDS = {
+    "Dashboard / Data View": ["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"],
+    "Checkout / Payment": ["checkout", "payment", "cart", "purchase", "order", "billing"],
+    "Settings / Profile": ["settings", "profile", "account", "preferences", "config"],
+    "Landing / Marketing": ["landing", "marketing", "homepage", "hero", "home", "promo"],
+    "Authentication": ["login", "signin", "signup", "register", "auth", "password"],
+    "Pricing / Plans": ["pricing", "plans", "subscription", "tiers", "packages"],
+    "Blog / Article": ["blog", "article", "post", "news", "content", "story"],
+    "Product Detail": ["product", "item", "detail", "pdp", "shop", "store"],
+    "Search Results": ["search", "results", "browse", "filter", "catalog", "list"],
+    "Empty State": ["empty", "404", "error", "not found", "zero"],
+}
+
+PAGE_TYPE_MATCHER = KeywordMatcher(PAGE_TYPE_KEYWORDS)
+
+
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
-    # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
+    # First page type (in PAGE_TYPE_KEYWORDS order) with a keyword in the context
+    for page_type in PAGE_TYPE_MATCHER.match(context, spans=False):
+        return page_type
     
     # Fallback: try to infer from style results
     if style_results:
@@ -2,9 +2,11 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3] [--phrase] [--no-fuzzy]
+       python search.py --batch queries.jsonl [--domain <domain>] [--stack <stack>] [--max-results 3]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --design-system --batch briefs.jsonl [--persist] [-o DIR]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
@@ -12,13 +14,50 @@ Stacks: html-tailwind, react, nextjs
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Batch mode:
+  --batch FILE  Read one query per line ("-" for stdin) and print one JSON result per line.
+                A line is either plain text, a JSON string, or a JSON object
+                {"query": ..., "domain": ..., "stack": ..., "max_results": ..., "phrase": ..., "fuzzy": ...};
+                missing fields fall back to the command-line options. Lines that are other
+                JSON values (404, 2024, true) are plain text. An invalid line
+                gets an {"error": ...} object in its output slot. Results come in chunks,
+                flushed whenever an interactive or piped input has no further line ready.
+  --design-system --batch FILE
+                Generate one design system per brief line: plain text, a JSON string, or
+                {"query": ..., "project_name": ..., "page": ...} (lines are read as for
+                --batch, so 404 is a plain-text brief). Briefs run concurrently and
+                share loaded indexes and identical searches. One JSON line per brief is printed
+                as it finishes (with --persist its files are written then too); a
+                per-brief timing summary follows on stderr.
+
+Daemon mode:
+  --serve        Keep all indexes in memory and answer requests over a local socket.
+                 While it runs, regular invocations are forwarded to it automatically.
+  --stop-daemon  Stop a running daemon.
+  --no-daemon    Always search in-process.
+
+Compiled index:
+  --build-index  Compile every CSV under data/ into one memory-mapped index file
+                 (.index-cache/index.bin, or $UIPRO_MMAP_INDEX). Searches read it
+                 lazily while it is up to date and fall back to the CSVs otherwise.
 """
 
 import argparse
+import codecs
+import importlib
+import json
+import os
+import select
+import stat
 import sys
 import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import time
+from collections import defaultdict
+
+# Only the daemon client is imported up front: core and design_system (and
+# their optional NumPy/SciPy backend) load once a request runs in-process.
+import daemon
 
 # Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -53,13 +92,205 @@ def format_output(result):
     return "\n".join(output)
 
 
+def _local(parser, args, module):
+    """
+    Import module for in-process work and check the options that need core's
+    configuration (argparse cannot list the domains without importing it).
+    """
+    from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS
+    if args.domain is not None and args.domain not in CSV_CONFIG:
+        parser.error(f"argument --domain/-d: invalid choice: {args.domain!r} (choose from {', '.join(CSV_CONFIG)})")
+    if args.stack is not None and args.stack not in AVAILABLE_STACKS:
+        parser.error(f"argument --stack/-s: invalid choice: {args.stack!r} (choose from {', '.join(AVAILABLE_STACKS)})")
+    if args.max_results is None:
+        args.max_results = MAX_RESULTS
+    return importlib.import_module(module)
+
+
+def _dispatch(use_daemon, op, local, **kwargs):
+    """Run op on the daemon if a compatible one is listening, otherwise call local in-process.
+
+    Errors reported by the daemon (e.g. arguments it does not accept) also
+    fall back to local, which raises them itself if they are genuine.
+    Arguments left as None are not sent, so either side applies its defaults.
+    """
+    kwargs = {name: value for name, value in kwargs.items() if value is not None}
+    if use_daemon and daemon.is_running():
+        try:
+            return daemon.call(op, **kwargs)
+        except (daemon.DaemonUnavailable, RuntimeError):
+            pass
+    return local(**kwargs)
+
+
+BATCH_CHUNK_SIZE = 256  # lines grouped per index pass before results are flushed
+
+
+def _parse_batch_line(line, domain, stack, max_results, phrase=False, fuzzy=True):
+    """Parse a batch line into a request dict, applying CLI defaults.
+
+    Raises ValueError describing the problem if the line is not a valid request.
+    """
+    from core import CSV_CONFIG, AVAILABLE_STACKS, decode_batch_line
+    item = decode_batch_line(line)
+    if isinstance(item, str):
+        item = {"query": item}
+
+    request = {
+        "query": item.get("query", ""),
+        "domain": item.get("domain", domain),
+        "stack": item.get("stack", stack),
+        "max_results": item.get("max_results", max_results),
+        "phrase": bool(item.get("phrase", phrase)),
+        "fuzzy": bool(item.get("fuzzy", fuzzy))
+    }
+    if not isinstance(request["query"], str):
+        raise ValueError("query must be a string")
+    if request["domain"] is not None and (not isinstance(request["domain"], str) or request["domain"] not in CSV_CONFIG):
+        raise ValueError(f"unknown domain: {request['domain']!r}")
+    if request["stack"] is not None and (not isinstance(request["stack"], str) or request["stack"] not in AVAILABLE_STACKS):
+        raise ValueError(f"unknown stack: {request['stack']!r}")
+    if isinstance(request["max_results"], bool):
+        raise ValueError("max_results must be an integer")
+    try:
+        request["max_results"] = int(request["max_results"])
+    except (TypeError, ValueError):
+        raise ValueError("max_results must be an integer") from None
+    return request
+
+
+def _run_batch_chunk(requests):
+    """Run a chunk of requests grouped by index; results in input order"""
+    from core import search_many, search_stack_many
+    groups = defaultdict(list)
+    results = [None] * len(requests)
+    for i, req in enumerate(requests):
+        if "error" in req:
+            results[i] = req
+        elif req["stack"]:
+            groups[("stack", req["stack"], req["max_results"], req["phrase"], req["fuzzy"])].append(i)
+        else:
+            groups[("domain", req["domain"], req["max_results"], req["phrase"], req["fuzzy"])].append(i)
+
+    for (kind, name, n, phrase, fuzzy), positions in groups.items():
+        queries = [requests[i]["query"] for i in positions]
+        if kind == "stack":
+            batch = search_stack_many(queries, name, n, phrase=phrase, fuzzy=fuzzy)
+        else:
+            batch = search_many(queries, name, n, phrase=phrase, fuzzy=fuzzy)
+        for i, result in zip(positions, batch):
+            results[i] = result
+    return results
+
+
+def _interactive_fd(stream):
+    """File descriptor of stream if it is a terminal, pipe or socket, else None"""
+    try:
+        fd = stream.fileno()
+        mode = os.fstat(fd).st_mode
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    if os.isatty(fd) or stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+        return fd
+    return None
+
+
+def _batch_lines(stream):
+    """
+    Yield the lines of stream, and None whenever reading the next line of an
+    interactive or piped stream would block, so callers can flush.
+    """
+    fd = _interactive_fd(stream)
+    if fd is None:
+        yield from stream
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        try:
+            ready = select.select([fd], [], [], 0)[0]
+        except (OSError, ValueError):
+            ready = []  # select() does not support this stream (e.g. Windows pipes)
+        if not ready:
+            yield None
+        data = os.read(fd, 65536)
+        pending += decoder.decode(data, final=not data)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        yield from lines
+        if not data:
+            break
+    if pending:
+        yield pending
+
+
+def run_batch(stream, domain=None, stack=None, max_results=None, out=None, phrase=False, fuzzy=True):
+    """Answer queries from a line stream, writing one JSON result per line (max_results defaults to MAX_RESULTS)"""
+    from core import MAX_RESULTS
+    out = out or sys.stdout
+    max_results = MAX_RESULTS if max_results is None else max_results
+    chunk = []
+
+    def flush():
+        for result in _run_batch_chunk(chunk):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+        chunk.clear()
+
+    for line in _batch_lines(stream):
+        if line is None:
+            if chunk:
+                flush()
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            chunk.append(_parse_batch_line(line, domain, stack, max_results, phrase, fuzzy))
+        except ValueError as e:
+            chunk.append({"error": f"Invalid batch line: {e}", "line": line})
+        if len(chunk) >= BATCH_CHUNK_SIZE:
+            flush()
+    if chunk:
+        flush()
+
+
+def run_design_batch(stream, project_name=None, output_format="ascii", persist=False, page=None, output_dir=None,
+                     out=None, err=None):
+    """Generate a design system per brief line, writing one JSON result per line as each finishes"""
+    from core import decode_batch_line
+    from design_system import generate_design_systems
+    out = out or sys.stdout
+    err = err or sys.stderr
+    briefs = [decode_batch_line(line.strip()) for line in stream if line.strip()]
+
+    def emit(result):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+    start = time.perf_counter()
+    results = generate_design_systems(briefs, output_format, persist, output_dir, on_result=emit,
+                                      project_name=project_name, page=page)
+    total_ms = (time.perf_counter() - start) * 1000
+
+    errors = sum(1 for result in results if "error" in result)
+    err.write(f"Design systems: {len(results)} briefs in {total_ms:.1f} ms ({errors} failed)\n")
+    for result in results:
+        status = "FAILED" if "error" in result else "ok"
+        err.write(f"  #{result['index']:<4}{result['elapsed_ms']:>10.1f} ms  {status:<7}{result['query']}\n")
+    err.flush()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
-    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", help="Search domain (style, color, chart, landing, product, ux, typography, ...)")
+    parser.add_argument("--stack", "-s", help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--max-results", "-n", type=int, default=None, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--phrase", action="store_true", help="Boost results where query words appear together")
+    parser.add_argument("--no-fuzzy", action="store_true", help="Match query words exactly (no typo/prefix expansion)")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -68,18 +299,67 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Batch mode
+    parser.add_argument("--batch", "-b", type=str, default=None, metavar="FILE", help="Read queries from a JSONL/text file ('-' for stdin) and print JSON lines")
+    # Daemon mode
+    parser.add_argument("--serve", action="store_true", help="Run a search daemon that keeps all indexes in memory")
+    parser.add_argument("--stop-daemon", action="store_true", help="Stop a running search daemon")
+    parser.add_argument("--no-daemon", action="store_true", help="Do not forward requests to a running daemon")
+    # Compiled index
+    parser.add_argument("--build-index", action="store_true", help="Compile all CSVs into one memory-mapped index file")
 
     args = parser.parse_args()
+    use_daemon = not args.no_daemon
+
+    if args.query is None and not (args.batch or args.serve or args.stop_daemon or args.build_index):
+        parser.error("a query is required unless --batch, --serve, --stop-daemon or --build-index is given")
 
+    # Compiled index
+    if args.build_index:
+        path = _local(parser, args, "core").build_mmap_index()
+        print(f"Index written to {path} ({path.stat().st_size // 1024} KiB)")
+    # Daemon control
+    elif args.serve:
+        if not daemon.serve():
+            sys.exit(1)
+    elif args.stop_daemon:
+        stopped = daemon.stop()
+        if stopped is False:
+            sys.exit(1)
+        print("Daemon stopped" if stopped else "No daemon running")
+    # Batch design systems
+    elif args.batch and args.design_system:
+        _local(parser, args, "design_system")
+        output_dir = os.path.abspath(args.output_dir or os.getcwd()) if args.persist else args.output_dir
+        kwargs = dict(project_name=args.project_name, output_format=args.format, persist=args.persist,
+                      page=args.page, output_dir=output_dir)
+        if args.batch == "-":
+            run_design_batch(sys.stdin, **kwargs)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                run_design_batch(f, **kwargs)
+    # Batch search
+    elif args.batch:
+        _local(parser, args, "core")
+        if args.batch == "-":
+            run_batch(sys.stdin, args.domain, args.stack, args.max_results, phrase=args.phrase, fuzzy=not args.no_fuzzy)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                run_batch(f, args.domain, args.stack, args.max_results, phrase=args.phrase, fuzzy=not args.no_fuzzy)
     # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
+    elif args.design_system:
+        # The daemon has its own working directory, so always send an absolute path
+        output_dir = os.path.abspath(args.output_dir or os.getcwd()) if args.persist else args.output_dir
+        result = _dispatch(
+            use_daemon,
+            "generate_design_system",
+            lambda **kwargs: _local(parser, args, "design_system").generate_design_system(**kwargs),
+            query=args.query,
+            project_name=args.project_name,
+            output_format=args.format,
             persist=args.persist,
             page=args.page,
-            output_dir=args.output_dir
+            output_dir=output_dir
         )
         print(result)
         
@@ -98,17 +378,21 @@ if __name__ == "__main__":
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = _dispatch(use_daemon, "search_stack",
+                           lambda **kwargs: _local(parser, args, "core").search_stack(**kwargs),
+                           query=args.query, stack=args.stack, max_results=args.max_results,
+                           phrase=args.phrase, fuzzy=not args.no_fuzzy)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = _dispatch(use_daemon, "search",
+                           lambda **kwargs: _local(parser, args, "core").search(**kwargs),
+                           query=args.query, domain=args.domain, max_results=args.max_results,
+                           phrase=args.phrase, fuzzy=not args.no_fuzzy)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
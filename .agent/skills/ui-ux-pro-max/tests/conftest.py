@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures for the UI/UX Pro Max tests: scripts/ on sys.path, index and
+query caches isolated per test, and corpus/query factories over the shipped data.
+"""
+
+import random
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import core
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep index caches (and any compiled index) out of the skill directory"""
+    monkeypatch.setattr(core, "INDEX_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(core, "MMAP_INDEX_FILE", None)
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+    yield
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A writable copy of data/ that core searches instead of the shipped CSVs"""
+    copy = tmp_path / "data"
+    shutil.copytree(core.DATA_DIR, copy)
+    monkeypatch.setattr(core, "DATA_DIR", copy)
+    return copy
+
+
+@pytest.fixture
+def documents():
+    """documents(domain): the BM25 documents search() indexes for a domain"""
+    def build(domain):
+        config = core.CSV_CONFIG[domain]
+        rows = core._load_csv(core.DATA_DIR / config["file"])
+        return [" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in rows]
+    return build
+
+
+@pytest.fixture
+def queries():
+    """queries(documents, count): random multi-word queries from the corpus vocabulary, plus misspellings"""
+    def build(documents, count=150, seed=0):
+        rng = random.Random(seed)
+        vocab = sorted({w for doc in documents for w in core.BM25().tokenize(doc)})
+        picked = [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 4))) for _ in range(count)]
+        return picked + ["glassmorph dark", "minmal clean", "accesibility contrast", "zzzz"]
+    return build
+
+
+@pytest.fixture
+def fitted():
+    """fitted(documents): a Python-backend BM25 fitted on the documents"""
+    def build(documents):
+        bm25 = core.BM25(backend="python")
+        bm25.fit(documents)
+        return bm25
+    return build
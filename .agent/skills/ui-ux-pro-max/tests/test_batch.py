@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+search.py --batch: line parsing, per-line error objects, and results that
+match one-off searches and are flushed while piped input is still open.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import io
+import json
+import os
+import queue
+import threading
+
+import pytest
+
+import core
+import search
+
+
+def _run(text, **options):
+    out = io.StringIO()
+    search.run_batch(io.StringIO(text), out=out, **options)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("line", ["404", "2024", "true", "null", "[1, 2]", "{not json", "dark mode"])
+def test_plain_text_lines_stay_queries(line):
+    assert search._parse_batch_line(line, None, None, 3)["query"] == line
+
+
+def test_json_lines_and_cli_defaults():
+    assert search._parse_batch_line('"404"', "ux", None, 2) == {
+        "query": "404", "domain": "ux", "stack": None, "max_results": 2, "phrase": False, "fuzzy": True}
+    request = search._parse_batch_line('{"query": "glass", "stack": "react", "max_results": "5", "phrase": 1}',
+                                       "style", None, 3, fuzzy=False)
+    assert request == {"query": "glass", "domain": "style", "stack": "react", "max_results": 5,
+                       "phrase": True, "fuzzy": False}
+
+
+@pytest.mark.parametrize("line,message", [
+    ('{"query": 404}', "query must be a string"),
+    ('{"query": "x", "domain": "nope"}', "unknown domain: 'nope'"),
+    ('{"query": "x", "domain": ["style"]}', "unknown domain: ['style']"),
+    ('{"query": "x", "stack": "cobol"}', "unknown stack: 'cobol'"),
+    ('{"query": "x", "max_results": true}', "max_results must be an integer"),
+    ('{"query": "x", "max_results": "many"}', "max_results must be an integer"),
+])
+def test_invalid_lines_raise(line, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        search._parse_batch_line(line, None, None, 3)
+
+
+def test_results_match_single_searches_and_errors_keep_their_slot():
+    lines = ["dark mode", '{"query": "glass", "domain": "nope"}', "", "404",
+             '{"query": "useState", "stack": "react", "max_results": 2}', "2024"]
+    results = _run("\n".join(lines) + "\n", domain="style")
+
+    assert len(results) == 5
+    assert results[0] == core.search("dark mode", "style")
+    assert results[1] == {"error": "Invalid batch line: unknown domain: 'nope'", "line": lines[1]}
+    assert results[2] == core.search("404", "style")
+    assert results[3] == core.search_stack("useState", "react", 2)
+    assert results[4] == core.search("2024", "style")
+
+
+def test_results_span_chunks(monkeypatch):
+    monkeypatch.setattr(search, "BATCH_CHUNK_SIZE", 2)
+    queries = ["dark mode", "glass", "minimal", "brutalism", "neumorphism"]
+    assert _run("\n".join(queries)) == [core.search(q) for q in queries]
+
+
+def test_piped_input_is_flushed_before_eof():
+    read_fd, write_fd = os.pipe()
+    lines = queue.Queue()
+
+    class Out:
+        def write(self, text):
+            lines.put(text)
+
+        def flush(self):
+            pass
+
+    with os.fdopen(read_fd, "r", encoding="utf-8") as stream:
+        worker = threading.Thread(target=search.run_batch, args=(stream,), kwargs={"out": Out()})
+        worker.start()
+        try:
+            os.write(write_fd, b"dark mode\n")
+            assert json.loads(lines.get(timeout=10))["query"] == "dark mode"  # pipe still open
+            os.write(write_fd, "glassmorphism ✨\n".encode("utf-8"))
+            assert json.loads(lines.get(timeout=10))["query"] == "glassmorphism ✨"
+        finally:
+            os.close(write_fd)
+            worker.join(timeout=10)
+    assert not worker.is_alive()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inverted-index BM25 scoring checked against the original full-corpus scan:
+every document that shares a term with the query gets the same score, and
+documents sharing none are left out.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+from collections import Counter
+from math import log
+
+import pytest
+
+import core
+
+
+# ============ REFERENCE ============
+def _naive_scores(documents, query, k1=core.BM25.K1, b=core.BM25.B):
+    """BM25 of every document by scanning the whole corpus, as search() scored before the inverted index"""
+    tokenize = core.BM25().tokenize
+    corpus = [tokenize(doc) for doc in documents]
+    n = len(corpus)
+    avgdl = sum(len(doc) for doc in corpus) / n
+    doc_freqs = Counter(word for doc in corpus for word in set(doc))
+    scores = []
+    for idx, doc in enumerate(corpus):
+        term_freqs = Counter(doc)
+        score = 0
+        for token in tokenize(query):
+            if token in doc_freqs:
+                tf = term_freqs[token]
+                idf = log((n - doc_freqs[token] + 0.5) / (doc_freqs[token] + 0.5) + 1)
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avgdl))
+        scores.append((idx, score))
+    return scores
+
+
+# ============ TESTS ============
+@pytest.mark.parametrize("domain", ["style", "product", "ux", "color", "typography"])
+def test_score_matches_full_scan(domain, documents, queries, fitted):
+    docs = documents(domain)
+    bm25 = fitted(docs)
+    for query in queries(docs, count=60):
+        expected = [(idx, s) for idx, s in _naive_scores(docs, query) if s > 0]
+        got = bm25.score(query)
+        assert [idx for idx, _ in got] == [idx for idx, _ in sorted(expected, key=lambda x: (-x[1], x[0]))], query
+        assert dict(got) == pytest.approx(dict(expected)), query
+
+
+def test_score_repeated_query_terms_count_each_time(fitted):
+    bm25 = fitted(["dark glass panel", "light paper card", "dark dark mode"])
+    single = dict(bm25.score("dark"))
+    double = dict(bm25.score("dark dark"))
+    assert double == pytest.approx({idx: 2 * s for idx, s in single.items()})
+
+
+def test_score_omits_documents_without_query_terms(fitted):
+    bm25 = fitted(["dark glass panel", "light paper card", "neon dark grid"])
+    assert [idx for idx, _ in bm25.score("dark")] in ([0, 2], [2, 0])
+    assert bm25.score("zzzz") == []
+    assert fitted([]).score("dark") == []
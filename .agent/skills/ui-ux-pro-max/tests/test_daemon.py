@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search daemon: token authentication, connection handling, TCP restrictions,
+file ownership checks, and a client path that never imports core.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import core
+import daemon
+
+pytestmark = pytest.mark.skipif(not daemon.USE_UNIX_SOCKET, reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    """A private runtime directory (short path: Unix socket paths are length-limited)"""
+    base = tempfile.mkdtemp(prefix="uipro-")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", base)
+    monkeypatch.delenv("UIPRO_DAEMON_SOCKET", raising=False)
+    yield daemon.runtime_dir()
+    shutil.rmtree(base, ignore_errors=True)
+
+
+@pytest.fixture
+def running(runtime):
+    """A daemon serving on a background thread; yields its token"""
+    daemon._make_runtime_dir()
+    daemon._load_handlers()
+    token = daemon._write_token()
+    thread = threading.Thread(target=asyncio.run, args=(daemon._serve(token),), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not daemon.is_running():
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.02)
+    yield token
+    daemon.stop()
+    thread.join(timeout=10)
+
+
+def _exchange(lines):
+    """Send raw lines on one connection; return every reply line until the daemon closes it"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(str(daemon.socket_path()))
+        sock.sendall(b"".join(line + b"\n" for line in lines))
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            return [json.loads(line) for line in f]
+
+
+def _request(op, token, **args):
+    return json.dumps({"op": op, "token": token, "args": args}).encode("utf-8")
+
+
+def test_client_import_skips_core():
+    probe = "import sys, search; print(sorted(m for m in ('core', 'design_system', 'numpy', 'asyncio') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=Path(daemon.__file__).parent,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_files_are_private(running, runtime):
+    assert runtime.stat().st_mode & 0o777 == 0o700
+    assert daemon.token_path().parent == runtime
+    assert daemon.token_path().stat().st_mode & 0o777 == 0o600
+    assert daemon.socket_path().stat().st_mode & 0o777 == 0o600
+
+
+def test_search_matches_in_process(running):
+    assert daemon.call("search", query="dark mode", domain="style") == core.search("dark mode", "style")
+    assert daemon.call("ping") == {"protocol": daemon.PROTOCOL_VERSION}
+
+
+def test_unknown_domain_is_refused(running):
+    with pytest.raises(RuntimeError, match="Unknown domain: nope"):
+        daemon.call("search", query="dark mode", domain="nope")
+
+
+def test_valid_requests_share_a_connection(running):
+    replies = _exchange([_request("ping", running), _request("search", running, query="glass", domain="style")])
+    assert [list(reply) for reply in replies] == [["result"], ["result"]]
+
+
+@pytest.mark.parametrize("line,error", [
+    (b"not json", "Malformed request"),
+    (b"[1, 2]", "Malformed request"),
+    (b'{"op": "ping", "token": "", "args": []}', "Malformed request"),
+    (b'{"op": "ping", "token": "wrong"}', "Unauthorized"),
+    (b'{"op": "ping"}', "Unauthorized"),
+])
+def test_rejected_line_closes_the_connection(running, line, error):
+    # The valid request after the rejected line is never answered
+    assert _exchange([line, _request("ping", running)]) == [{"error": error}]
+
+
+def test_wrong_token_cannot_shut_down(running):
+    assert _exchange([_request("shutdown", "0" * 64)]) == [{"error": "Unauthorized"}]
+    assert daemon.is_running()
+
+
+def test_stop_reports_refusal(running, capsys, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(daemon, "_read_token", lambda: "wrong")
+        assert daemon.stop() is False
+        assert daemon.protocol() == 0  # a refused ping: not a daemon this client can use
+    assert "refused to stop: Unauthorized" in capsys.readouterr().err
+    assert daemon.is_running()
+
+
+def test_stop_without_daemon(runtime):
+    assert daemon.stop() is None
+
+
+@pytest.mark.parametrize("persist", [True, False])
+def test_tcp_refuses_file_writes(monkeypatch, tmp_path, persist):
+    daemon._load_handlers()
+    line = _request("generate_design_system", "t", query="fintech", persist=persist, output_dir=str(tmp_path))
+
+    monkeypatch.setattr(daemon, "USE_UNIX_SOCKET", False)
+    assert asyncio.run(_handle_once(line, "t")) == {"error": "persist, output_dir are not accepted over TCP"}
+    monkeypatch.setattr(daemon, "USE_UNIX_SOCKET", True)
+    assert "result" in asyncio.run(_handle_once(line, "t"))
+    assert (tmp_path / "design-system" / "fintech" / "MASTER.md").exists() == persist
+
+
+async def _handle_once(line, token):
+    """Feed one line through _handle_client and return its reply"""
+    reader = asyncio.StreamReader()
+    reader.feed_data(line + b"\n")
+    reader.feed_eof()
+    written = []
+
+    class Writer:
+        def write(self, data):
+            written.append(data)
+
+        async def drain(self):
+            pass
+
+        def close(self):
+            pass
+
+    await daemon._handle_client(reader, Writer(), asyncio.Event(), token)
+    return json.loads(b"".join(written))
+
+
+# ============ OWNERSHIP ============
+@pytest.fixture
+def other_user(monkeypatch):
+    """Pretend every existing file belongs to someone else"""
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+
+
+def test_client_refuses_foreign_files(runtime, other_user):
+    runtime.mkdir(mode=0o700)
+    daemon.token_path().write_text("planted")
+    with pytest.raises(daemon.DaemonUnavailable, match="owned by another user"):
+        daemon.call("ping")
+    assert daemon.protocol() is None
+
+
+def test_client_refuses_shared_runtime_dir(runtime):
+    runtime.mkdir(mode=0o755)
+    os.chmod(runtime, 0o755)
+    with pytest.raises(daemon.DaemonUnavailable, match="only its owner can access"):
+        daemon.call("ping")
+
+
+def test_serve_refuses_foreign_runtime_dir(runtime, other_user, capsys):
+    runtime.mkdir(mode=0o700)
+    assert daemon.serve() is False
+    assert "Cannot start the UI Pro Max daemon" in capsys.readouterr().err
+
+
+def test_stale_foreign_socket_is_a_clear_error(runtime, monkeypatch):
+    monkeypatch.setenv("UIPRO_DAEMON_SOCKET", str(runtime.parent / "planted.sock"))
+    daemon.socket_path().write_text("")
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    with pytest.raises(PermissionError, match="owned by another user; remove it or set UIPRO_DAEMON_SOCKET"):
+        daemon._remove_stale(daemon.socket_path())
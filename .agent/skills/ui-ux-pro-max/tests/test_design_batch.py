@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk design-system generation (--design-system --batch): brief lines read as
+for --batch, per-brief errors, and output identical to one-off generation.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import io
+import json
+
+import pytest
+
+import design_system
+import search
+
+
+def _run(text, **options):
+    out, err = io.StringIO(), io.StringIO()
+    search.run_design_batch(io.StringIO(text), out=out, err=err, **options)
+    results = sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda r: r["index"])
+    return results, err.getvalue()
+
+
+def test_scalar_lines_are_plain_text_briefs():
+    results, _ = _run("404\n2024\n")
+    assert [(r["query"], "error" in r) for r in results] == [("404", False), ("2024", False)]
+    assert results[0]["output"] == design_system.generate_design_system("404")
+
+
+def test_outputs_match_single_generation():
+    lines = ["fintech crypto dashboard", '"beauty spa"', '{"query": "saas analytics", "project_name": "Acme"}']
+    results, summary = _run("\n".join(lines) + "\n", output_format="markdown")
+    assert [r["output"] for r in results] == [
+        design_system.generate_design_system("fintech crypto dashboard", output_format="markdown"),
+        design_system.generate_design_system("beauty spa", output_format="markdown"),
+        design_system.generate_design_system("saas analytics", "Acme", output_format="markdown"),
+    ]
+    assert summary.startswith("Design systems: 3 briefs in ") and "(0 failed)" in summary
+
+
+@pytest.mark.parametrize("line,error", [
+    ('{"query": 5}', "Invalid brief: query must be a string"),
+    ('{"query": "x", "project_name": ["a"]}', "Invalid brief: project_name must be a string"),
+    ('{"query": "x", "page": 3}', "Invalid brief: page must be a string"),
+])
+def test_invalid_briefs_fail_alone(line, error):
+    results, summary = _run(f"fintech\n{line}\n")
+    assert "error" not in results[0]
+    assert results[1]["error"] == error
+    assert "(1 failed)" in summary
+
+
+def test_defaults_fill_missing_fields_and_persist(tmp_path):
+    lines = ["fintech", '{"query": "beauty spa", "project_name": "Glow", "page": "booking"}']
+    results, _ = _run("\n".join(lines), project_name="Bank", page="checkout", persist=True, output_dir=str(tmp_path))
+    assert [r["project_name"] for r in results] == ["Bank", "Glow"]
+    assert (tmp_path / "design-system" / "bank" / "pages" / "checkout.md").exists()
+    assert (tmp_path / "design-system" / "glow" / "pages" / "booking.md").exists()
+    assert all(str(tmp_path) in path for r in results for path in r["files"])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-domain fan-out: thread and process executors return what serial
+searches return, in job order, and keep a bounded set of shared pools.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pytest
+
+import core
+import design_system
+from design_system import run_searches
+
+JOBS = [("fintech crypto", "product", 1, False), ("fintech crypto minimalism", "style", 3, True),
+        ("fintech crypto", "color", 2, False), ("fintech crypto", "landing", 2, False),
+        ("fintech crypto", "typography", 2, False)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    design_system._shutdown_executors()
+    yield
+    design_system._shutdown_executors()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_fan_out_matches_serial(executor):
+    expected = run_searches(JOBS, "serial")
+    assert run_searches(JOBS, executor, workers=5) == expected
+    assert run_searches(list(reversed(JOBS)), executor, workers=3) == list(reversed(expected))
+
+
+def test_process_pools_are_bounded_and_reused():
+    for workers in (2, 3, 4, 5, 5, 2):
+        run_searches(JOBS, "process", workers=workers)
+    keys = set(design_system._EXECUTORS)
+    assert keys == {("process", slot) for slot in range(5)}
+    assert len(keys) <= design_system.MAX_POOL_WORKERS
+
+    many = [("dark mode", "style", 1, False)] * 20
+    run_searches(many, "process", workers=20)
+    assert len(design_system._EXECUTORS) <= design_system.MAX_POOL_WORKERS
+
+
+def test_shutdown_releases_every_pool():
+    run_searches(JOBS, "thread", workers=2)
+    run_searches(JOBS, "process", workers=2)
+    pools = list(design_system._EXECUTORS.values())
+    design_system._shutdown_executors()
+    assert design_system._EXECUTORS == {}
+    for pool in pools:
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+
+
+def test_generate_is_independent_of_the_executor():
+    expected = design_system.DesignSystemGenerator(executor="serial").generate("beauty spa wellness")
+    for executor in ("thread", "process"):
+        core.INDEX_REGISTRY.invalidate()
+        assert design_system.DesignSystemGenerator(executor=executor).generate("beauty spa wellness") == expected
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzy matching: Vocabulary.similar() returns exactly the terms within the
+OSA distance bound of a brute-force check, and unknown query words expand
+to weighted prefix and edit-distance variants.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import random
+
+import pytest
+
+import core
+from core import BM25, Vocabulary
+
+
+# ============ REFERENCE ============
+def _osa_distance(a, b):
+    """Optimal string alignment distance (adjacent transpositions count as one edit)"""
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+# ============ VOCABULARY ============
+@pytest.mark.parametrize("max_edits,prefix_length", [(1, 0), (1, 1), (2, 1), (2, 0)])
+def test_similar_matches_brute_force_osa(max_edits, prefix_length, documents):
+    rng = random.Random(max_edits * 10 + prefix_length)
+    vocab = Vocabulary()
+    terms = sorted({w for doc in documents("style") for w in BM25().tokenize(doc)})
+    for term in terms:
+        vocab.add(term)
+
+    words = rng.sample(terms, 40)
+    for word in list(words):
+        chars = list(word)
+        i = rng.randrange(len(chars))
+        op = rng.choice(["sub", "del", "ins", "swap"])
+        if op == "sub":
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif op == "del" and len(chars) > 1:
+            del chars[i]
+        elif op == "ins":
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+        elif i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        words.append("".join(chars))
+
+    for word in words:
+        expected = sorted((term, dist) for term in terms
+                          if term[:prefix_length] == word[:prefix_length]
+                          and abs(len(term) - len(word)) <= max_edits
+                          for dist in [_osa_distance(word, term)] if dist <= max_edits)
+        assert sorted(vocab.similar(word, max_edits, prefix_length)) == expected, word
+
+
+# ============ QUERY EXPANSION ============
+def test_unknown_words_expand_by_prefix_and_edits(fitted):
+    bm25 = fitted(["glassmorphism blur", "minimal clean layout", "minimalism flat", "dark mode"])
+    ids = bm25.vocab.ids
+
+    assert bm25.expand_term("glassmorph") == [(ids["glassmorphism"], pytest.approx(10 / 13))]
+    assert dict(bm25.expand_term("minmal")) == {ids["minimal"]: pytest.approx(1 - 1 / 6)}
+    assert bm25.expand_term("dakr") == []  # shorter than FUZZY_MIN_LENGTH
+    assert bm25.expand_term("zzzzzz") == []
+
+
+def test_expansions_are_capped_and_heaviest_first(fitted):
+    bm25 = fitted(["layout layouts layouted layouting layoutless"])
+    expanded = bm25.expand_term("layou")
+    assert len(expanded) == bm25.FUZZY_MAX_EXPANSIONS
+    weights = [weight for _, weight in expanded]
+    assert weights == sorted(weights, reverse=True)
+    assert bm25.vocab.terms[expanded[0][0]] == "layout"
+
+
+def test_known_words_are_not_expanded(fitted):
+    bm25 = fitted(["minimal clean", "minimalism flat"])
+    assert bm25.query_terms("minimal", fuzzy=True) == [(bm25.vocab.ids["minimal"], 1)]
+
+
+# ============ SEARCH ============
+def test_fuzzy_search_finds_misspelled_words():
+    assert core.search("glassmorph", "style", fuzzy=False)["count"] == 0
+    assert core.search("glassmorph", "style")["results"][0]["Style Category"] == "Glassmorphism"
+    assert core.search("minmalism", "style")["results"][0]["Style Category"].startswith("Minimalism")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental BM25 updates: add_documents() and remove_documents() rank like
+fit() once statistics are refreshed (removal renumbers later documents),
+top-k stays consistent with score() while a refresh is deferred, and terms
+left without documents stop matching.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import core
+
+
+def test_add_documents_matches_fit(documents, queries, fitted):
+    docs = documents("style") + documents("ux")
+    query_list = queries(docs)
+    full = fitted(docs)
+
+    # Growing past STATS_DRIFT triggers a full refresh: identical to fit()
+    grown = fitted(docs[:len(docs) // 2])
+    grown.add_documents(docs[len(docs) // 2:])
+    assert grown.stats_n == grown.N
+    assert all(grown.score(q, True) == full.score(q, True) for q in query_list)
+
+    # A small append defers the refresh; top-k must stay consistent with score()
+    appended = fitted(docs[:-2])
+    appended.add_documents(docs[-2:])
+    assert appended.stats_n != appended.N
+    for query in query_list:
+        assert appended.score_topk(query, 3, True) == appended.score(query, True)[:3], query
+    appended._refresh_stats()
+    assert all(appended.score(q, True) == full.score(q, True) for q in query_list)
+
+
+def test_remove_documents_matches_fit(documents, queries, fitted):
+    docs = documents("style") + documents("ux")
+    removed = {0, 5, len(docs) // 2, len(docs) - 1}
+    query_list = queries(docs)
+
+    bm25 = fitted(docs)
+    bm25.remove_documents(removed)
+    for query in query_list:
+        assert bm25.score_topk(query, 3, True) == bm25.score(query, True)[:3], query
+    bm25._refresh_stats()
+    reference = fitted([doc for i, doc in enumerate(docs) if i not in removed])
+    assert bm25.N == reference.N
+    assert all(bm25.score(q, True) == reference.score(q, True) for q in query_list)
+
+
+def test_removed_terms_stop_matching(fitted):
+    bm25 = fitted(["glassmorphism blur", "glassmorphic cards", "minimal clean"])
+    bm25.remove_documents({0})
+    assert bm25.score("glassmorphism") == []
+    assert [bm25.vocab.terms[term_id] for term_id, _ in bm25.expand_term("glassmorph")] == ["glassmorphic"]
+
+    # Renumbered: "glassmorphic cards" is now 0, the new document 2
+    bm25.add_documents(["glassmorphism again"])
+    assert [idx for idx, _ in bm25.score("glassmorphism")] == [2]
+
+
+def test_search_picks_up_appended_rows(data_dir):
+    before = core.search("zephyr", "style")
+    assert before["count"] == 0
+    with open(data_dir / "styles.csv", "a", encoding="utf-8", newline="") as f:
+        f.write("99,Zephyr Glow,General,\"zephyr, aurora\"\n")
+    assert core.search("zephyr", "style")["results"][0]["Style Category"] == "Zephyr Glow"
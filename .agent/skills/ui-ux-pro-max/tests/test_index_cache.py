@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-disk index cache: a cached CSV index is reused by later processes, rebuilt
+when the CSV's content changes (but not when only its mtime moves), refreshed
+incrementally for appended rows, and written atomically.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import csv
+import os
+import pickle
+
+import pytest
+
+import core
+
+
+# ============ HELPERS ============
+@pytest.fixture
+def builds(monkeypatch):
+    """Names of the CSVs parsed and fitted from scratch"""
+    built = []
+    build_index = core._build_index
+
+    def counting(filepath, *args, **kwargs):
+        built.append(filepath.name)
+        return build_index(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(core, "_build_index", counting)
+    return built
+
+
+def _new_process():
+    """Forget everything held in memory, as a fresh process would"""
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+
+
+def _names(result):
+    return [row["Style Category"] for row in result["results"]]
+
+
+def _append_style(path, name, keywords):
+    with open(path, newline="", encoding="utf-8") as f:
+        columns = next(csv.reader(f))
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, columns, lineterminator="\n").writerow(
+            {**{col: "" for col in columns}, "Style Category": name, "Keywords": keywords})
+
+
+def _cache_entry():
+    with open(core.INDEX_CACHE_DIR / "styles.csv.pickle", "rb") as f:
+        return pickle.load(f)
+
+
+# ============ TESTS ============
+def test_cached_index_is_reused(data_dir, builds):
+    first = core.search("glass dark", "style")
+    assert builds == ["styles.csv"]
+    assert (core.INDEX_CACHE_DIR / "styles.csv.pickle").exists()
+
+    _new_process()
+    assert core.search("glass dark", "style") == first
+    assert builds == ["styles.csv"]
+
+
+def test_edited_csv_is_rebuilt(data_dir, builds):
+    core.search("glass", "style")
+    path = data_dir / "styles.csv"
+    path.write_text(path.read_text(encoding="utf-8").replace("Glassmorphism", "Zephyrmorphism"), encoding="utf-8")
+
+    _new_process()
+    assert "Zephyrmorphism" in _names(core.search("zephyrmorphism", "style"))
+    assert builds == ["styles.csv", "styles.csv"]
+
+
+def test_touched_csv_is_checked_by_hash(data_dir, builds):
+    core.search("glass", "style")
+    path = data_dir / "styles.csv"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    _new_process()
+    core.search("glass", "style")
+    assert builds == ["styles.csv"]
+    assert _cache_entry()["mtime_ns"] == path.stat().st_mtime_ns
+
+
+def test_appended_rows_are_indexed_incrementally(data_dir, builds):
+    core.search("glass", "style")
+    path = data_dir / "styles.csv"
+    _append_style(path, "Zephyr Glow", "zephyr, aurora, glow")
+
+    _new_process()
+    assert _names(core.search("zephyr aurora", "style"))[0] == "Zephyr Glow"
+    assert builds == ["styles.csv"]
+
+    entry = _cache_entry()
+    assert entry["size"] == path.stat().st_size
+    assert len(entry["rows"]) == len(core._load_csv(path))
+
+
+def test_rewritten_prefix_is_not_treated_as_append(data_dir, builds):
+    core.search("glass", "style")
+    path = data_dir / "styles.csv"
+    path.write_text(path.read_text(encoding="utf-8").replace("Glassmorphism", "Zephyrmorphism", 1), encoding="utf-8")
+    _append_style(path, "Zephyr Glow", "zephyr, aurora, glow")
+
+    _new_process()
+    assert "Zephyrmorphism" in _names(core.search("zephyrmorphism", "style"))
+    assert builds == ["styles.csv", "styles.csv"]
+
+
+def test_corrupt_cache_is_rebuilt(data_dir, builds):
+    first = core.search("glass dark", "style")
+    (core.INDEX_CACHE_DIR / "styles.csv.pickle").write_bytes(b"not a pickle")
+
+    _new_process()
+    assert core.search("glass dark", "style") == first
+    assert builds == ["styles.csv", "styles.csv"]
+    assert _cache_entry()["version"] == core.INDEX_CACHE_VERSION
+
+
+def test_no_cache_dir_writes_nothing(data_dir, builds, monkeypatch, tmp_path):
+    monkeypatch.setattr(core, "INDEX_CACHE_DIR", None)
+    core.search("glass", "style")
+    _new_process()
+    core.search("glass", "style")
+    assert builds == ["styles.csv", "styles.csv"]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_write_pickle_keeps_old_file_on_failure(tmp_path, monkeypatch):
+    target = tmp_path / "cache" / "entry.pickle"
+    core._write_pickle(target, {"value": 1})
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(core.pickle, "dump", failing_dump)
+    core._write_pickle(target, {"value": 2})
+
+    assert pickle.loads(target.read_bytes()) == {"value": 1}
+    assert [p.name for p in target.parent.iterdir()] == ["entry.pickle"]
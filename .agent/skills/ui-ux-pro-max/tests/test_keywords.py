@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KeywordMatcher: one compiled scan finds every keyword occurrence, including
+overlapping ones and keywords inside longer words, so domain and page-type
+detection pick exactly what the original per-keyword substring checks did.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import random
+
+import pytest
+
+import core
+import design_system
+from core import DOMAIN_KEYWORDS, KeywordMatcher
+from design_system import PAGE_TYPE_KEYWORDS
+
+
+# ============ REFERENCE ============
+def _substring_domain(query):
+    """detect_domain() as it was: count keywords that are substrings, first best domain wins"""
+    query_lower = query.lower()
+    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in DOMAIN_KEYWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "style"
+
+
+def _substring_page_type(context):
+    """_detect_page_type() keyword pass as it was: first page type with a keyword substring"""
+    context_lower = context.lower()
+    for page_type, keywords in PAGE_TYPE_KEYWORDS.items():
+        if any(kw in context_lower for kw in keywords):
+            return page_type
+    return "General"
+
+
+def _contexts(keywords, count=400, seed=0):
+    """Random texts mixing keywords (whole, glued into words, upper-cased) with filler"""
+    rng = random.Random(seed)
+    filler = ["modern", "app", "for", "clean", "teams", "blue", "x", "the", "with", "a-b", ""]
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 6)):
+            word = rng.choice(keywords) if rng.random() < 0.5 else rng.choice(filler)
+            if rng.random() < 0.2:
+                word = word.upper()
+            parts.append(word)
+        glue = rng.choice([" ", "", "-", ", "])
+        texts.append(glue.join(parts))
+    return texts
+
+
+# ============ MATCHER ============
+def test_find_reports_overlapping_occurrences():
+    matcher = KeywordMatcher({"icons": ["icon", "icons", "svg icon"], "ux": ["ux"]})
+    found = sorted((start, end, matcher.keywords[idx][0]) for start, end, idx in matcher.find("SVG Icons, icon UX"))
+    assert found == [(0, 8, "svg icon"), (4, 8, "icon"), (4, 9, "icons"), (11, 15, "icon"), (16, 18, "ux")]
+
+
+def test_match_counts_each_keyword_once_with_weights():
+    matcher = KeywordMatcher({"a": [("dark", 2), "mode"], "b": ["dark mode"], "c": ["light"]})
+    matched = matcher.match("dark mode, dark mode")
+    assert list(matched) == ["a", "b"]
+    assert matched["a"]["score"] == 3
+    assert matched["a"]["spans"] == [(0, 4, "dark"), (5, 9, "mode"), (11, 15, "dark"), (16, 20, "mode")]
+    assert matched["b"]["score"] == 1
+    assert {label: m["score"] for label, m in matcher.match("dark mode, dark mode", spans=False).items()} == \
+        {"a": 3, "b": 1}
+
+
+def test_same_keyword_in_several_groups():
+    matcher = KeywordMatcher({"a": ["page"], "b": ["page", "landing page"]})
+    assert {label: m["score"] for label, m in matcher.match("landing page").items()} == {"a": 1, "b": 2}
+
+
+def test_empty_matcher_matches_nothing():
+    assert KeywordMatcher({}).match("anything") == {}
+    assert KeywordMatcher({"a": []}).find("anything") == []
+
+
+def test_match_scores_equal_substring_counts():
+    keywords = [kw for group in DOMAIN_KEYWORDS.values() for kw in group]
+    for text in _contexts(keywords):
+        expected = {domain: sum(1 for kw in group if kw in text.lower()) for domain, group in DOMAIN_KEYWORDS.items()}
+        got = {domain: m["score"] for domain, m in core.DOMAIN_MATCHER.match(text).items()}
+        assert got == {domain: score for domain, score in expected.items() if score}, text
+        assert {d: m["score"] for d, m in core.DOMAIN_MATCHER.match(text, spans=False).items()} == got, text
+
+
+# ============ DETECTION ============
+def test_detect_domain_matches_substring_checks(monkeypatch):
+    monkeypatch.setattr(core, "USE_UNIFIED_INDEX", False)
+    keywords = [kw for group in DOMAIN_KEYWORDS.values() for kw in group]
+    for query in _contexts(keywords) + ["", "glassmorph", "#1e293b palette", "tailwindcss icons"]:
+        assert core.detect_domain(query) == _substring_domain(query), query
+
+
+def test_detect_page_type_matches_substring_checks():
+    keywords = [kw for group in PAGE_TYPE_KEYWORDS.values() for kw in group]
+    for context in _contexts(keywords, seed=1) + ["", "404 page", "storefront", "not found"]:
+        assert design_system._detect_page_type(context, []) == _substring_page_type(context), context
+
+
+@pytest.mark.parametrize("best_for,page_type", [
+    ("Dashboards, data apps", "Dashboard / Data View"),
+    ("Marketing sites", "Landing / Marketing"),
+    ("Games", "General"),
+])
+def test_page_type_falls_back_to_the_top_style(best_for, page_type):
+    assert design_system._detect_page_type("zzz", [{"Style Category": "X", "Best For": best_for}]) == page_type
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lazily materialized rows: CsvRows parses each record on access exactly as
+csv.DictReader would, and CSVs above LAZY_ROWS_MIN_BYTES search, cache and
+refresh the same as those loaded whole.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import csv
+import pickle
+
+import pytest
+
+import core
+from core import CsvRows
+
+
+@pytest.fixture
+def tricky_csv(tmp_path):
+    filepath = tmp_path / "tricky.csv"
+    records = [
+        ["Plain", "flat minimal", "single line"],
+        ["Multi\nLine", "dark, mode", "first line\nsecond line\n\nafter a blank line"],
+        ['Quoted "name"', 'say ""hi""', "ends with a quote\""],
+        ["Ünïcödé 字体", "日本語 テキスト", "émoji ✨"],
+        ["Short row", "", ""],
+        ["Long row", "extra", "values", "beyond", "the header"],
+    ]
+    with open(filepath, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)  # \r\n line endings; embedded newlines stay \n
+        writer.writerow(["Name", "Keywords", "Notes"])
+        writer.writerows(records)
+        f.write("\r\n")
+        writer.writerow(["Truncated"])
+    return filepath
+
+
+@pytest.fixture
+def lazy(monkeypatch):
+    """Load every CSV through CsvRows"""
+    monkeypatch.setattr(core, "LAZY_ROWS_MIN_BYTES", 0)
+
+
+def _rows(domain):
+    config = core.CSV_CONFIG[domain]
+    return core.INDEX_REGISTRY.get(("domain", domain), core.DATA_DIR / config["file"], config["search_cols"])[0]
+
+
+# ============ CSV ROWS ============
+def test_csv_rows_match_dict_reader(tricky_csv):
+    rows, documents = CsvRows.scan(tricky_csv, ["Name", "Keywords", "Missing"])
+    with open(tricky_csv, "r", encoding="utf-8", newline="") as f:
+        expected = list(csv.DictReader(f))
+
+    assert len(rows) == len(expected)
+    assert [rows[i] for i in range(len(rows))] == expected
+    assert rows[-1] == expected[-1]
+    assert rows[1:4] == expected[1:4]
+    assert rows[::-2] == expected[::-2]
+    assert documents == [f"{row['Name']} {row['Keywords']} " for row in expected]
+
+
+def test_csv_rows_survive_pickling(tricky_csv):
+    rows, _ = CsvRows.scan(tricky_csv, ["Name"])
+    restored = pickle.loads(pickle.dumps(rows))
+    assert list(restored) == list(rows)
+
+
+# ============ SEARCH ============
+def test_lazy_rows_search_like_loaded_rows(lazy, monkeypatch):
+    expected = {}
+    with monkeypatch.context() as m:
+        m.setattr(core, "LAZY_ROWS_MIN_BYTES", 1 << 40)
+        for domain in ["style", "ux", "color"]:
+            expected[domain] = core.search("dark accessible contrast", domain, max_results=5)
+            assert not isinstance(_rows(domain), CsvRows)
+
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+    for domain, result in expected.items():
+        assert core.search("dark accessible contrast", domain, max_results=5) == result
+        assert isinstance(_rows(domain), CsvRows)
+
+
+def test_lazy_rows_are_cached_and_appended(lazy, data_dir):
+    core.search("glass", "style")
+    path = data_dir / "styles.csv"
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write("99,Zephyr Glow,General,\"zephyr, aurora\"\n")
+    core.INDEX_REGISTRY.invalidate()
+
+    with open(core.INDEX_CACHE_DIR / "styles.csv.pickle", "rb") as f:
+        assert isinstance(pickle.load(f)["rows"], CsvRows)
+    assert core.search("zephyr aurora", "style")["results"][0]["Style Category"] == "Zephyr Glow"
+    assert list(_rows("style")) == core._load_csv(path)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped compiled index: every table returns the same rows and
+rankings as an in-memory fitted BM25, search() is served from it without
+parsing CSVs, and stale or unreadable index files fall back to the CSVs.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pytest
+
+import core
+from core import CSV_CONFIG, STACK_CONFIG, MmapIndex
+
+DOMAINS = ["style", "color", "ux", "landing", "typography"]
+
+
+def _refuse_builds(monkeypatch):
+    """Fail any later attempt to parse and fit a CSV"""
+    def refuse(filepath, *args, **kwargs):
+        raise AssertionError(f"{filepath.name} was parsed instead of read from the index file")
+    monkeypatch.setattr(core, "_build_index", refuse)
+
+
+# ============ TABLES ============
+def test_mmap_rankings_match_in_memory(tmp_path, documents, queries):
+    index = MmapIndex(core.build_mmap_index(tmp_path / "index.bin"))
+    for domain in DOMAINS:
+        config = CSV_CONFIG[domain]
+        filepath = core.DATA_DIR / config["file"]
+        tokenizer = core._tokenizer_name(("domain", domain))
+        rows, mapped = index.table(filepath, config["search_cols"], tokenizer)
+        reference_rows, reference = core._build_index(filepath, config["search_cols"], tokenizer)
+
+        assert list(rows) == list(reference_rows)
+        for query in queries(documents(domain), count=50):
+            assert mapped.score_topk(query, 5, True) == reference.score_topk(query, 5, True), query
+            assert mapped.score(query) == reference.score(query), query
+
+
+def test_stacks_and_rows_only_csvs_are_compiled(tmp_path):
+    index = MmapIndex(core.build_mmap_index(tmp_path / "index.bin"))
+    filepath = core.DATA_DIR / STACK_CONFIG["react"]["file"]
+    rows, mapped = index.table(filepath, core._STACK_COLS["search_cols"])
+    reference_rows, reference = core._build_index(filepath, core._STACK_COLS["search_cols"])
+    assert list(rows) == list(reference_rows)
+    assert mapped.score("state hooks") == reference.score("state hooks")
+
+    rows, bm25 = index.table(core.DATA_DIR / "ui-reasoning.csv", None)
+    assert bm25 is None
+    assert list(rows) == core._load_csv(core.DATA_DIR / "ui-reasoning.csv")
+
+
+def test_mismatched_requests_are_not_served(tmp_path):
+    index = MmapIndex(core.build_mmap_index(tmp_path / "index.bin"))
+    config = CSV_CONFIG["style"]
+    filepath = core.DATA_DIR / config["file"]
+    assert index.table(filepath, config["search_cols"]) is not None
+    assert index.table(filepath, config["search_cols"][:2]) is None
+    assert index.table(filepath, config["search_cols"], "cjk") is None
+    assert index.table(filepath, config["search_cols"], positions=True) is None
+    assert index.table(tmp_path / "styles.csv", config["search_cols"]) is None
+
+
+# ============ SEARCH ============
+def test_search_is_served_from_the_index_file(monkeypatch):
+    expected = [core.search("glass dark", domain) for domain in DOMAINS]
+    core.build_mmap_index()
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+
+    _refuse_builds(monkeypatch)
+    assert [core.search("glass dark", domain) for domain in DOMAINS] == expected
+    assert list(core.load_rows("ui-reasoning.csv")) == core._load_csv(core.DATA_DIR / "ui-reasoning.csv")
+
+
+def test_edited_csv_falls_back_to_parsing(data_dir):
+    core.build_mmap_index()
+    path = data_dir / "styles.csv"
+    path.write_text(path.read_text(encoding="utf-8").replace("Glassmorphism", "Zephyrmorphism"), encoding="utf-8")
+    config = CSV_CONFIG["style"]
+    assert core.get_mmap_index().table(path, config["search_cols"]) is None
+    assert core.search("zephyrmorphism", "style")["results"][0]["Style Category"] == "Zephyrmorphism"
+
+
+def test_unreadable_index_file_is_ignored():
+    expected = core.search("glass dark", "style")
+    core.INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (core.INDEX_CACHE_DIR / "index.bin").write_bytes(b"\0" * 64)
+    assert core.get_mmap_index() is None
+    core.INDEX_REGISTRY.invalidate()
+    core.QUERY_CACHE.clear()
+    assert core.search("glass dark", "style") == expected
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+persist_design_system(): the manifest lets unchanged files be skipped,
+changed inputs, edited or deleted outputs and data edits trigger rewrites,
+pages sharing a file name are persisted once, and writes are atomic.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import json
+
+import pytest
+
+import design_system
+from design_system import PERSIST_FORMAT_VERSION, PERSIST_MANIFEST, persist_design_system
+
+
+@pytest.fixture
+def system():
+    return design_system.DesignSystemGenerator().generate("saas analytics dashboard", "Acme Cloud")
+
+
+def _persist(system, tmp_path, **kwargs):
+    kwargs.setdefault("page_query", "saas analytics dashboard")
+    return persist_design_system(system, output_dir=str(tmp_path), **kwargs)
+
+
+def _names(paths):
+    return sorted(path.split("/design-system/acme-cloud/")[1] for path in paths)
+
+
+# ============ MANIFEST ============
+def test_first_run_writes_everything(system, tmp_path):
+    result = _persist(system, tmp_path, page="Checkout", pages=["Settings"])
+    assert _names(result["created_files"]) == ["MASTER.md", "pages/checkout.md", "pages/settings.md"]
+    assert result["written_files"] == result["created_files"]
+    assert result["unchanged_files"] == []
+
+    project = tmp_path / "design-system" / "acme-cloud"
+    manifest = json.loads((project / PERSIST_MANIFEST).read_text(encoding="utf-8"))
+    assert manifest["version"] == PERSIST_FORMAT_VERSION
+    assert sorted(manifest["files"]) == ["MASTER.md", "pages/checkout.md", "pages/settings.md"]
+    assert (project / "pages" / "checkout.md").read_text(encoding="utf-8").startswith("#")
+
+
+def test_unchanged_files_are_not_rewritten(system, tmp_path):
+    _persist(system, tmp_path, page="Checkout")
+    project = tmp_path / "design-system" / "acme-cloud"
+    mtimes = {p.name: p.stat().st_mtime_ns for p in project.rglob("*") if p.is_file()}
+
+    result = _persist(system, tmp_path, page="Checkout")
+    assert result["written_files"] == []
+    assert _names(result["unchanged_files"]) == ["MASTER.md", "pages/checkout.md"]
+    assert {p.name: p.stat().st_mtime_ns for p in project.rglob("*") if p.is_file()} == mtimes
+
+
+def test_changed_inputs_rewrite_their_files(system, tmp_path):
+    _persist(system, tmp_path, page="Checkout")
+    result = _persist(system, tmp_path, page="Checkout", page_query="fintech checkout")
+    assert _names(result["written_files"]) == ["pages/checkout.md"]
+
+    changed = dict(system, pattern=dict(system["pattern"], name="Changed Pattern"))
+    result = _persist(changed, tmp_path, page="Checkout", page_query="fintech checkout")
+    assert _names(result["written_files"]) == ["MASTER.md", "pages/checkout.md"]
+    assert "Changed Pattern" in (tmp_path / "design-system" / "acme-cloud" / "MASTER.md").read_text(encoding="utf-8")
+
+
+def test_edited_or_deleted_outputs_are_restored(system, tmp_path):
+    _persist(system, tmp_path, page="Checkout")
+    project = tmp_path / "design-system" / "acme-cloud"
+    master = (project / "MASTER.md").read_text(encoding="utf-8")
+    (project / "MASTER.md").write_text("edited by hand", encoding="utf-8")
+    (project / "pages" / "checkout.md").unlink()
+
+    result = _persist(system, tmp_path, page="Checkout")
+    assert _names(result["written_files"]) == ["MASTER.md", "pages/checkout.md"]
+    assert (project / "MASTER.md").read_text(encoding="utf-8") == master
+
+
+def test_data_edits_rewrite_page_overrides(system, tmp_path, data_dir, monkeypatch):
+    monkeypatch.setattr(design_system, "DATA_DIR", data_dir)
+    _persist(system, tmp_path, page="Checkout")
+    with open(data_dir / "ux-guidelines.csv", "a", encoding="utf-8") as f:
+        f.write("\n")
+
+    result = _persist(system, tmp_path, page="Checkout")
+    assert _names(result["written_files"]) == ["pages/checkout.md"]
+
+
+def test_incompatible_manifest_rewrites_everything(system, tmp_path):
+    _persist(system, tmp_path)
+    project = tmp_path / "design-system" / "acme-cloud"
+    (project / PERSIST_MANIFEST).write_text(json.dumps({"version": PERSIST_FORMAT_VERSION + 1, "files": {}}))
+    assert _names(_persist(system, tmp_path)["written_files"]) == ["MASTER.md"]
+    (project / PERSIST_MANIFEST).write_text("{broken")
+    assert _names(_persist(system, tmp_path)["written_files"]) == ["MASTER.md"]
+
+
+def test_earlier_pages_stay_in_the_manifest(system, tmp_path):
+    _persist(system, tmp_path, page="Checkout")
+    _persist(system, tmp_path, page="Settings")
+    manifest = json.loads((tmp_path / "design-system" / "acme-cloud" / PERSIST_MANIFEST).read_text(encoding="utf-8"))
+    assert sorted(manifest["files"]) == ["MASTER.md", "pages/checkout.md", "pages/settings.md"]
+    assert _persist(system, tmp_path, page="Checkout")["written_files"] == []
+
+
+# ============ PAGES ============
+def test_pages_sharing_a_file_name_are_persisted_once(system, tmp_path):
+    result = _persist(system, tmp_path, page="User Settings", pages=["user settings", "USER SETTINGS", "Cart", ""])
+    assert _names(result["created_files"]) == ["MASTER.md", "pages/cart.md", "pages/user-settings.md"]
+    text = (tmp_path / "design-system" / "acme-cloud" / "pages" / "user-settings.md").read_text(encoding="utf-8")
+    assert "User Settings" in text
+
+
+# ============ ATOMIC WRITES ============
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    target = tmp_path / "MASTER.md"
+    target.write_bytes(b"old")
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(design_system.os, "replace", failing_replace)
+    with pytest.raises(OSError, match="disk full"):
+        design_system._write_atomic(target, b"new")
+    assert target.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["MASTER.md"]
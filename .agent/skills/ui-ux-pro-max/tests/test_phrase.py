@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Positional index and phrase search: term positions round-trip through the
+varint encoding, adjacent and in-order query terms outrank scattered ones,
+and CSV indexes gain positions (kept in their cache entry) only once a
+phrase search needs them.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pickle
+
+import pytest
+
+import core
+
+
+def _positional(documents):
+    bm25 = core.BM25(backend="python", positions=True)
+    bm25.fit(documents)
+    return bm25
+
+
+# ============ POSITIONS ============
+def test_positions_round_trip_through_varints():
+    positions = [0, 1, 127, 128, 300, 16384, 16385, 2 ** 21 + 5]
+    blob = bytearray(b"\x00\x00")
+    core._encode_positions(positions, blob)
+    assert core._decode_positions(blob, 2, len(positions)) == positions
+
+
+def test_term_positions_per_document():
+    bm25 = _positional(["glass dark glass panel", "panel dark", "light card"])
+    ids = bm25.vocab.ids
+    assert bm25.term_positions(ids["glass"], 0) == [0, 2]
+    assert bm25.term_positions(ids["dark"], 1) == [1]
+    assert bm25.term_positions(ids["dark"], 2) == []
+
+    bm25.add_documents(["dark dark glass"])
+    assert bm25.term_positions(ids["dark"], 3) == [0, 1]
+    assert bm25.term_positions(ids["glass"], 0) == [0, 2]
+    assert bm25.term_positions(ids["glass"], 3) == [2]
+
+
+def test_term_positions_empty_without_positions(fitted):
+    bm25 = fitted(["glass dark glass panel"])
+    assert bm25.term_positions(bm25.vocab.ids["glass"], 0) == []
+
+
+# ============ PHRASE SCORING ============
+def test_adjacent_terms_outrank_scattered_ones():
+    docs = ["mode panel button dark", "dark mode panel button", "light card shadow"]
+    bm25 = _positional(docs)
+    base = dict(bm25.score("dark mode"))
+    assert base[0] == pytest.approx(base[1])
+
+    ranked = bm25.score_phrase_topk("dark mode", 3)
+    assert [idx for idx, _ in ranked] == [1, 0]
+
+    idf = bm25.idf[bm25.vocab.ids["dark"]] + bm25.idf[bm25.vocab.ids["mode"]]
+    phrase = dict(ranked)
+    assert phrase[1] == pytest.approx(base[1] + bm25.PROXIMITY_BOOST * idf / 2 + bm25.PHRASE_BOOST * idf)
+    # "dark" at 3 after "mode" at 0: out of order, distance 3 + 1
+    assert phrase[0] == pytest.approx(base[0] + bm25.PROXIMITY_BOOST * idf / 2 / 4)
+
+
+def test_terms_beyond_the_window_earn_no_boost():
+    filler = " ".join(f"filler{i}" for i in range(core.BM25.PROXIMITY_WINDOW + 1))
+    bm25 = _positional([f"dark {filler} mode", "light card"])
+    assert dict(bm25.score_phrase_topk("dark mode", 2)) == pytest.approx(dict(bm25.score("dark mode")))
+
+
+def test_phrase_scoring_without_positions_is_plain_topk(documents, fitted):
+    bm25 = fitted(documents("style"))
+    for query in ["dark mode", "glass card blur", "minimal clean"]:
+        assert bm25.score_phrase_topk(query, 5) == bm25.score_topk(query, 5)
+
+
+# ============ SEARCH ============
+def test_phrase_search_adds_positions_lazily(data_dir):
+    key = ("domain", "style")
+    core.search("dark mode", "style")
+    _, bm25 = core.INDEX_REGISTRY.get(key, data_dir / "styles.csv", core.CSV_CONFIG["style"]["search_cols"])
+    assert not bm25.positions
+
+    core.search("dark mode", "style", phrase=True)
+    _, bm25 = core.INDEX_REGISTRY.get(key, data_dir / "styles.csv", core.CSV_CONFIG["style"]["search_cols"])
+    assert bm25.positions
+    with open(core.INDEX_CACHE_DIR / "styles.csv.pickle", "rb") as f:
+        assert pickle.load(f)["positions"]
+
+    # The positional cache entry now serves plain searches too
+    core.INDEX_REGISTRY.invalidate()
+    core.search("glass", "style")
+    _, bm25 = core.INDEX_REGISTRY.get(key, data_dir / "styles.csv", core.CSV_CONFIG["style"]["search_cols"])
+    assert bm25.positions
+
+
+def test_phrase_search_ranks_the_exact_phrase_first():
+    result = core.search("dark mode", "style", phrase=True, max_results=3)
+    assert result["results"][0]["Style Category"].lower().startswith("dark mode")
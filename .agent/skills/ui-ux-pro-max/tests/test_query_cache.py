@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Query-result cache: repeated searches are served without scoring, keys are
+normalized query tokens, entries are dropped when their CSV changes, the LRU
+stays bounded, and saved caches load back. Also covers invalidate_indexes().
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pickle
+
+import core
+
+
+# ============ SEARCH ============
+def test_repeated_search_is_served_from_cache():
+    first = core.search("glass dark", "style")
+    loads = core.INDEX_REGISTRY.loads
+    stats = core.query_cache_stats()
+
+    assert core.search("glass dark", "style") == first
+    assert core.query_cache_stats()["hits"] == stats["hits"] + 1
+    assert core.INDEX_REGISTRY.loads == loads
+
+
+def test_queries_with_the_same_tokens_share_an_entry():
+    first = core.search("glass dark", "style")
+    hits = core.query_cache_stats()["hits"]
+    again = core.search("  Glass, DARK!", "style")
+    assert again["results"] == first["results"]
+    assert again["query"] == "  Glass, DARK!"
+    assert core.query_cache_stats()["hits"] == hits + 1
+
+
+def test_result_options_are_part_of_the_key():
+    core.search("glass dark", "style", max_results=3)
+    misses = core.query_cache_stats()["misses"]
+    assert core.search("glass dark", "style", max_results=5)["count"] == 5
+    core.search("glass dark", "style", max_results=3, phrase=True)
+    core.search("glass dark", "style", max_results=3, fuzzy=False)
+    assert core.query_cache_stats()["misses"] == misses + 3
+
+
+def test_callers_cannot_modify_cached_results():
+    first = core.search("glass dark", "style", scores=True)
+    first["results"][0]["Style Category"] = "changed"
+    first["scores"][0] = -1.0
+    first["views"][0].clear()
+
+    again = core.search("glass dark", "style", scores=True)
+    assert again["results"][0]["Style Category"] != "changed"
+    assert again["scores"][0] > 0
+    assert again["views"][0]
+
+
+def test_edited_csv_discards_cached_results(data_dir):
+    assert core.search("zephyrmorphism", "style")["count"] == 0
+    path = data_dir / "styles.csv"
+    path.write_text(path.read_text(encoding="utf-8").replace("Glassmorphism", "Zephyrmorphism"), encoding="utf-8")
+    assert core.search("zephyrmorphism", "style")["results"][0]["Style Category"] == "Zephyrmorphism"
+
+
+# ============ QUERY CACHE ============
+def test_least_recently_used_entry_is_evicted():
+    cache = core.QueryCache(max_entries=2)
+    cache.put("a", 1, ["A"])
+    cache.put("b", 1, ["B"])
+    assert cache.get("a", 1) == ["A"]
+    cache.put("c", 1, ["C"])
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == ["A"]
+    assert cache.get("c", 1) == ["C"]
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "max_entries": 2}
+
+
+def test_stale_stamp_drops_the_entry():
+    cache = core.QueryCache()
+    cache.put("a", ("styles.csv", 1, 10), ["A"])
+    assert cache.get("a", ("styles.csv", 2, 10)) is None
+    assert cache.get("a", ("styles.csv", 1, 10)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_saved_cache_loads_back(tmp_path):
+    path = tmp_path / "query-results.pickle"
+    cache = core.QueryCache()
+    cache.put("a", 1, ["A"])
+    cache.save(path)
+    assert not cache.dirty
+
+    loaded = core.QueryCache(max_entries=4)
+    loaded.load(path)
+    assert loaded.get("a", 1) == ["A"]
+
+    path.write_bytes(pickle.dumps({"version": core.INDEX_CACHE_VERSION - 1, "entries": [("b", (1, ["B"]))]}))
+    stale = core.QueryCache()
+    stale.load(path)
+    assert stale.stats()["entries"] == 0
+
+    path.write_bytes(b"garbage")
+    stale.load(path)
+    assert stale.stats()["entries"] == 0
+
+
+def test_clean_cache_is_not_saved(tmp_path):
+    path = tmp_path / "query-results.pickle"
+    cache = core.QueryCache()
+    cache.dirty = False
+    cache.save(path)
+    assert not path.exists()
+
+
+# ============ INDEX REGISTRY ============
+def test_invalidate_indexes_drops_only_the_named_entries():
+    core.search("glass", "style")
+    core.search("blue", "color")
+    core.search_stack("state", "react")
+    assert set(core.INDEX_REGISTRY.keys()) == {("domain", "style"), ("domain", "color"), ("stack", "react")}
+
+    core.invalidate_indexes(domain="style")
+    assert set(core.INDEX_REGISTRY.keys()) == {("domain", "color"), ("stack", "react")}
+    core.invalidate_indexes(stack="react")
+    assert core.INDEX_REGISTRY.keys() == [("domain", "color")]
+    core.invalidate_indexes()
+    assert core.INDEX_REGISTRY.keys() == []
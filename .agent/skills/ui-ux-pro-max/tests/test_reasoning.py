@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ReasoningTable: indexed rule lookup picks exactly the rule the original
+three-pass scan of ui-reasoning.csv picked, and the compiled reasoning is
+handed out as copies.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import random
+
+import pytest
+
+import core
+import design_system
+from design_system import DEFAULT_REASONING, ReasoningTable
+
+
+# ============ REFERENCE ============
+def _scan(rules, category):
+    """_find_reasoning_rule() as it was: exact, then partial, then word match; first rule wins"""
+    category_lower = category.lower()
+    for i, rule in enumerate(rules):
+        if rule.get("UI_Category", "").lower() == category_lower:
+            return i
+    for i, rule in enumerate(rules):
+        ui_cat = rule.get("UI_Category", "").lower()
+        if ui_cat in category_lower or category_lower in ui_cat:
+            return i
+    for i, rule in enumerate(rules):
+        keywords = rule.get("UI_Category", "").lower().replace("/", " ").replace("-", " ").split()
+        if any(kw in category_lower for kw in keywords):
+            return i
+    return None
+
+
+def _categories(rules, count=300, seed=0):
+    """Exact categories, case changes, fragments, word mixes and misses"""
+    rng = random.Random(seed)
+    names = [rule["UI_Category"] for rule in rules]
+    words = sorted({w for name in names for w in name.replace("/", " ").replace("-", " ").split()})
+    picked = names + [name.upper() for name in names] + ["", "zzz", "a", "Quantum Widgets", "\0"]
+    for _ in range(count):
+        name = rng.choice(names)
+        start = rng.randrange(len(name))
+        picked.append(name[start:start + rng.randint(1, 12)])
+        picked.append(" ".join(rng.sample(words, rng.randint(1, 3))))
+        picked.append(f"{rng.choice(words)} {rng.choice(['app', 'platform', 'tool'])}")
+    return picked
+
+
+# ============ LOOKUP ============
+def test_find_matches_linear_scan():
+    rules = core.load_rows("ui-reasoning.csv")
+    table = ReasoningTable(rules)
+    for category in _categories(rules):
+        assert table.find(category) == _scan(rules, category), category
+
+
+@pytest.mark.parametrize("rules", [
+    [{"UI_Category": "Fintech/Crypto"}, {"UI_Category": "Crypto"}, {"UI_Category": "Banking"}],
+    [{"UI_Category": "Photo"}, {"UI_Category": ""}, {"UI_Category": "Photo"}],
+    [{"UI_Category": "Real-Estate"}, {"UI_Category": "Estate Agency"}, {"No": "3"}],
+    [],
+])
+def test_find_matches_linear_scan_on_edge_cases(rules):
+    table = ReasoningTable(rules)
+    for category in ["crypto", "Fintech/Crypto app", "bank", "photo", "", "estate", "agency real", "x"]:
+        assert table.find(category) == _scan(rules, category), category
+
+
+def test_lookups_are_cached_per_category():
+    table = ReasoningTable([{"UI_Category": "Crypto"}])
+    assert table.find("crypto wallet") == 0
+    table.rules.append({"UI_Category": "Wallet"})
+    assert table.find("crypto wallet") == 0
+
+
+# ============ REASONING ============
+def test_apply_reasoning_compiles_the_matching_rule():
+    generator = design_system.DesignSystemGenerator()
+    rules = generator.reasoning_data
+    index = _scan(rules, "SaaS (General)")
+    reasoning = generator._apply_reasoning("SaaS (General)", {})
+
+    assert reasoning["pattern"] == rules[index]["Recommended_Pattern"]
+    assert reasoning["style_priority"] == [s.strip() for s in rules[index]["Style_Priority"].split("+")]
+    assert reasoning["decision_rules"] == {"if_ux_focused": "prioritize-minimalism", "if_data_heavy": "add-glassmorphism"}
+    assert _scan(rules, "zzz") is None
+    assert generator._apply_reasoning("zzz", {}) == DEFAULT_REASONING
+
+
+def test_apply_reasoning_returns_copies():
+    generator = design_system.DesignSystemGenerator()
+    first = generator._apply_reasoning("SaaS (General)", {})
+    first["style_priority"].append("changed")
+    first["decision_rules"]["changed"] = True
+    again = generator._apply_reasoning("SaaS (General)", {})
+    assert "changed" not in again["style_priority"]
+    assert "changed" not in again["decision_rules"]
+
+
+def test_invalid_decision_rules_are_ignored():
+    table = ReasoningTable([{"UI_Category": "Broken", "Decision_Rules": "{not json"}])
+    assert table.reasoning[0]["decision_rules"] == {}
+    assert table.reasoning[0]["severity"] == "MEDIUM"
+
+
+def test_table_is_rebuilt_when_rules_reload():
+    rules = core.load_rows("ui-reasoning.csv")
+    table = design_system._reasoning_table(rules)
+    assert design_system._reasoning_table(rules) is table
+    assert design_system._reasoning_table(list(rules)) is not table
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rerank(): priority boosts blended with normalized BM25 scores, cached
+lowercase views, and the design-system callers that select through it.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import random
+
+import pytest
+
+import core
+import design_system
+from core import rerank
+
+
+def _response(rows, scores=None):
+    response = {"results": rows}
+    if scores is not None:
+        response["scores"] = scores
+    return response
+
+
+def _row(name, keywords="", notes=""):
+    return {"Style Category": name, "Keywords": keywords, "Notes": notes}
+
+
+def test_name_match_outranks_boosts_and_scores():
+    rows = [_row("Flat", "glass dark", "glass"), _row("Glassmorphism"), _row("Dark Mode")]
+    assert rerank(_response(rows, [9.0, 0.1, 0.2]), ["dark", "glass"])[0]["Style Category"] == "Dark Mode"
+    assert rerank(_response(rows, [9.0, 0.1, 0.2]), ["glass", "dark"])[0]["Style Category"] == "Glassmorphism"
+
+
+def test_bm25_score_is_blended_with_boosts():
+    rows = [_row("Strong match"), _row("Mentions it", notes="retro"), _row("Keyword match", keywords="retro")]
+    ranked = rerank(_response(rows, [10.0, 2.0, 5.0]), ["retro"])
+    # keyword 3 + 1.5 > top score 3.0 > field 1 + 0.6
+    assert [row["Style Category"] for row in ranked] == ["Keyword match", "Strong match", "Mentions it"]
+
+
+def test_without_scores_boosts_decide_and_ties_keep_order():
+    rows = [_row("A"), _row("B", notes="retro"), _row("C"), _row("D", keywords="retro")]
+    assert [row["Style Category"] for row in rerank(_response(rows), ["retro"])] == ["D", "B", "A", "C"]
+    assert rerank(_response(rows), []) == rows
+
+
+@pytest.mark.parametrize("domain", ["style", "product"])
+def test_cached_views_and_top_n_match_the_full_rerank(domain, documents, queries):
+    rng = random.Random(24)
+    words = [w for q in queries(documents(domain), count=40) for w in q.split()]
+    for query in queries(documents(domain), count=40):
+        response = core.search(query, domain, max_results=6, scores=True)
+        plain = {"results": response["results"], "scores": response["scores"]}
+        assert response["views"] == [core._lowercase_view(row) for row in response["results"]]
+
+        priorities = rng.sample(words, 3)
+        ranked = rerank(response, priorities)
+        assert rerank(plain, priorities) == ranked
+        for top_n in (1, 2):
+            assert rerank(response, priorities, top_n=top_n) == ranked[:top_n]
+
+
+def test_select_best_match_uses_rerank():
+    response = core.search("modern saas dashboard", "style", max_results=3, scores=True)
+    generator = design_system.DesignSystemGenerator()
+    priorities = ["minimalism", "flat"]
+    assert generator._select_best_match(response, priorities) == rerank(response, priorities)[0]
+    assert generator._select_best_match(response, []) == response["results"][0]
+
+
+def test_page_overrides_pick_the_style_through_rerank(monkeypatch):
+    calls = []
+
+    def spy(response, priorities, **kwargs):
+        picked = rerank(response, priorities, **kwargs)
+        calls.append((priorities, picked))
+        return picked
+
+    monkeypatch.setattr(design_system, "rerank", spy)
+    system = design_system.DesignSystemGenerator().generate("fintech crypto")
+    overrides = design_system._generate_intelligent_overrides("Dashboard", "fintech crypto", system)
+
+    priorities, picked = calls[-1]
+    assert overrides["page_type"] == "Dashboard / Data View"
+    assert priorities == design_system.PAGE_TYPE_KEYWORDS["Dashboard / Data View"]
+    if picked[0].get("Effects & Animation"):
+        assert f"Effects: {picked[0]['Effects & Animation']}" in overrides["recommendations"]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SearchContext: searches sharing a base query return exactly what search()
+returns for the concatenated query, score the base once per domain, and
+page overrides rendered through one context match rendering each page alone.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pytest
+
+import core
+import design_system
+from core import SearchContext
+
+PAGES = ["dashboard", "checkout", "landing hero", "settings", "glassmorph", "404", ""]
+
+
+@pytest.mark.parametrize("base", ["", "saas dashboard", "beauty spa wellness", "fintech crypto trust"])
+def test_search_context_matches_search(base):
+    context = SearchContext(base)
+    for page in PAGES:
+        for domain, k in [("style", 1), ("ux", 3), ("landing", 1), ("color", 4), ("typography", 0)]:
+            expected = core.search(f"{page} {base}", domain, max_results=k, scores=True)
+            got = context.search(page, domain, k, scores=True)
+            assert got["results"] == expected["results"], (page, domain)
+            assert got["scores"] == expected["scores"], (page, domain)
+            assert got["views"] == expected["views"], (page, domain)
+            assert got["query"] == expected["query"], (page, domain)
+
+
+def test_base_query_is_scored_once_per_domain(monkeypatch):
+    context = SearchContext("saas analytics dashboard")
+    seen = []
+    query_terms = core.BM25.query_terms
+
+    def counting(self, query, fuzzy=False):
+        seen.append(query)
+        return query_terms(self, query, fuzzy)
+
+    monkeypatch.setattr(core.BM25, "query_terms", counting)
+    for page in ["checkout", "settings", "profile"]:
+        context.search(page, "style", 2)
+        context.search(page, "ux", 2)
+    assert seen.count("saas analytics dashboard") == 2
+    assert seen.count("checkout") == 2
+
+
+def test_unknown_domain_searches_style():
+    context = SearchContext("saas")
+    assert context.search("dark", "nope", 2)["results"] == core.search("dark saas", "style", 2)["results"]
+
+
+def test_page_overrides_match_rendering_each_page_alone():
+    system = design_system.DesignSystemGenerator().generate("fintech crypto dashboard", "Ledger")
+    page_query = "fintech crypto dashboard"
+    context = SearchContext(page_query.lower())
+    for page in ["Checkout", "Settings", "Landing Hero", "Not Found"]:
+        alone = design_system.format_page_override_md(system, page, page_query)
+        assert design_system.format_page_override_md(system, page, page_query, context) == alone, page
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sparse BM25 backend: NumPy/SciPy stay unimported until a sparse index needs
+them, and the sparse backend ranks like the Python one.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import core
+
+HAS_SPARSE = importlib.util.find_spec("numpy") is not None and importlib.util.find_spec("scipy") is not None
+
+
+def _loaded_after(code):
+    """Which of numpy/scipy a fresh interpreter has imported after running code"""
+    probe = code + "\nimport sys; print(sorted(m for m in ('numpy', 'scipy') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=Path(core.__file__).parent, capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def test_import_core_does_not_load_numpy():
+    assert _loaded_after("import core") == "[]"
+
+
+def test_small_corpus_search_does_not_load_numpy():
+    assert _loaded_after("import core; core.INDEX_CACHE_DIR = None; core.search('dark mode', 'style')") == "[]"
+
+
+@pytest.mark.skipif(not HAS_SPARSE, reason="NumPy/SciPy not installed")
+def test_sparse_backend_loads_numpy_on_demand():
+    assert _loaded_after("import core; b = core.BM25(backend='sparse'); b.fit(['dark mode', 'glass mode'])") == "['numpy', 'scipy']"
+
+
+@pytest.mark.skipif(not HAS_SPARSE, reason="NumPy/SciPy not installed")
+def test_sparse_backend_matches_python(documents, queries, fitted):
+    corpus = documents("style")
+    python = fitted(corpus)
+    matrix = core.BM25(backend="sparse")
+    matrix.fit(corpus)
+    assert matrix._sparse_matrix() is not None
+    for query in queries(corpus):
+        expected = python.score_topk(query, 5, True)
+        got = matrix.score_topk(query, 5, True)
+        assert [idx for idx, _ in got] == [idx for idx, _ in expected], query
+        assert [score for _, score in got] == pytest.approx([score for _, score in expected])
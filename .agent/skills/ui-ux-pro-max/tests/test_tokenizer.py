@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CJK-aware tokenization: CJK runs become character bigrams, everything else
+tokenizes as before, and a domain configured with the "cjk" tokenizer
+matches Chinese queries that the default tokenizer cannot.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import sys
+
+import pytest
+
+import core
+
+
+# ============ TOKENIZERS ============
+def test_cjk_runs_split_into_bigrams():
+    tokenize = core.make_tokenizer("cjk")
+    assert tokenize("深色模式") == ["深色", "色模", "模式"]
+    assert tokenize("Dark 深色 mode, 暗") == ["dark", "深色", "mode", "暗"]
+    assert tokenize("玻璃拟态glass") == ["玻璃", "璃拟", "拟态", "glass"]
+    assert tokenize("ダークモード") == ["ダー", "ーク", "クモ", "モー", "ード"]
+
+
+def test_default_tokenizer_keeps_cjk_runs_whole():
+    tokenize = core.make_tokenizer("default")
+    assert tokenize("深色模式 dark") == ["深色模式", "dark"]
+    assert tokenize("暗 dark") == ["dark"]
+
+
+def test_cjk_tokenizer_matches_default_on_latin_text(documents):
+    cjk, default = core.make_tokenizer("cjk"), core.make_tokenizer("default")
+    for doc in documents("style") + documents("ux"):
+        assert cjk(doc) == default(doc)
+
+
+def test_jieba_segmenter_falls_back_to_bigrams(monkeypatch):
+    monkeypatch.setitem(sys.modules, "jieba", None)
+    assert core.CJKTokenizer(segmenter="jieba")("深色模式") == ["深色", "色模", "模式"]
+
+
+def test_make_tokenizer_shares_instances_and_rejects_unknown_names():
+    assert core.make_tokenizer("cjk") is core.make_tokenizer("cjk")
+    with pytest.raises(ValueError, match="Unknown tokenizer: klingon"):
+        core.make_tokenizer("klingon")
+
+
+# ============ SEARCH ============
+@pytest.fixture
+def chinese_domain(data_dir, monkeypatch):
+    (data_dir / "guides-zh.csv").write_text(
+        "Name,Keywords\n"
+        "深色模式,深色模式 夜间 低亮度\n"
+        "玻璃拟态,玻璃拟态 模糊 透明\n"
+        "Minimalism,极简 留白 clean\n", encoding="utf-8")
+    config = {"file": "guides-zh.csv", "search_cols": ["Name", "Keywords"], "output_cols": ["Name"]}
+    monkeypatch.setitem(core.CSV_CONFIG, "zh", config)
+    return config
+
+
+def test_cjk_domain_matches_chinese_queries(chinese_domain, monkeypatch):
+    assert core.search("深色", "zh", fuzzy=False)["count"] == 0
+
+    monkeypatch.setitem(chinese_domain, "tokenizer", "cjk")
+    assert core.search("深色", "zh", fuzzy=False)["results"] == [{"Name": "深色模式"}]
+    assert core.search("夜间模式", "zh")["results"][0] == {"Name": "深色模式"}
+    assert core.search("透明 clean", "zh")["count"] == 2
+
+
+def test_changing_the_tokenizer_rebuilds_the_index(chinese_domain, monkeypatch):
+    core.search("深色", "zh")
+    monkeypatch.setitem(chinese_domain, "tokenizer", "cjk")
+    core.search("深色", "zh")
+    _, bm25 = core.INDEX_REGISTRY.get(("domain", "zh"), core.DATA_DIR / "guides-zh.csv", chinese_domain["search_cols"])
+    assert bm25.tokenizer is core.make_tokenizer("cjk")
+
+    core.INDEX_REGISTRY.invalidate()
+    monkeypatch.setitem(chinese_domain, "tokenizer", "default")
+    _, bm25 = core.INDEX_REGISTRY.get(("domain", "zh"), core.DATA_DIR / "guides-zh.csv", chinese_domain["search_cols"])
+    assert bm25.tokenizer is core.make_tokenizer("default")
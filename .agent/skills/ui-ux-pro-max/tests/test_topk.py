@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Top-k BM25 scoring: MaxScore-pruned score_topk() must rank exactly like the
+first k entries of the exhaustive score().
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pytest
+
+DOMAINS = ["style", "color", "ux", "landing", "typography"]
+
+
+@pytest.mark.parametrize("domain", DOMAINS)
+@pytest.mark.parametrize("fuzzy", [False, True])
+def test_score_topk_matches_score(domain, fuzzy, documents, queries, fitted):
+    corpus = documents(domain)
+    bm25 = fitted(corpus)
+    for query in queries(corpus):
+        ranked = bm25.score(query, fuzzy)
+        for k in (1, 3, 10):
+            assert bm25.score_topk(query, k, fuzzy) == ranked[:k], query
+
+
+def test_score_topk_handles_k_beyond_matches(documents, fitted):
+    bm25 = fitted(documents("style"))
+    ranked = bm25.score("glassmorphism")
+    assert bm25.score_topk("glassmorphism", len(ranked) + 10) == ranked
+    assert bm25.score_topk("glassmorphism", 0) == []
+    assert bm25.score_topk("zzzz qqqq", 5) == []
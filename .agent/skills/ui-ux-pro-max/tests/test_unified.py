@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unified faceted index (UIPRO_UNIFIED_INDEX=1): one scoring pass returns what
+per-domain searches return, facets load lazily, and routing tries keywords
+before the cross-domain ranking.
+
+Usage: python -m pytest .agent/skills/ui-ux-pro-max/tests
+"""
+
+import pytest
+
+import core
+
+BRIEFS = ["SaaS dashboard", "beauty spa wellness service", "fintech crypto", "glassmorph minimal", "dark mode",
+          "restaurant food delivery", "gaming portfolio neon", "elegnt serif typgraphy", "luxury ecommerce", "xyzzy"]
+LIMITS = {"product": 1, "style": 3, "color": 2, "landing": 2, "typography": 2, "ux": 3, "chart": 2}
+
+
+@pytest.fixture(autouse=True)
+def fresh_unified_index(monkeypatch):
+    monkeypatch.setattr(core, "_UNIFIED_INDEX", None)
+    monkeypatch.setattr(core, "USE_UNIFIED_INDEX", True)
+
+
+@pytest.mark.parametrize("fuzzy", [False, True])
+def test_search_domains_matches_per_domain_search(fuzzy):
+    for brief in BRIEFS:
+        combined = core.search_domains(brief, LIMITS, fuzzy=fuzzy)
+        for domain, k in LIMITS.items():
+            assert combined[domain] == core.search(brief, domain, k, fuzzy=fuzzy), (brief, domain)
+
+
+def test_facets_load_lazily():
+    core.search_domains("dark mode", {"color": 2})
+    assert core._UNIFIED_INDEX.facets == [("domain", "color")]
+    core.search_domains("dark mode", {"color": 2, "style": 1})
+    assert core._UNIFIED_INDEX.facets == [("domain", "color"), ("domain", "style")]
+
+
+def test_facets_share_the_registry_indexes():
+    index = core.get_unified_index([("domain", "style")])
+    config = core.CSV_CONFIG["style"]
+    rows, bm25 = core.INDEX_REGISTRY.get(("domain", "style"), core.DATA_DIR / config["file"], config["search_cols"])
+    assert index.indexes[0] is bm25 and index.rows[0] is rows
+
+
+def test_keywords_route_before_the_unified_ranking():
+    assert core.route_domains("color palette for fintech") == [d for d, _, _ in core.score_domains(
+        "color palette for fintech", spans=False)[:2]]
+    assert core._UNIFIED_INDEX is None  # keyword match: no index needed
+    assert core.route_domains("glassmorph")[0] == "style"  # keyword prefix
+    assert core._UNIFIED_INDEX is None
+    ranking = core.route_domains("trust calm")
+    assert ranking == [d for d, _ in core.get_unified_index().rank_domains("trust calm")[:2]]
+
+
+def test_rank_domains_sees_newly_loaded_facets():
+    index = core.get_unified_index([("domain", "color")])
+    assert [d for d, _ in index.rank_domains("serif")] in ([], ["color"])
+    core.get_unified_index()
+    assert "typography" in [d for d, _ in index.rank_domains("serif")]
+
+
+def test_without_unified_index_routing_defaults_to_style(monkeypatch):
+    monkeypatch.setattr(core, "USE_UNIFIED_INDEX", False)
+    assert core.route_domains("xyzzy plugh") == ["style"]